@@ -1,9 +1,24 @@
 from __future__ import annotations
 
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from roundhouse import load_settings
 from roundhouse.api import ha_router, nodes_router, panel_router, trestle_router
+from roundhouse.nodes import configure_node_registry
+from roundhouse.services.panel_desktop import shutdown_panel_desktop_manager
+
+configure_node_registry(load_settings())
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncGenerator[None, None]:
+    yield
+    await shutdown_panel_desktop_manager()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(ha_router)
 app.include_router(nodes_router)
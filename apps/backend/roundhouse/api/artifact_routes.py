@@ -1,18 +1,61 @@
 from __future__ import annotations
 
+import asyncio
+import secrets
 import shutil
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from email.utils import formatdate
 from pathlib import Path
-from typing import List
+from typing import List, Literal
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
 from core.artifacts.models import ArtifactDescriptor
+from roundhouse import load_settings
+from roundhouse.services.artifact_compression import (
+    available_encodings,
+    find_variant,
+    get_artifact_compressor,
+    is_compressible,
+    negotiate_encoding,
+)
+from roundhouse.services.artifact_digest import fingerprint, get_digest_cache
+from roundhouse.services.artifact_http import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    RangeNotSatisfiableError,
+    artifact_media_type,
+    content_range,
+    if_none_match_matches,
+    if_range_matches,
+    parse_range_header,
+    strong_etag,
+)
+from roundhouse.services.artifact_index import ArtifactIndexEntry, InvalidCursorError, get_artifact_index
+from roundhouse.services.artifact_paths import ARTIFACTS_DIR
+from roundhouse.services.artifact_retention import (
+    automatic_retention_enabled,
+    delete_artifact,
+    get_retention_engine,
+    parse_policies,
+)
+from roundhouse.services.artifact_uploads import (
+    MAX_CHUNK_BYTES,
+    RECOMMENDED_CHUNK_BYTES,
+    UploadError,
+    UploadSession,
+    get_upload_manager,
+)
 from roundhouse.services.simulator_selection import get_selected_version
+from roundhouse.services.simulator_verifier import get_simulator_verifier
 
-ARTIFACTS_DIR = Path(__file__).resolve().parent.parent.parent / "artifacts"
 ARTIFACTS_DIR.mkdir(exist_ok=True)
+# Fail at startup on malformed retention policies rather than on the first upload.
+parse_policies(load_settings().artifact_retention_policies)
+RANGE_READ_CHUNK = 64 * 1024
 
 router = APIRouter(prefix="/api/artifacts", tags=["artifacts"])
 
@@ -20,37 +63,52 @@ router = APIRouter(prefix="/api/artifacts", tags=["artifacts"])
 class ArtifactCleanupResponse(BaseModel):
     deleted: List[str]
     retained: List[str]
+    protected: List[str]
     pinned: str | None = None
+    dry_run: bool = False
+    bytes_freed: int = 0
+    bytes_total: int = 0
+    byte_budget: int | None = None
 
 
-# Retention policy: keep 5 most recent, always retain pinned/in-use
 @router.post("/cleanup", response_model=ArtifactCleanupResponse)
-async def cleanup_artifacts() -> ArtifactCleanupResponse:
-    pinned = get_selected_version()
-    files = [f for f in ARTIFACTS_DIR.iterdir() if f.is_file()]
-    # Sort by modification time, newest first
-    files.sort(key=lambda f: f.stat().st_mtime, reverse=True)
-    retained: List[str] = []
-    deleted: List[str] = []
-    count = 0
-    for f in files:
-        if pinned and f.name == pinned:
-            retained.append(f.name)
-            continue
-        if count < 5:
-            retained.append(f.name)
-            count += 1
-        else:
-            try:
-                f.unlink()
-                deleted.append(f.name)
-            except Exception:
-                pass
-    return ArtifactCleanupResponse(deleted=deleted, retained=retained, pinned=pinned)
+async def cleanup_artifacts(dry_run: bool = False) -> ArtifactCleanupResponse:
+    # Per-kind count/age limits plus the global byte budget, evicting least-recently-downloaded
+    # first; anything referenced by the manifest, a node or the current selection is kept.
+    engine = get_retention_engine(load_settings())
+    report = await asyncio.to_thread(engine.run, dry_run, None, True)
+    return ArtifactCleanupResponse(
+        deleted=report.deleted,
+        retained=report.retained,
+        protected=report.protected,
+        pinned=get_selected_version(),
+        dry_run=report.dry_run,
+        bytes_freed=report.bytes_freed,
+        bytes_total=report.bytes_total,
+        byte_budget=report.byte_budget,
+    )
 
 
 class ArtifactListResponse(BaseModel):
     artifacts: List[ArtifactDescriptor]
+    next_cursor: str | None = None
+
+
+def _artifact_stored(path: Path, kind: str | None, sha256: str | None = None) -> str:
+    cache = get_digest_cache()
+    if sha256 is None:
+        # Hash while the file is still in the page cache; it also warms the download ETag.
+        cache.forget(path)
+        sha256 = cache.digest(path)
+    else:
+        cache.remember(fingerprint(path), sha256)
+    get_artifact_index().record_file(path, kind, sha256)
+    get_simulator_verifier().invalidate(path.name)
+    get_artifact_compressor().schedule(path)
+    settings = load_settings()
+    if automatic_retention_enabled(settings):
+        get_retention_engine(settings).request_pass()
+    return sha256
 
 
 @router.post("/upload", response_model=ArtifactDescriptor)
@@ -60,22 +118,275 @@ async def upload_artifact(file: UploadFile = File(...), kind: str = "generic") -
     dest = ARTIFACTS_DIR / str(file.filename)
     with dest.open("wb") as out_file:
         shutil.copyfileobj(file.file, out_file)
-    descriptor = ArtifactDescriptor(artifact_ref=str(file.filename), kind=kind)
+    sha256 = await asyncio.to_thread(_artifact_stored, dest, kind)
+    descriptor = ArtifactDescriptor(
+        artifact_ref=str(file.filename),
+        kind=kind,
+        metadata={"size_bytes": dest.stat().st_size, "sha256": sha256},
+    )
     return descriptor
 
 
+class UploadSessionCreateRequest(BaseModel):
+    filename: str
+    size: int
+    kind: str = "generic"
+    sha256: str | None = None
+
+
+class UploadSessionFinalizeRequest(BaseModel):
+    sha256: str | None = None
+
+
+class UploadSessionResponse(BaseModel):
+    session_id: str
+    filename: str
+    kind: str
+    size: int
+    received_bytes: int
+    missing: List[List[int]]
+    complete: bool
+    expires_at: float
+    chunk_size: int = RECOMMENDED_CHUNK_BYTES
+    max_chunk_size: int = MAX_CHUNK_BYTES
+
+
+def _upload_http_error(exc: UploadError) -> HTTPException:
+    return HTTPException(status_code=exc.status_code, detail={"error": exc.code, "message": str(exc)})
+
+
+def _session_response(session: UploadSession) -> UploadSessionResponse:
+    return UploadSessionResponse(
+        session_id=session.session_id,
+        filename=session.filename,
+        kind=session.kind,
+        size=session.size,
+        received_bytes=session.received_bytes,
+        missing=session.missing(),
+        complete=session.complete,
+        expires_at=session.updated_at + get_upload_manager().ttl_seconds,
+    )
+
+
+@router.post("/uploads", response_model=UploadSessionResponse, status_code=201)
+async def create_upload_session(payload: UploadSessionCreateRequest) -> UploadSessionResponse:
+    try:
+        session = await asyncio.to_thread(
+            get_upload_manager().create, payload.filename, payload.size, payload.kind, payload.sha256
+        )
+    except UploadError as exc:
+        raise _upload_http_error(exc) from exc
+    return _session_response(session)
+
+
+@router.get("/uploads/{session_id}", response_model=UploadSessionResponse)
+async def get_upload_session(session_id: str) -> UploadSessionResponse:
+    try:
+        session = await asyncio.to_thread(get_upload_manager().get, session_id)
+    except UploadError as exc:
+        raise _upload_http_error(exc) from exc
+    return _session_response(session)
+
+
+@router.put("/uploads/{session_id}", response_model=UploadSessionResponse)
+async def upload_chunk(session_id: str, offset: int, request: Request) -> UploadSessionResponse:
+    too_large = HTTPException(status_code=413, detail={"error": "UPLOAD_CHUNK_TOO_LARGE", "message": "Chunk too large"})
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > MAX_CHUNK_BYTES:
+        raise too_large
+    # Chunked bodies carry no length, so count while reading and stop at the limit.
+    parts: list[bytes] = []
+    received = 0
+    async for part in request.stream():
+        received += len(part)
+        if received > MAX_CHUNK_BYTES:
+            raise too_large
+        parts.append(part)
+    data = b"".join(parts)
+    try:
+        session = await asyncio.to_thread(get_upload_manager().write_chunk, session_id, offset, data)
+    except UploadError as exc:
+        raise _upload_http_error(exc) from exc
+    return _session_response(session)
+
+
+@router.post("/uploads/{session_id}/finalize", response_model=ArtifactDescriptor)
+async def finalize_upload_session(
+    session_id: str, payload: UploadSessionFinalizeRequest | None = None
+) -> ArtifactDescriptor:
+    sha256 = payload.sha256 if payload else None
+    try:
+        session, dest, digest = await asyncio.to_thread(
+            get_upload_manager().finalize, session_id, ARTIFACTS_DIR, sha256
+        )
+    except UploadError as exc:
+        raise _upload_http_error(exc) from exc
+    await asyncio.to_thread(_artifact_stored, dest, session.kind, digest)
+    return ArtifactDescriptor(
+        artifact_ref=session.filename,
+        kind=session.kind,
+        metadata={"size_bytes": session.size, "sha256": digest},
+    )
+
+
+@router.delete("/uploads/{session_id}", status_code=204)
+async def abort_upload_session(session_id: str) -> Response:
+    try:
+        await asyncio.to_thread(get_upload_manager().abort, session_id)
+    except UploadError as exc:
+        raise _upload_http_error(exc) from exc
+    return Response(status_code=204)
+
+
+def _entry_descriptor(entry: ArtifactIndexEntry) -> ArtifactDescriptor:
+    return ArtifactDescriptor(
+        artifact_ref=entry.name,
+        kind=entry.kind,
+        metadata={
+            "size_bytes": entry.size_bytes,
+            "sha256": entry.sha256,
+            "uploaded_at": datetime.fromtimestamp(entry.uploaded_at, timezone.utc).isoformat(),
+            "last_access": datetime.fromtimestamp(entry.last_access, timezone.utc).isoformat(),
+        },
+    )
+
+
 @router.get("/list", response_model=ArtifactListResponse)
-async def list_artifacts() -> ArtifactListResponse:
-    artifacts: List[ArtifactDescriptor] = []
-    for f in ARTIFACTS_DIR.iterdir():
-        if f.is_file():
-            artifacts.append(ArtifactDescriptor(artifact_ref=f.name, kind="generic"))
-    return ArtifactListResponse(artifacts=artifacts)
+async def list_artifacts(
+    kind: str | None = None,
+    prefix: str | None = None,
+    sort: Literal["name", "size_bytes", "uploaded_at", "last_access"] = "name",
+    order: Literal["asc", "desc"] = "asc",
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: str | None = None,
+) -> ArtifactListResponse:
+    try:
+        entries, next_cursor = await asyncio.to_thread(
+            get_artifact_index().query,
+            kind=kind,
+            prefix=prefix,
+            sort=sort,
+            descending=order == "desc",
+            limit=limit,
+            cursor=cursor,
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return ArtifactListResponse(artifacts=[_entry_descriptor(e) for e in entries], next_cursor=next_cursor)
+
+
+@router.delete("/{artifact_ref}", status_code=204)
+async def delete_artifact_route(artifact_ref: str) -> Response:
+    index = get_artifact_index()
+    entry = index.get(artifact_ref)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    await asyncio.to_thread(delete_artifact, index, ARTIFACTS_DIR, entry)
+    return Response(status_code=204)
+
+
+def _iter_file_range(path: Path, start: int, end: int) -> Iterator[bytes]:
+    remaining = end - start + 1
+    with path.open("rb") as handle:
+        handle.seek(start)
+        while remaining > 0:
+            chunk = handle.read(min(RANGE_READ_CHUNK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _iter_multipart(path: Path, parts: list[tuple[bytes, int, int]], closing: bytes) -> Iterator[bytes]:
+    for header, start, end in parts:
+        yield header
+        yield from _iter_file_range(path, start, end)
+        yield b"\r\n"
+    yield closing
+
+
+def _range_response(
+    path: Path,
+    ranges: list[tuple[int, int]],
+    size: int,
+    media_type: str,
+    headers: dict[str, str],
+) -> Response:
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers["Content-Range"] = content_range(start, end, size)
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            _iter_file_range(path, start, end),
+            status_code=206,
+            media_type=media_type,
+            headers=headers,
+        )
+    boundary = secrets.token_hex(16)
+    parts: list[tuple[bytes, int, int]] = []
+    length = 0
+    for start, end in ranges:
+        part_header = (
+            f"--{boundary}\r\nContent-Type: {media_type}\r\nContent-Range: {content_range(start, end, size)}\r\n\r\n"
+        ).encode("ascii")
+        parts.append((part_header, start, end))
+        length += len(part_header) + (end - start + 1) + 2
+    closing = f"--{boundary}--\r\n".encode("ascii")
+    length += len(closing)
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(
+        _iter_multipart(path, parts, closing),
+        status_code=206,
+        media_type=f"multipart/byteranges; boundary={boundary}",
+        headers=headers,
+    )
 
 
-@router.get("/download/{artifact_ref}")
-async def download_artifact(artifact_ref: str) -> FileResponse:
+@router.api_route("/download/{artifact_ref}", methods=["GET", "HEAD"], response_model=None)
+async def download_artifact(artifact_ref: str, request: Request, digest: str | None = None) -> Response:
     file_path = ARTIFACTS_DIR / str(artifact_ref)
     if not file_path.exists() or not file_path.is_file():
         raise HTTPException(status_code=404, detail="Artifact not found")
-    return FileResponse(str(file_path), filename=artifact_ref)
+    # Hashing multi-megabyte bundles must not block the event loop; results are cached per (size, mtime).
+    sha256 = await asyncio.to_thread(get_digest_cache().digest, file_path)
+    if digest is not None and digest.lower() != sha256:
+        raise HTTPException(status_code=404, detail="Artifact digest mismatch")
+    get_artifact_index().touch(artifact_ref, sha256=sha256)
+    stat = file_path.stat()
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        # Digest-addressed URLs can never change content; plain URLs must revalidate.
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if digest is not None else REVALIDATE_CACHE_CONTROL,
+    }
+    media_type = artifact_media_type(artifact_ref)
+    range_header = request.headers.get("range")
+    if is_compressible(artifact_ref):
+        headers["Vary"] = "Accept-Encoding"
+        compressor = get_artifact_compressor()
+        if compressor.needs_variants(sha256):
+            compressor.schedule(file_path)
+        # Ranges are always answered from the identity representation.
+        encoding = (
+            None if range_header else negotiate_encoding(request.headers.get("accept-encoding"), available_encodings())
+        )
+        variant = find_variant(sha256, encoding) if encoding else None
+        if encoding and variant is not None:
+            headers["ETag"] = strong_etag(f"{sha256}-{encoding}")
+            headers["Content-Encoding"] = encoding
+            if if_none_match_matches(request.headers.get("if-none-match"), headers["ETag"]):
+                return Response(status_code=304, headers=headers)
+            return FileResponse(str(variant), filename=artifact_ref, media_type=media_type, headers=headers)
+    etag = strong_etag(sha256)
+    headers["ETag"] = etag
+    if if_none_match_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if range_header and if_range_matches(request.headers.get("if-range"), etag):
+        try:
+            ranges = parse_range_header(range_header, stat.st_size)
+        except RangeNotSatisfiableError as exc:
+            headers["Content-Range"] = f"bytes */{exc.size}"
+            return Response(status_code=416, headers=headers)
+        if ranges is not None:
+            return _range_response(file_path, ranges, stat.st_size, media_type, headers)
+    return FileResponse(str(file_path), filename=artifact_ref, media_type=media_type, headers=headers)
@@ -1,20 +1,64 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import heapq
+import json
+from collections.abc import AsyncIterator
 from pathlib import Path
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 
+from core.lifecycle.models import NodeLifecycleState
+from core.nodes.changes import NodeFeed
 from core.nodes.models import (
+    NodeBulkCreateRequest,
+    NodeBulkFailure,
+    NodeBulkLifecycleRequest,
+    NodeBulkResponse,
+    NodeBulkUpdateRequest,
     NodeCreateRequest,
     NodeLifecycleUpdateRequest,
     NodeResponse,
+    NodeType,
     NodeUpdateRequest,
+    NodeWatchResponse,
 )
-from core.nodes.registry import NodeRecord, NodeRegistry, get_node_registry
+from core.nodes.registry import (
+    BulkFailure,
+    BulkFailureReason,
+    NodeRecord,
+    NodeRegistry,
+    NodeVersionConflictError,
+    get_node_registry,
+)
+from core.nodes.transitions import LifecycleTransitionError
 
 router = APIRouter(prefix="/api/nodes", tags=["nodes"])
 
+NodeSort = Literal["node_id", "last_updated"]
+# A cursor without an explicit limit pages this many nodes at a time.
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# What ?compact=true returns when no fields are named: enough to draw a fleet table.
+COMPACT_FIELDS = ("node_id", "node_type", "lifecycle_state", "last_updated")
+NODE_FIELDS = tuple(NodeResponse.model_fields)
+# Watchers re-read the registry at least this often, which is how changes made by other workers reach them.
+WATCH_POLL_SECONDS = 1.0
+MAX_WATCH_TIMEOUT_SECONDS = 60.0
+SSE_KEEPALIVE_SECONDS = 15.0
+
+_BULK_FAILURES: dict[BulkFailureReason, tuple[int, str]] = {
+    "not_found": (404, "Node not found"),
+    "exists": (409, "Node already exists"),
+    "duplicate": (409, "Node appears more than once in the request"),
+    "not_allowed": (409, "Lifecycle transition not allowed"),
+    "state_mismatch": (409, "Node is not in the expected state"),
+}
+
 
 def _get_registry() -> NodeRegistry:
     return get_node_registry()
@@ -24,31 +68,309 @@ def _record_to_response(record: NodeRecord) -> NodeResponse:
     return record.to_response()
 
 
+def _parse_metadata_filters(filters: list[str]) -> dict[str, str]:
+    parsed: dict[str, str] = {}
+    for item in filters:
+        key, sep, value = item.partition("=")
+        if not sep or not key:
+            raise HTTPException(status_code=400, detail=f"Invalid metadata filter: {item!r} (expected key=value)")
+        parsed[key] = value
+    return parsed
+
+
+def _sort_key(record: NodeRecord, sort: NodeSort) -> tuple[Any, str]:
+    # node_id breaks last_updated ties, so the order is total and cursors are stable.
+    if sort == "last_updated":
+        return record.last_updated.timestamp(), record.node_id
+    return record.node_id, ""
+
+
+def _encode_cursor(sort: NodeSort, descending: bool, key: tuple[Any, str]) -> str:
+    raw = json.dumps([sort, descending, *key], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: NodeSort, descending: bool) -> tuple[Any, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_desc, value, node_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Malformed cursor") from exc
+    if cursor_sort != sort or cursor_desc != descending:
+        raise HTTPException(status_code=400, detail="Cursor was issued for a different sort order")
+    if not isinstance(value, (int, float) if sort == "last_updated" else str):
+        raise HTTPException(status_code=400, detail="Malformed cursor")
+    return value, str(node_id)
+
+
+def _page(
+    records: list[NodeRecord], sort: NodeSort, descending: bool, limit: int, after: tuple[Any, str] | None
+) -> tuple[list[NodeRecord], tuple[Any, str] | None]:
+    """One page past ``after`` plus the key to resume from; O(n log limit) rather than a full sort."""
+
+    def key(record: NodeRecord) -> tuple[Any, str]:
+        return _sort_key(record, sort)
+
+    if after is not None:
+        records = [record for record in records if (key(record) < after if descending else key(record) > after)]
+    pick = heapq.nlargest if descending else heapq.nsmallest
+    page = pick(limit + 1, records, key=key)
+    if len(page) > limit:
+        return page[:limit], key(page[limit - 1])
+    return page, None
+
+
+def _parse_fields(fields: str | None, compact: bool) -> tuple[str, ...]:
+    if not fields:
+        return COMPACT_FIELDS if compact else NODE_FIELDS
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(names) - set(NODE_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    # node_id always comes back so projected rows stay addressable.
+    return ("node_id", *(name for name in NODE_FIELDS if name in names and name != "node_id"))
+
+
+def _record_fields(record: NodeRecord, fields: tuple[str, ...]) -> dict[str, Any]:
+    """``NodeResponse``'s JSON form for the requested fields, built without model validation."""
+    row: dict[str, Any] = {}
+    for name in fields:
+        value = getattr(record, name)
+        if name in ("node_type", "lifecycle_state"):
+            value = value.value
+        elif name == "last_updated":
+            value = value.isoformat() if value is not None else None
+        row[name] = value
+    return row
+
+
 @router.get("", response_model=list[NodeResponse])
-async def list_nodes(
+def list_nodes(
+    node_type: NodeType | None = Query(None, alias="type"),
+    state: NodeLifecycleState | None = Query(None),
+    capability: list[str] = Query([]),
+    metadata: list[str] = Query([], description="key=value; repeat to require several"),
+    sort: NodeSort = "node_id",
+    order: Literal["asc", "desc"] = "asc",
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: str | None = Query(None, description="Comma-separated NodeResponse fields to return"),
+    compact: bool = False,
+    registry: NodeRegistry = Depends(_get_registry),
+) -> JSONResponse:
+    """List nodes, optionally filtered, paged and projected.
+
+    The body stays a plain list; when more nodes follow, the cursor for the
+    next page is in the ``X-Next-Cursor`` header.
+    """
+    filters = _parse_metadata_filters(metadata)
+    selected = _parse_fields(fields, compact)
+    descending = order == "desc"
+    after = _decode_cursor(cursor, sort, descending) if cursor else None
+    if node_type is None and state is None and not capability and not filters:
+        records = registry.list_nodes()
+    else:
+        records = registry.find_nodes(node_type=node_type, state=state, capabilities=capability, metadata=filters)
+    headers: dict[str, str] = {}
+    if limit is None and after is None:
+        records = sorted(records, key=lambda record: _sort_key(record, sort), reverse=descending)
+    else:
+        records, next_key = _page(records, sort, descending, limit or DEFAULT_PAGE_SIZE, after)
+        if next_key is not None:
+            headers[NEXT_CURSOR_HEADER] = _encode_cursor(sort, descending, next_key)
+    return JSONResponse([_record_fields(record, selected) for record in records], headers=headers)
+
+
+async def _wait_for_feed(registry: NodeRegistry, since: int | None, timeout: float) -> NodeFeed:
+    """The registry feed after ``since``, waiting up to ``timeout`` seconds for something to arrive."""
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+
+    def on_change() -> None:
+        # Registry changes may come from worker threads (e.g. install completion callbacks).
+        loop.call_soon_threadsafe(wake.set)
+
+    unsubscribe = registry.subscribe(on_change)
+    deadline = loop.time() + timeout
+    try:
+        while True:
+            wake.clear()
+            # Reading may query the shared database; keep that off the event loop.
+            feed = await asyncio.to_thread(registry.feed, since)
+            remaining = deadline - loop.time()
+            if feed.events or feed.snapshot is not None or remaining <= 0:
+                return feed
+            try:
+                await asyncio.wait_for(wake.wait(), min(remaining, WATCH_POLL_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        unsubscribe()
+
+
+def _feed_body(feed: NodeFeed, fields: tuple[str, ...]) -> dict[str, Any]:
+    return {
+        "rev": feed.rev,
+        "events": [
+            {"rev": change.rev, "kind": change.kind, "node": _record_fields(change.record, fields)}
+            for change in feed.events
+        ],
+        "snapshot": None if feed.snapshot is None else [_record_fields(record, fields) for record in feed.snapshot],
+    }
+
+
+@router.get("/watch", response_model=NodeWatchResponse)
+async def watch_nodes(
+    since: int | None = Query(None, ge=0, description="Last revision seen; omit to start from a snapshot"),
+    timeout: float = Query(30.0, ge=0, le=MAX_WATCH_TIMEOUT_SECONDS),
+    fields: str | None = Query(None, description="Comma-separated NodeResponse fields to return"),
+    compact: bool = False,
+    registry: NodeRegistry = Depends(_get_registry),
+) -> JSONResponse:
+    """Long-poll for node changes after ``since``.
+
+    Returns as soon as there are changes, or empty-handed after ``timeout``.
+    When the requested revision has been compacted out of the change log the
+    response carries a ``snapshot`` of every node instead; resume from ``rev``.
+    """
+    selected = _parse_fields(fields, compact)
+    feed = await _wait_for_feed(registry, since, timeout)
+    return JSONResponse(_feed_body(feed, selected))
+
+
+@router.get("/watch/stream")
+async def stream_node_changes(
+    since: int | None = Query(None, ge=0),
+    fields: str | None = Query(None, description="Comma-separated NodeResponse fields to return"),
+    compact: bool = False,
+    last_event_id: str | None = Header(default=None),
+    registry: NodeRegistry = Depends(_get_registry),
+) -> StreamingResponse:
+    """Server-sent events: a ``snapshot`` event when needed, then one ``change`` event per revision."""
+    selected = _parse_fields(fields, compact)
+    # EventSource reconnects send Last-Event-ID, which resumes after the last revision delivered.
+    cursor = int(last_event_id) if last_event_id and last_event_id.isdigit() else since
+
+    async def events() -> AsyncIterator[str]:
+        nonlocal cursor
+        while True:
+            feed = await _wait_for_feed(registry, cursor, SSE_KEEPALIVE_SECONDS)
+            if feed.snapshot is not None:
+                payload = json.dumps([_record_fields(record, selected) for record in feed.snapshot])
+                yield f"id: {feed.rev}\nevent: snapshot\ndata: {payload}\n\n"
+            elif not feed.events:
+                yield ": keepalive\n\n"
+            for change in feed.events:
+                payload = json.dumps({"kind": change.kind, "node": _record_fields(change.record, selected)})
+                yield f"id: {change.rev}\nevent: change\ndata: {payload}\n\n"
+            cursor = feed.rev
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+def _bulk_response(total: int, failures: list[BulkFailure], atomic: bool) -> NodeBulkResponse:
+    failed = [
+        NodeBulkFailure(
+            index=failure.index,
+            node_id=failure.node_id,
+            status=_BULK_FAILURES[failure.reason][0],
+            detail=_BULK_FAILURES[failure.reason][1],
+        )
+        for failure in failures
+    ]
+    if failed and atomic:
+        # Nothing was applied; the body still lists every item that blocked the batch.
+        raise HTTPException(status_code=409, detail=NodeBulkResponse(applied=0, failed=failed).model_dump(mode="json"))
+    return NodeBulkResponse(applied=total - len(failed), failed=failed)
+
+
+# Bulk handlers are plain functions: FastAPI runs them in its threadpool, so holding every
+# registry lock for up to MAX_BULK_OPERATIONS items never stalls the event loop.
+@router.post("/bulk/create", response_model=NodeBulkResponse)
+def bulk_create_nodes(
+    payload: NodeBulkCreateRequest,
+    registry: NodeRegistry = Depends(_get_registry),
+) -> NodeBulkResponse:
+    records = [
+        NodeRecord(
+            node_id=item.node_id,
+            node_type=item.node_type,
+            capabilities=item.capabilities,
+            artifact_ref=item.artifact_ref,
+            metadata=item.metadata,
+        )
+        for item in payload.nodes
+    ]
+    return _bulk_response(len(records), registry.register_many(records, payload.atomic), payload.atomic)
+
+
+@router.post("/bulk/update", response_model=NodeBulkResponse)
+def bulk_update_nodes(
+    payload: NodeBulkUpdateRequest,
+    registry: NodeRegistry = Depends(_get_registry),
+) -> NodeBulkResponse:
+    updates = [
+        (item.node_id, item.model_dump(include={"capabilities", "artifact_ref", "metadata"}, exclude_none=True))
+        for item in payload.updates
+    ]
+    return _bulk_response(len(updates), registry.update_many(updates, payload.atomic), payload.atomic)
+
+
+@router.post("/bulk/lifecycle", response_model=NodeBulkResponse)
+def bulk_update_node_lifecycle(
+    payload: NodeBulkLifecycleRequest,
     registry: NodeRegistry = Depends(_get_registry),
-) -> list[NodeResponse]:
-    return [_record_to_response(record) for record in registry.list_nodes()]
+) -> NodeBulkResponse:
+    transitions = [(item.node_id, item.state, item.expected_state) for item in payload.transitions]
+    return _bulk_response(len(transitions), registry.set_lifecycle_many(transitions, payload.atomic), payload.atomic)
+
+
+def _etag(record: NodeRecord) -> str:
+    return f'"{record.version}"'
+
+
+def _expected_version(registry: NodeRegistry, node_id: str, if_match: str | None) -> int | None:
+    """The version an ``If-Match`` header pins a write to; 412 when it names none of the current ETags."""
+    if if_match is None or if_match.strip() == "*":
+        # "*" only asks that the node exist, which the write checks anyway.
+        return None
+    tags = {tag.strip() for tag in if_match.split(",")}
+    record = registry.get_node(node_id)
+    if record is not None and _etag(record) not in tags:
+        # The client may have read a newer version through another worker.
+        registry.sync()
+        record = registry.get_node(node_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Node not found")
+    # Strong comparison: weak validators never satisfy If-Match.
+    if _etag(record) not in tags:
+        raise HTTPException(status_code=412, detail="Node has changed")
+    return record.version
+
+
+def _versioned_response(record: NodeRecord, response: Response) -> NodeResponse:
+    response.headers["ETag"] = _etag(record)
+    return _record_to_response(record)
 
 
 @router.get("/{node_id}", response_model=NodeResponse)
-async def get_node(
+def get_node(
     node_id: str,
+    response: Response,
     registry: NodeRegistry = Depends(_get_registry),
 ) -> NodeResponse:
     record = registry.get_node(node_id)
     if record is None:
         raise HTTPException(status_code=404, detail="Node not found")
-    return _record_to_response(record)
+    return _versioned_response(record, response)
 
 
 @router.post("", response_model=NodeResponse, status_code=201)
-async def create_node(
+def create_node(
     payload: NodeCreateRequest,
+    response: Response,
     registry: NodeRegistry = Depends(_get_registry),
 ) -> NodeResponse:
-    if registry.get_node(payload.node_id) is not None:
-        raise HTTPException(status_code=409, detail="Node already exists")
     record = NodeRecord(
         node_id=payload.node_id,
         node_type=payload.node_type,
@@ -56,41 +378,55 @@ async def create_node(
         artifact_ref=payload.artifact_ref,
         metadata=payload.metadata,
     )
-    registry.register(record)
-    return _record_to_response(record)
+    # Checked and registered under the registry's locks, so two creates cannot both succeed.
+    if registry.register_many([record], atomic=True):
+        raise HTTPException(status_code=409, detail="Node already exists")
+    return _versioned_response(record, response)
 
 
 @router.patch("/{node_id}", response_model=NodeResponse)
-async def update_node(
+def update_node(
     node_id: str,
     payload: NodeUpdateRequest,
+    response: Response,
+    if_match: str | None = Header(default=None),
     registry: NodeRegistry = Depends(_get_registry),
 ) -> NodeResponse:
+    expected_version = _expected_version(registry, node_id, if_match)
     try:
-        updates: dict[str, object] = {}
-        if payload.capabilities is not None:
-            updates["capabilities"] = payload.capabilities
-        if payload.artifact_ref is not None:
-            updates["artifact_ref"] = payload.artifact_ref
-        if payload.metadata is not None:
-            updates["metadata"] = payload.metadata
-        record = registry.update(node_id, **updates)
+        # None fields are left unchanged by update().
+        record = registry.update(
+            node_id,
+            expected_version=expected_version,
+            capabilities=payload.capabilities,
+            artifact_ref=payload.artifact_ref,
+            metadata=payload.metadata,
+        )
     except KeyError as exc:
         raise HTTPException(status_code=404, detail="Node not found") from exc
-    return _record_to_response(record)
+    except NodeVersionConflictError as exc:
+        raise HTTPException(status_code=412, detail="Node has changed") from exc
+    return _versioned_response(record, response)
 
 
 @router.post("/{node_id}/lifecycle", response_model=NodeResponse)
-async def update_node_lifecycle(
+def update_node_lifecycle(
     node_id: str,
     payload: NodeLifecycleUpdateRequest,
+    response: Response,
+    if_match: str | None = Header(default=None),
     registry: NodeRegistry = Depends(_get_registry),
 ) -> NodeResponse:
+    expected_version = _expected_version(registry, node_id, if_match)
     try:
-        record = registry.set_lifecycle(node_id, payload.state)
+        record = registry.set_lifecycle(node_id, payload.state, payload.expected_state, expected_version)
     except KeyError as exc:
         raise HTTPException(status_code=404, detail="Node not found") from exc
-    return _record_to_response(record)
+    except LifecycleTransitionError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except NodeVersionConflictError as exc:
+        raise HTTPException(status_code=412, detail="Node has changed") from exc
+    return _versioned_response(record, response)
 
 
 @router.get("/{node_id}/artifacts/{artifact_path:path}")
@@ -1,19 +1,33 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import zipfile
+from collections.abc import AsyncIterator
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+import httpx
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from core.nodes.models import NodeType
 from core.nodes.registry import NodeRecord, NodeRegistry, get_node_registry
+from core.panel.models import PanelLifecycleSnapshot
 from roundhouse import load_settings
 from roundhouse.services.panel_desktop import (
+    InstallConflictError,
     PanelDesktopInstallResult,
     PanelDesktopManager,
     PanelDesktopProcessStatus,
+    PanelInstallJob,
     get_panel_desktop_manager,
 )
+from roundhouse.services.panel_logs import LogLine, LogRing
+from roundhouse.services.panel_metrics import ProcessSample
+from roundhouse.services.panel_snapshots import PanelSnapshotStore, get_panel_snapshot_store
+from roundhouse.services.panel_supervisor import RestartMode, RestartPolicy
+from roundhouse.services.release_metadata import ReleaseMetadata, ReleaseMetadataError
 
 router = APIRouter(prefix="/api/panel", tags=["panel"])
 
@@ -24,6 +38,7 @@ class PanelDesktopInstallRequest(BaseModel):
     tag: str = Field(..., description="Release tag, e.g. v1.2.3")
     asset_name: str = Field(..., description="Release asset filename")
     asset_url: str | None = Field(default=None, description="Optional direct download URL")
+    sha256: str | None = Field(default=None, description="Expected sha256 of the asset; defaults to GitHub's digest")
 
 
 class PanelDesktopInstallResponse(BaseModel):
@@ -33,9 +48,59 @@ class PanelDesktopInstallResponse(BaseModel):
     asset_name: str
 
 
+class PanelInstallJobResponse(BaseModel):
+    job_id: str
+    node_id: str
+    repo: str
+    tag: str
+    asset_name: str
+    state: str
+    bytes_downloaded: int
+    bytes_total: int | None
+    files_extracted: int
+    files_linked: int
+    files_total: int | None
+    cache_hit: bool
+    sha256: str | None
+    error: str | None
+    created_at: str
+    finished_at: str | None
+    install_dir: str | None
+
+
+class PanelReleasePrewarmRequest(BaseModel):
+    repo: str = Field(..., description="GitHub repo: owner/name")
+    tags: list[str] = Field(..., min_length=1, max_length=100)
+
+
+class PanelReleasePrewarmResult(BaseModel):
+    tag: str
+    found: bool
+    status_code: int | None
+    assets: list[str]
+    error: str | None = None
+
+
 class PanelDesktopStartRequest(BaseModel):
     node_id: str
     executable_name: str = Field(default="", description="Executable filename")
+    restart: RestartMode = Field(default="on-failure", description="When to restart the panel after it exits")
+    max_restarts: int | None = Field(default=10, ge=0, description="Consecutive restarts before giving up")
+
+
+class PanelProcessSampleResponse(BaseModel):
+    timestamp: float
+    pid: int
+    cpu_seconds: float
+    rss_bytes: int
+    open_fds: int | None
+    threads: int
+
+
+class PanelProcessMetricsResponse(BaseModel):
+    node_id: str
+    cpu_percent: float | None
+    samples: list[PanelProcessSampleResponse]
 
 
 class PanelDesktopStatusResponse(BaseModel):
@@ -45,21 +110,92 @@ class PanelDesktopStatusResponse(BaseModel):
     started_at: str | None
     executable: str | None
     return_code: int | None
+    state: str
+    restarts: int
+    next_restart_at: str | None
+    error: str | None
+    metrics: PanelProcessSampleResponse | None = None
+    cpu_percent: float | None = None
+    last_log: str | None = None
+
+
+class PanelLogLineResponse(BaseModel):
+    seq: int
+    timestamp: float
+    stream: str
+    text: str
 
 
 class PanelDesktopStopRequest(BaseModel):
     node_id: str
 
 
+class PanelDesktopBatchStartRequest(BaseModel):
+    node_ids: list[str] = Field(..., min_length=1, max_length=1000)
+    executable_name: str = Field(default="", description="Executable filename")
+    restart: RestartMode = Field(default="on-failure", description="When to restart the panel after it exits")
+    max_restarts: int | None = Field(default=10, ge=0, description="Consecutive restarts before giving up")
+
+
+class PanelDesktopBatchStopRequest(BaseModel):
+    node_ids: list[str] = Field(..., min_length=1, max_length=1000)
+
+
+class PanelDesktopBatchResult(BaseModel):
+    node_id: str
+    status: PanelDesktopStatusResponse | None = None
+    error: str | None = None
+
+
+class PanelSnapshotSample(BaseModel):
+    env_id: str
+    state: str
+    transport_connected: bool
+    accepting_ingress: bool
+    ui_ready: bool
+    last_log: str | None = None
+    timestamp: float | None = Field(default=None, description="Unix seconds; defaults to receipt time")
+
+
+class PanelSnapshotIngestResponse(BaseModel):
+    accepted: int
+    rejected: int
+
+
+class PanelSnapshotStatsResponse(BaseModel):
+    env_id: str
+    samples: int
+    transport_ratio: float | None
+    ingress_ratio: float | None
+    ui_ready_ratio: float | None
+    first_seen: float | None
+    last_seen: float | None
+
+
 def _get_registry() -> NodeRegistry:
     return get_node_registry()
 
 
+def _get_snapshot_store() -> PanelSnapshotStore:
+    return get_panel_snapshot_store()
+
+
 def _get_manager() -> PanelDesktopManager:
     settings = load_settings()
     return get_panel_desktop_manager(settings)
 
 
+def _sample_response(sample: ProcessSample) -> PanelProcessSampleResponse:
+    return PanelProcessSampleResponse(
+        timestamp=sample.timestamp,
+        pid=sample.pid,
+        cpu_seconds=sample.cpu_seconds,
+        rss_bytes=sample.rss_bytes,
+        open_fds=sample.open_fds,
+        threads=sample.threads,
+    )
+
+
 def _status_response(status: PanelDesktopProcessStatus) -> PanelDesktopStatusResponse:
     return PanelDesktopStatusResponse(
         node_id=status.node_id,
@@ -68,41 +204,114 @@ def _status_response(status: PanelDesktopProcessStatus) -> PanelDesktopStatusRes
         started_at=status.started_at.isoformat() if status.started_at else None,
         executable=status.executable,
         return_code=status.return_code,
+        state=status.state,
+        restarts=status.restarts,
+        next_restart_at=status.next_restart_at.isoformat() if status.next_restart_at else None,
+        error=status.error,
+        metrics=_sample_response(status.metrics) if status.metrics else None,
+        cpu_percent=status.cpu_percent,
+        last_log=status.last_log,
     )
 
 
-@router.post("/desktop/install", response_model=PanelDesktopInstallResponse)
-async def install_desktop_panel(
-    payload: PanelDesktopInstallRequest,
-    manager: PanelDesktopManager = Depends(_get_manager),
-    registry: NodeRegistry = Depends(_get_registry),
-) -> PanelDesktopInstallResponse:
+def _log_line_response(line: LogLine) -> PanelLogLineResponse:
+    return PanelLogLineResponse(seq=line.seq, timestamp=line.timestamp, stream=line.stream, text=line.text)
+
+
+def _log_ring(manager: PanelDesktopManager, node_id: str) -> LogRing:
+    ring = manager.logs(node_id)
+    if ring is None:
+        raise HTTPException(status_code=404, detail="No output captured for this node")
+    return ring
+
+
+def _batch_results(
+    node_ids: list[str], outcomes: list[PanelDesktopProcessStatus | BaseException]
+) -> list[PanelDesktopBatchResult]:
+    return [
+        PanelDesktopBatchResult(node_id=node_id, status=_status_response(outcome))
+        if isinstance(outcome, PanelDesktopProcessStatus)
+        else PanelDesktopBatchResult(node_id=node_id, error=str(outcome) or type(outcome).__name__)
+        for node_id, outcome in zip(node_ids, outcomes)
+    ]
+
+
+def _job_response(job: PanelInstallJob) -> PanelInstallJobResponse:
+    return PanelInstallJobResponse(
+        job_id=job.job_id,
+        node_id=job.node_id,
+        repo=job.repo,
+        tag=job.tag,
+        asset_name=job.asset_name,
+        state=job.state,
+        bytes_downloaded=job.bytes_downloaded,
+        bytes_total=job.bytes_total,
+        files_extracted=job.files_extracted,
+        files_linked=job.files_linked,
+        files_total=job.files_total,
+        cache_hit=job.cache_hit,
+        sha256=job.sha256,
+        error=job.error,
+        created_at=job.created_at.isoformat(),
+        finished_at=job.finished_at.isoformat() if job.finished_at else None,
+        install_dir=job.result.install_dir if job.result else None,
+    )
+
+
+def _record_install(registry: NodeRegistry, result: PanelDesktopInstallResult) -> None:
+    # Runs in a worker thread once the install task finishes (the registry write is blocking);
+    # merge rather than read-modify-write so concurrent edits survive.
+    metadata: dict[str, Any] = {"runtime_type": "desktop", "version": result.version}
+    while True:
+        try:
+            registry.update(result.node_id, artifact_ref=result.install_dir, merge_metadata=metadata)
+            return
+        except KeyError:
+            pass
+        record = NodeRecord(
+            node_id=result.node_id,
+            node_type=NodeType.FRONTEND,
+            artifact_ref=result.install_dir,
+            metadata=metadata,
+        )
+        # Fails only if someone registered the node since; then merge into theirs.
+        if not registry.register_many([record], atomic=True):
+            return
+
+
+def _submit_install(
+    payload: PanelDesktopInstallRequest, manager: PanelDesktopManager, registry: NodeRegistry
+) -> PanelInstallJob:
     try:
-        result = manager.install_from_release(
+        return manager.submit_install(
             node_id=payload.node_id,
             repo=payload.repo,
             tag=payload.tag,
             asset_name=payload.asset_name,
             asset_url=payload.asset_url,
+            sha256=payload.sha256,
+            on_complete=lambda result: _record_install(registry, result),
         )
+    except InstallConflictError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.post("/desktop/install", response_model=PanelDesktopInstallResponse)
+async def install_desktop_panel(
+    payload: PanelDesktopInstallRequest,
+    manager: PanelDesktopManager = Depends(_get_manager),
+    registry: NodeRegistry = Depends(_get_registry),
+) -> PanelDesktopInstallResponse:
+    job = _submit_install(payload, manager, registry)
+    try:
+        result = await manager.wait_for_install(job)
     except (ValueError, FileNotFoundError) as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-    record = registry.get_node(payload.node_id)
-    metadata: dict[str, Any] = {}
-    if record is not None:
-        metadata = dict(record.metadata)
-    metadata.update({"runtime_type": "desktop", "version": result.version})
-    if record is None:
-        registry.register(
-            NodeRecord(
-                node_id=payload.node_id,
-                node_type=NodeType.FRONTEND,
-                artifact_ref=result.install_dir,
-                metadata=metadata,
-            )
-        )
-    else:
-        registry.update(payload.node_id, artifact_ref=result.install_dir, metadata=metadata)
+    except (httpx.HTTPError, ReleaseMetadataError, zipfile.BadZipFile) as exc:
+        # A corrupt archive is the upstream's fault, like a failed download.
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
     return PanelDesktopInstallResponse(
         node_id=result.node_id,
         install_dir=result.install_dir,
@@ -111,14 +320,66 @@ async def install_desktop_panel(
     )
 
 
+@router.post("/desktop/install-jobs", response_model=PanelInstallJobResponse, status_code=202)
+async def submit_desktop_install(
+    payload: PanelDesktopInstallRequest,
+    manager: PanelDesktopManager = Depends(_get_manager),
+    registry: NodeRegistry = Depends(_get_registry),
+) -> PanelInstallJobResponse:
+    return _job_response(_submit_install(payload, manager, registry))
+
+
+@router.get("/desktop/install-jobs", response_model=list[PanelInstallJobResponse])
+async def list_desktop_installs(
+    node_id: str | None = None,
+    manager: PanelDesktopManager = Depends(_get_manager),
+) -> list[PanelInstallJobResponse]:
+    return [_job_response(job) for job in manager.install_jobs(node_id)]
+
+
+@router.get("/desktop/install-jobs/{job_id}", response_model=PanelInstallJobResponse)
+async def get_desktop_install(
+    job_id: str,
+    manager: PanelDesktopManager = Depends(_get_manager),
+) -> PanelInstallJobResponse:
+    job = manager.install_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Install job not found")
+    return _job_response(job)
+
+
+@router.post("/desktop/releases/prewarm", response_model=list[PanelReleasePrewarmResult])
+async def prewarm_desktop_releases(
+    payload: PanelReleasePrewarmRequest,
+    manager: PanelDesktopManager = Depends(_get_manager),
+) -> list[PanelReleasePrewarmResult]:
+    results: list[PanelReleasePrewarmResult] = []
+    for tag, outcome in zip(payload.tags, await manager.prewarm_releases(payload.repo, payload.tags)):
+        if isinstance(outcome, ReleaseMetadata):
+            results.append(
+                PanelReleasePrewarmResult(
+                    tag=tag,
+                    found=outcome.found,
+                    status_code=outcome.status_code,
+                    assets=[str(asset.get("name")) for asset in outcome.assets],
+                )
+            )
+        else:
+            results.append(
+                PanelReleasePrewarmResult(tag=tag, found=False, status_code=None, assets=[], error=str(outcome))
+            )
+    return results
+
+
 @router.post("/desktop/start", response_model=PanelDesktopStatusResponse)
 async def start_desktop_panel(
     payload: PanelDesktopStartRequest,
     manager: PanelDesktopManager = Depends(_get_manager),
 ) -> PanelDesktopStatusResponse:
+    policy = RestartPolicy(mode=payload.restart, max_restarts=payload.max_restarts)
     try:
-        status = manager.start(payload.node_id, payload.executable_name)
-    except (ValueError, FileNotFoundError) as exc:
+        status = await manager.start(payload.node_id, payload.executable_name, policy)
+    except (ValueError, OSError) as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     return _status_response(status)
 
@@ -128,10 +389,28 @@ async def stop_desktop_panel(
     payload: PanelDesktopStopRequest,
     manager: PanelDesktopManager = Depends(_get_manager),
 ) -> PanelDesktopStatusResponse:
-    status = manager.stop(payload.node_id)
+    status = await manager.stop(payload.node_id)
     return _status_response(status)
 
 
+@router.post("/desktop/start-batch", response_model=list[PanelDesktopBatchResult])
+async def start_desktop_panels(
+    payload: PanelDesktopBatchStartRequest,
+    manager: PanelDesktopManager = Depends(_get_manager),
+) -> list[PanelDesktopBatchResult]:
+    policy = RestartPolicy(mode=payload.restart, max_restarts=payload.max_restarts)
+    outcomes = await manager.start_many([(node_id, payload.executable_name) for node_id in payload.node_ids], policy)
+    return _batch_results(payload.node_ids, outcomes)
+
+
+@router.post("/desktop/stop-batch", response_model=list[PanelDesktopBatchResult])
+async def stop_desktop_panels(
+    payload: PanelDesktopBatchStopRequest,
+    manager: PanelDesktopManager = Depends(_get_manager),
+) -> list[PanelDesktopBatchResult]:
+    return _batch_results(payload.node_ids, await manager.stop_many(payload.node_ids))
+
+
 @router.get("/desktop/status/{node_id}", response_model=PanelDesktopStatusResponse)
 async def status_desktop_panel(
     node_id: str,
@@ -139,3 +418,118 @@ async def status_desktop_panel(
 ) -> PanelDesktopStatusResponse:
     status = manager.status(node_id)
     return _status_response(status)
+
+
+@router.get("/desktop/metrics", response_model=list[PanelProcessMetricsResponse])
+async def desktop_panel_metrics(
+    node_id: list[str] | None = Query(default=None),
+    limit: int = Query(default=60, ge=1, le=10000),
+    manager: PanelDesktopManager = Depends(_get_manager),
+) -> list[PanelProcessMetricsResponse]:
+    responses: list[PanelProcessMetricsResponse] = []
+    for current in node_id or manager.metrics_node_ids():
+        samples = manager.metrics(current, limit)
+        responses.append(
+            PanelProcessMetricsResponse(
+                node_id=current,
+                cpu_percent=manager.status(current).cpu_percent,
+                samples=[_sample_response(sample) for sample in samples],
+            )
+        )
+    return responses
+
+
+@router.get("/desktop/snapshot/{node_id}")
+async def desktop_panel_snapshot(
+    node_id: str,
+    manager: PanelDesktopManager = Depends(_get_manager),
+) -> dict[str, Any]:
+    return manager.lifecycle_snapshot(node_id).to_dict()
+
+
+@router.get("/desktop/logs/{node_id}", response_model=list[PanelLogLineResponse])
+async def tail_desktop_panel_logs(
+    node_id: str,
+    lines: int = Query(default=200, ge=1, le=10000),
+    since: int | None = Query(default=None, ge=0, description="Only lines with a greater seq"),
+    manager: PanelDesktopManager = Depends(_get_manager),
+) -> list[PanelLogLineResponse]:
+    return [_log_line_response(line) for line in _log_ring(manager, node_id).tail(lines, since)]
+
+
+@router.get("/desktop/logs/{node_id}/stream")
+async def stream_desktop_panel_logs(
+    node_id: str,
+    since: int | None = Query(default=None, ge=0),
+    last_event_id: str | None = Header(default=None),
+    manager: PanelDesktopManager = Depends(_get_manager),
+) -> StreamingResponse:
+    ring = _log_ring(manager, node_id)
+    # EventSource reconnects send Last-Event-ID, which resumes after the last line delivered.
+    cursor = int(last_event_id) if last_event_id and last_event_id.isdigit() else since
+
+    async def events() -> AsyncIterator[str]:
+        async for line in ring.follow(cursor):
+            payload = json.dumps({"timestamp": line.timestamp, "text": line.text})
+            yield f"id: {line.seq}\nevent: {line.stream}\ndata: {payload}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.post("/snapshots", response_model=PanelSnapshotIngestResponse, status_code=202)
+async def ingest_panel_snapshots(
+    samples: list[PanelSnapshotSample],
+    store: PanelSnapshotStore = Depends(_get_snapshot_store),
+) -> PanelSnapshotIngestResponse:
+    # Off the loop: the store's lock may be held briefly by its compactor thread.
+    accepted = await asyncio.to_thread(
+        store.record_many,
+        [
+            (
+                PanelLifecycleSnapshot(
+                    env_id=sample.env_id,
+                    state=sample.state,
+                    transport_connected=sample.transport_connected,
+                    accepting_ingress=sample.accepting_ingress,
+                    ui_ready=sample.ui_ready,
+                    last_log=sample.last_log,
+                ),
+                sample.timestamp,
+            )
+            for sample in samples
+        ],
+    )
+    # Samples older than the env's newest one are rejected; ingestion is append-only.
+    return PanelSnapshotIngestResponse(accepted=accepted, rejected=len(samples) - accepted)
+
+
+@router.get("/snapshots", response_model=list[PanelSnapshotStatsResponse])
+async def panel_snapshot_stats(
+    env_id: list[str] | None = Query(default=None),
+    start: float | None = Query(default=None, description="Unix seconds, inclusive"),
+    end: float | None = Query(default=None, description="Unix seconds, inclusive"),
+    store: PanelSnapshotStore = Depends(_get_snapshot_store),
+) -> list[PanelSnapshotStatsResponse]:
+    return [
+        PanelSnapshotStatsResponse(
+            env_id=stats.env_id,
+            samples=stats.samples,
+            transport_ratio=stats.transport_ratio,
+            ingress_ratio=stats.ingress_ratio,
+            ui_ready_ratio=stats.ui_ready_ratio,
+            first_seen=stats.first_seen,
+            last_seen=stats.last_seen,
+        )
+        for stats in await asyncio.to_thread(store.fleet_stats, env_id, start, end)
+    ]
+
+
+@router.get("/snapshots/{env_id}/latest")
+async def latest_panel_snapshot(
+    env_id: str,
+    store: PanelSnapshotStore = Depends(_get_snapshot_store),
+) -> dict[str, Any]:
+    snapshot = store.latest(env_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="No snapshots for this env")
+    return snapshot.to_dict()
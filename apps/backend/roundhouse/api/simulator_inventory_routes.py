@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
 
+from roundhouse.services.artifact_http import REVALIDATE_CACHE_CONTROL, if_none_match_matches
 from roundhouse.services.manifest_sync import (
     BuildManifest,
     ManifestError,
@@ -10,10 +12,23 @@ from roundhouse.services.manifest_sync import (
     get_manifest,
     get_manifest_sync_config,
 )
+from roundhouse.services.simulator_responses import (
+    RenderedResponse,
+    get_response_cache,
+    inventory_key,
+)
+from roundhouse.services.simulator_verifier import get_simulator_verifier
 
 router = APIRouter(prefix="/api/simulators", tags=["simulators"])
 
 
+def rendered_json_response(request: Request, rendered: RenderedResponse) -> Response:
+    headers = {"ETag": rendered.etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    if if_none_match_matches(request.headers.get("if-none-match"), rendered.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=rendered.body, media_type="application/json", headers=headers)
+
+
 class ManifestRefreshResponse(BaseModel):
     success: bool
     detail: str
@@ -26,11 +41,14 @@ async def refresh_manifest() -> ManifestRefreshResponse:
         return ManifestRefreshResponse(success=False, detail="Repository not configured")
     try:
         fetch_manifest_from_github(repo, release_tag, asset_name, token)
+        manifests = get_manifest(repo, release_tag, asset_name, token)
     except ManifestError as exc:
         raise HTTPException(
             status_code=exc.status_code,
             detail={"error": exc.code, "message": str(exc)},
         ) from exc
+    # Start hashing now so the next inventory request already has verified statuses.
+    get_simulator_verifier().verify_manifests(manifests)
     return ManifestRefreshResponse(success=True, detail="Manifest refreshed from GitHub")
 
 
@@ -47,8 +65,10 @@ class SimulatorInventoryItem(BaseModel):
     checksum: str
 
 
-@router.get("/inventory", response_model=list[SimulatorInventoryItem])
-async def get_simulator_inventory() -> list[SimulatorInventoryItem]:
+_inventory_adapter = TypeAdapter(list[SimulatorInventoryItem])
+
+
+def _render_inventory() -> bytes:
     repo, release_tag, asset_name, token = get_manifest_sync_config()
     try:
         manifests: list[BuildManifest] = get_manifest(repo, release_tag, asset_name, token)
@@ -63,12 +83,14 @@ async def get_simulator_inventory() -> list[SimulatorInventoryItem]:
             status_code=409,
             detail={"error": "MANIFEST_EMPTY", "message": "Manifest contains no artifacts"},
         )
+    verifier = get_simulator_verifier()
     items: list[SimulatorInventoryItem] = []
     for manifest in manifests:
         if not manifest.artifacts:
             continue
         for artifact in manifest.artifacts:
             artifact_type = manifest.platform or "unknown"
+            verification = verifier.lookup(artifact.filename, artifact.sha256)
             items.append(
                 SimulatorInventoryItem(
                     artifact_name=artifact.filename,
@@ -77,10 +99,16 @@ async def get_simulator_inventory() -> list[SimulatorInventoryItem]:
                     version=manifest.version,
                     release_tag=manifest.release_tag,
                     artifact_type=artifact_type,
-                    status="available",
-                    size_bytes=0,
-                    build_timestamp="",
+                    status=verification.status,
+                    size_bytes=verification.size_bytes,
+                    build_timestamp=verification.build_timestamp,
                     checksum=artifact.sha256 or "",
                 )
             )
-    return items
+    return _inventory_adapter.dump_json(items)
+
+
+@router.get("/inventory", response_model=list[SimulatorInventoryItem])
+async def get_simulator_inventory(request: Request) -> Response:
+    rendered = get_response_cache().get("inventory", inventory_key(), _render_inventory)
+    return rendered_json_response(request, rendered)
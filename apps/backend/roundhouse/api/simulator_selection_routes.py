@@ -2,9 +2,11 @@ from __future__ import annotations
 
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
 from pydantic import BaseModel
 
+from roundhouse.api.simulator_inventory_routes import rendered_json_response
 from roundhouse.services.manifest_sync import (
     BuildManifest,
     ManifestArtifactFile,
@@ -13,6 +15,7 @@ from roundhouse.services.manifest_sync import (
     get_manifest_sync_config,
 )
 from roundhouse.services.simulator_audit import log_selection
+from roundhouse.services.simulator_responses import active_key, get_response_cache
 from roundhouse.services.simulator_selection import (
     get_selected_artifact,
     get_selected_release_tag,
@@ -56,8 +59,7 @@ async def get_current_simulator() -> SimulatorCurrentResponse:
     )
 
 
-@router.get("/active", response_model=SimulatorActiveResponse)
-async def get_active_simulator() -> SimulatorActiveResponse:
+def _render_active() -> bytes:
     repo, release_tag, asset_name, token = get_manifest_sync_config()
     try:
         manifests: list[BuildManifest] = get_manifest(repo, release_tag, asset_name, token)
@@ -100,14 +102,24 @@ async def get_active_simulator() -> SimulatorActiveResponse:
         artifact_type = "wasm"
         artifact_filename = active_artifact.filename
 
-    return SimulatorActiveResponse(
-        version=selected_version or wasm_manifest.version,
-        release_tag=selected_release_tag or wasm_manifest.release_tag,
-        artifact_type=artifact_type,
-        artifact_filename=artifact_filename,
+    return (
+        SimulatorActiveResponse(
+            version=selected_version or wasm_manifest.version,
+            release_tag=selected_release_tag or wasm_manifest.release_tag,
+            artifact_type=artifact_type,
+            artifact_filename=artifact_filename,
+        )
+        .model_dump_json()
+        .encode("utf-8")
     )
 
 
+@router.get("/active", response_model=SimulatorActiveResponse)
+async def get_active_simulator(request: Request) -> Response:
+    rendered = get_response_cache().get("active", active_key(), _render_active)
+    return rendered_json_response(request, rendered)
+
+
 @router.post("/select", response_model=SimulatorSelectionResponse)
 async def select_simulator(req: SimulatorSelectionRequest, user: str = "system") -> SimulatorSelectionResponse:
     repo, release_tag, asset_name, token = get_manifest_sync_config()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Literal
+
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+from roundhouse.services.simulator_telemetry import (
+    PERCENTILES,
+    BootEvent,
+    BootSeries,
+    get_boot_telemetry,
+)
+
+router = APIRouter(prefix="/api/simulators/telemetry", tags=["simulators"])
+
+
+class BootTelemetryEvent(BaseModel):
+    artifact: str
+    outcome: Literal["booted", "error"] = "booted"
+    version: str | None = None
+    timings: dict[str, float] | None = None
+    cache: str | None = None
+    message: str | None = None
+
+
+class BootTelemetryAccepted(BaseModel):
+    artifact: str
+    version: str
+
+
+class BootPhaseStats(BaseModel):
+    count: int
+    mean_ms: float | None
+    max_ms: float
+    p50_ms: float | None
+    p95_ms: float | None
+    p99_ms: float | None
+
+
+class BootTelemetrySeries(BaseModel):
+    artifact: str
+    version: str
+    boots: int
+    errors: int
+    updated_at: float
+    cache: dict[str, int]
+    phases: dict[str, BootPhaseStats]
+
+
+def _series_response(series: BootSeries) -> BootTelemetrySeries:
+    phases: dict[str, BootPhaseStats] = {}
+    for name, histogram in series.phases.items():
+        p50, p95, p99 = (histogram.percentile(q) for q in PERCENTILES)
+        phases[name] = BootPhaseStats(
+            count=histogram.count,
+            mean_ms=histogram.mean,
+            max_ms=histogram.max,
+            p50_ms=p50,
+            p95_ms=p95,
+            p99_ms=p99,
+        )
+    return BootTelemetrySeries(
+        artifact=series.artifact,
+        version=series.version,
+        boots=series.boots,
+        errors=series.errors,
+        updated_at=series.updated_at,
+        cache=dict(series.cache),
+        phases=phases,
+    )
+
+
+@router.post("/boot", response_model=BootTelemetryAccepted, status_code=202)
+async def ingest_boot_event(event: BootTelemetryEvent) -> BootTelemetryAccepted:
+    # Version resolution may read the manifest from disk.
+    series = await asyncio.to_thread(
+        get_boot_telemetry().record,
+        BootEvent(
+            artifact=event.artifact,
+            outcome=event.outcome,
+            version=event.version,
+            timings=event.timings,
+            cache=event.cache,
+        ),
+    )
+    return BootTelemetryAccepted(artifact=series.artifact, version=series.version)
+
+
+@router.get("/boot", response_model=list[BootTelemetrySeries])
+async def get_boot_percentiles(artifact: str | None = None, version: str | None = None) -> list[BootTelemetrySeries]:
+    return [_series_response(series) for series in get_boot_telemetry().series(artifact, version)]
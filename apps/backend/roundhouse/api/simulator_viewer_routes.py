@@ -1,19 +1,83 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+import asyncio
+import html as html_lib
+
+from fastapi import APIRouter, HTTPException
 from fastapi.responses import HTMLResponse
+from pydantic import BaseModel
+
+from roundhouse.services.simulator_bundle import BundleError, BundleFile, SimulatorBundle, resolve_bundle
 
 router = APIRouter(prefix="/api/simulators", tags=["simulators"])
 
 
+class SimulatorBundleFileResponse(BaseModel):
+    filename: str
+    sha256: str
+    size_bytes: int
+    url: str
+
+
+class SimulatorBundleResponse(BaseModel):
+    artifact: str
+    glue: SimulatorBundleFileResponse
+    wasm: SimulatorBundleFileResponse | None
+    module: bool
+
+
+def _file_response(file: BundleFile) -> SimulatorBundleFileResponse:
+    return SimulatorBundleFileResponse(
+        filename=file.filename,
+        sha256=file.sha256,
+        size_bytes=file.size_bytes,
+        url=file.url,
+    )
+
+
+def _bundle_response(bundle: SimulatorBundle) -> SimulatorBundleResponse:
+    return SimulatorBundleResponse(
+        artifact=bundle.artifact,
+        glue=_file_response(bundle.glue),
+        wasm=_file_response(bundle.wasm) if bundle.wasm else None,
+        module=bundle.module,
+    )
+
+
+@router.get("/bundle/{artifact}", response_model=SimulatorBundleResponse)
+async def get_simulator_bundle(artifact: str) -> SimulatorBundleResponse:
+    try:
+        bundle = await asyncio.to_thread(resolve_bundle, artifact)
+    except BundleError as exc:
+        raise HTTPException(
+            status_code=exc.status_code,
+            detail={"error": exc.code, "message": str(exc)},
+        ) from exc
+    return _bundle_response(bundle)
+
+
+def _preload_links(bundle: SimulatorBundle) -> str:
+    links: list[str] = []
+    if bundle.wasm:
+        href = html_lib.escape(bundle.wasm.url)
+        links.append(f'<link rel="preload" href="{href}" as="fetch" type="application/wasm" crossorigin />')
+    glue_href = html_lib.escape(bundle.glue.url)
+    if bundle.module:
+        links.append(f'<link rel="modulepreload" href="{glue_href}" />')
+    else:
+        links.append(f'<link rel="preload" href="{glue_href}" as="script" />')
+    return "\n    ".join(links)
+
+
 @router.get("/viewer")
-async def simulator_viewer() -> HTMLResponse:
+async def simulator_viewer(artifact: str | None = None) -> HTMLResponse:
     html = """<!DOCTYPE html>
 <html lang="en">
   <head>
     <meta charset="UTF-8" />
     <meta name="viewport" content="width=device-width, initial-scale=1.0" />
     <title>Simulator Viewer</title>
+    <!--bundle-preload-->
     <style>
       html,
       body {
@@ -73,6 +137,8 @@ async def simulator_viewer() -> HTMLResponse:
       const overlay = document.getElementById("overlay");
       const runtime = document.getElementById("runtime");
       let bootTimeout = null;
+      let currentArtifact = null;
+      const preloadedBundle = /*bundle*/ null;
 
       function showOverlay(message) {
         overlay.textContent = message || "Loading simulator…";
@@ -101,16 +167,149 @@ async def simulator_viewer() -> HTMLResponse:
         delete window.simulatorReady;
       }
 
-      async function resolveGlueScript(baseName) {
-        const candidates = [`${baseName}.js`, `${baseName}.mjs`];
-        for (const candidate of candidates) {
-          const res = await fetch(`/api/artifacts/download/${encodeURIComponent(candidate)}`, {
-            method: "GET",
-            headers: { Range: "bytes=0-0" },
-          });
-          if (res.ok) return candidate;
+      function addPreload(href, rel, as, type) {
+        if (document.head.querySelector(`link[href="${CSS.escape(href)}"]`)) return;
+        const link = document.createElement("link");
+        link.rel = rel;
+        link.href = href;
+        if (as) link.as = as;
+        if (type) link.type = type;
+        if (as === "fetch") link.crossOrigin = "anonymous";
+        document.head.appendChild(link);
+      }
+
+      function preloadBundle(bundle) {
+        // Start the wasm download alongside the glue script instead of after it.
+        if (bundle.wasm) addPreload(bundle.wasm.url, "preload", "fetch", "application/wasm");
+        if (bundle.module) {
+          addPreload(bundle.glue.url, "modulepreload");
+        } else {
+          addPreload(bundle.glue.url, "preload", "script");
+        }
+      }
+
+      async function fetchBundle(artifactName) {
+        if (preloadedBundle && preloadedBundle.artifact === artifactName) return preloadedBundle;
+        const res = await fetch(`/api/simulators/bundle/${encodeURIComponent(artifactName)}`);
+        if (!res.ok) {
+          const body = await res.json().catch(() => null);
+          const detail = body && body.detail;
+          throw new Error((detail && detail.message) || "Failed to resolve simulator bundle.");
+        }
+        return res.json();
+      }
+
+      const WASM_CACHE = "roundhouse-simulator-wasm";
+      const MODULE_DB = "roundhouse-simulator";
+      const MODULE_STORE = "modules";
+      let moduleStoreSupported = true;
+
+      function openModuleDb() {
+        return new Promise((resolve) => {
+          if (!moduleStoreSupported || !window.indexedDB) {
+            resolve(null);
+            return;
+          }
+          const req = indexedDB.open(MODULE_DB, 1);
+          req.onupgradeneeded = () => req.result.createObjectStore(MODULE_STORE);
+          req.onsuccess = () => resolve(req.result);
+          req.onerror = () => resolve(null);
+        });
+      }
+
+      function moduleDbRequest(db, mode, action) {
+        return new Promise((resolve) => {
+          try {
+            const req = action(db.transaction(MODULE_STORE, mode).objectStore(MODULE_STORE));
+            req.onsuccess = () => resolve(req.result);
+            req.onerror = () => resolve(undefined);
+          } catch (err) {
+            // Most engines refuse to clone WebAssembly.Module into IndexedDB; rely on Cache Storage instead.
+            moduleStoreSupported = false;
+            resolve(undefined);
+          }
+        });
+      }
+
+      async function loadStoredModule(digest) {
+        const db = await openModuleDb();
+        if (!db) return null;
+        const module = await moduleDbRequest(db, "readonly", (store) => store.get(digest));
+        db.close();
+        return module instanceof WebAssembly.Module ? module : null;
+      }
+
+      async function storeModule(digest, module) {
+        const db = await openModuleDb();
+        if (!db) return;
+        await moduleDbRequest(db, "readwrite", (store) => store.put(module, digest));
+        db.close();
+      }
+
+      async function openWasmResponse(url) {
+        if (!window.caches) {
+          return { response: await fetch(url, { credentials: "same-origin" }), cached: false };
+        }
+        const cache = await caches.open(WASM_CACHE);
+        const hit = await cache.match(url);
+        if (hit) return { response: hit, cached: true };
+        const response = await fetch(url, { credentials: "same-origin" });
+        if (response.ok) {
+          // URLs are digest-pinned and never go stale; only older digests of the same file are dropped.
+          const path = new URL(url, location.href).pathname;
+          for (const request of await cache.keys()) {
+            if (new URL(request.url).pathname === path) await cache.delete(request);
+          }
+          await cache.put(url, response.clone());
         }
-        return null;
+        return { response, cached: false };
+      }
+
+      async function compileWasm(wasm, imports, boot) {
+        const fetchStart = performance.now();
+        const stored = await loadStoredModule(wasm.sha256);
+        if (stored) {
+          boot.cache = "module";
+          boot.timings.fetch = performance.now() - fetchStart;
+          const compileStart = performance.now();
+          const instance = await WebAssembly.instantiate(stored, imports);
+          boot.timings.compile = performance.now() - compileStart;
+          return { instance, module: stored };
+        }
+        const { response, cached } = await openWasmResponse(wasm.url);
+        if (!response.ok) throw new Error(`Failed to download simulator (${response.status}).`);
+        boot.cache = cached ? "response" : "network";
+        // Streaming compilation overlaps the body download, so "fetch" covers time to first byte only.
+        boot.timings.fetch = performance.now() - fetchStart;
+        const compileStart = performance.now();
+        let result;
+        try {
+          result = await WebAssembly.instantiateStreaming(response, imports);
+        } catch (err) {
+          // Missing streaming support or a non-wasm Content-Type: compile from buffered bytes instead.
+          const retry = await openWasmResponse(wasm.url);
+          result = await WebAssembly.instantiate(await retry.response.arrayBuffer(), imports);
+        }
+        boot.timings.compile = performance.now() - compileStart;
+        storeModule(wasm.sha256, result.module);
+        return result;
+      }
+
+      function reportBoot(event) {
+        // Fleet-wide boot latency; best effort and never blocks the simulator.
+        const url = "/api/simulators/telemetry/boot";
+        const body = JSON.stringify(event);
+        if (navigator.sendBeacon && navigator.sendBeacon(url, new Blob([body], { type: "application/json" }))) return;
+        fetch(url, { method: "POST", headers: { "Content-Type": "application/json" }, body, keepalive: true }).catch(
+          () => {},
+        );
+      }
+
+      function failBoot(message) {
+        setEmpty(message);
+        hideOverlay();
+        parent.postMessage({ type: "simulator:error", message }, "*");
+        if (currentArtifact) reportBoot({ artifact: currentArtifact, outcome: "error", message });
       }
 
       async function loadArtifact(artifactName) {
@@ -129,49 +328,56 @@ async def simulator_viewer() -> HTMLResponse:
         }, 8000);
         cleanupRuntime();
 
-        const isWasm = artifactName.toLowerCase().endsWith(".wasm");
-        const baseName = isWasm ? artifactName.slice(0, -5) : artifactName;
-        const wasmUrl = isWasm ? `/api/artifacts/download/${encodeURIComponent(artifactName)}` : null;
-
+        currentArtifact = artifactName;
+        const boot = { start: performance.now(), runtimeStart: null, cache: null, timings: {} };
         try {
-          const glue = await resolveGlueScript(baseName);
-          if (!glue) {
-            throw new Error("Missing glue script (.js or .mjs) for simulator.");
-          }
+          const bundleStart = performance.now();
+          const bundle = await fetchBundle(artifactName);
+          boot.timings.bundle = performance.now() - bundleStart;
+          preloadBundle(bundle);
 
           window.simulatorReady = () => {
+            const now = performance.now();
+            if (boot.runtimeStart !== null) boot.timings.runtime = now - boot.runtimeStart;
+            boot.timings.total = now - boot.start;
             hideOverlay();
-            parent.postMessage({ type: "simulator:booted" }, "*");
+            parent.postMessage({ type: "simulator:booted", timings: boot.timings, cache: boot.cache }, "*");
+            reportBoot({ artifact: artifactName, outcome: "booted", timings: boot.timings, cache: boot.cache });
           };
 
-          if (wasmUrl) {
+          if (bundle.wasm) {
+            const wasm = bundle.wasm;
             window.Module = {
-              locateFile: (path) => (path.endsWith(".wasm") ? wasmUrl : path),
+              locateFile: (path) => (path.endsWith(".wasm") ? wasm.url : path),
+              // Emscripten calls this instead of its own fetch path and waits for receiveInstance.
+              instantiateWasm: (imports, receiveInstance) => {
+                compileWasm(wasm, imports, boot)
+                  .then(({ instance, module }) => {
+                    boot.runtimeStart = performance.now();
+                    receiveInstance(instance, module);
+                  })
+                  .catch((err) => failBoot(err.message || "Failed to compile simulator."));
+                return {};
+              },
               onRuntimeInitialized: () => window.simulatorReady(),
             };
           }
 
           const script = document.createElement("script");
-          script.src = `/api/artifacts/download/${encodeURIComponent(glue)}`;
+          script.src = bundle.glue.url;
           script.async = true;
-          if (glue.endsWith(".mjs")) {
+          if (bundle.module) {
             script.type = "module";
           }
 
           script.onload = () => {
             // Wait for runtime to signal readiness via simulatorReady / onRuntimeInitialized.
           };
-          script.onerror = () => {
-            setEmpty("Failed to load simulator glue script.");
-            hideOverlay();
-            parent.postMessage({ type: "simulator:error", message: "Failed to load simulator glue script." }, "*");
-          };
+          script.onerror = () => failBoot("Failed to load simulator glue script.");
 
           runtime.appendChild(script);
         } catch (err) {
-          setEmpty(err.message || "Failed to load simulator.");
-          hideOverlay();
-          parent.postMessage({ type: "simulator:error", message: err.message || "Failed to load simulator." }, "*");
+          failBoot(err.message || "Failed to load simulator.");
         }
       }
 
@@ -193,4 +399,14 @@ async def simulator_viewer() -> HTMLResponse:
   </body>
 </html>
 """
+    if artifact:
+        # Resolve the initial artifact server-side so its downloads start before any script runs.
+        try:
+            bundle = await asyncio.to_thread(resolve_bundle, artifact)
+        except BundleError:
+            bundle = None
+        if bundle is not None:
+            payload = _bundle_response(bundle).model_dump_json().replace("</", "<\\/")
+            html = html.replace("<!--bundle-preload-->", _preload_links(bundle))
+            html = html.replace("/*bundle*/ null", payload)
     return HTMLResponse(content=html)
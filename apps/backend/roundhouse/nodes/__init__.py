@@ -7,6 +7,7 @@ from core.nodes.models import (
     NodeUpdateRequest,
 )
 from core.nodes.registry import NodeRecord, NodeRegistry, get_node_registry
+from roundhouse.nodes.registry import configure_node_registry
 
 __all__ = [
     "NodeCreateRequest",
@@ -17,5 +18,6 @@ __all__ = [
     "NodeResponse",
     "NodeType",
     "NodeUpdateRequest",
+    "configure_node_registry",
     "get_node_registry",
 ]
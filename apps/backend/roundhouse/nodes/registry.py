@@ -1,5 +1,37 @@
 """Backend-facing re-exports of core node registry."""
 
-from core.nodes.registry import NodeRecord, NodeRegistry, get_node_registry
+from __future__ import annotations
 
-__all__ = ["NodeRecord", "NodeRegistry", "get_node_registry"]
+import atexit
+from pathlib import Path
+
+from core.nodes.registry import (
+    DEFAULT_INDEXED_METADATA,
+    NodeRecord,
+    NodeRegistry,
+    get_node_registry,
+    set_node_registry,
+)
+from roundhouse.nodes.sqlite_storage import SQLiteNodeStorage
+from roundhouse.settings import RoundhouseSettings
+
+__all__ = ["NodeRecord", "NodeRegistry", "configure_node_registry", "get_node_registry"]
+
+
+def configure_node_registry(settings: RoundhouseSettings) -> NodeRegistry:
+    """Build the process-wide registry from settings.
+
+    With a path the registry is backed by SQLite; every worker process opens
+    the same database, so they all see one node set. Without one it stays in
+    memory, as before.
+    """
+    indexed_metadata = DEFAULT_INDEXED_METADATA
+    if settings.node_indexed_metadata:
+        indexed_metadata = tuple(key.strip() for key in settings.node_indexed_metadata.split(",") if key.strip())
+    storage = None
+    if settings.node_registry_path:
+        storage = SQLiteNodeStorage(Path(settings.node_registry_path))
+        atexit.register(storage.close)
+    registry = NodeRegistry(storage, indexed_metadata=indexed_metadata)
+    set_node_registry(registry)
+    return registry
@@ -0,0 +1,209 @@
+"""SQLite-backed node registry storage shared by every worker process."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from core.lifecycle.models import NodeLifecycleState
+from core.nodes.models import NodeType
+from core.nodes.registry import NodeRecord
+from core.nodes.storage import NodeWrite
+
+# Reads check for commits from other workers at most this often; writes never wait for it.
+REFRESH_INTERVAL_SECONDS = 0.25
+BUSY_TIMEOUT_MS = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    node_id TEXT PRIMARY KEY,
+    node_type TEXT NOT NULL,
+    lifecycle_state TEXT NOT NULL,
+    capabilities TEXT NOT NULL,
+    artifact_ref TEXT,
+    metadata TEXT NOT NULL,
+    last_updated TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    rev INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS nodes_rev ON nodes (rev);
+CREATE TABLE IF NOT EXISTS registry_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO registry_meta (key, value) VALUES ('rev', 0);
+"""
+
+# Columns added after the first release, for databases created before them.
+_MIGRATIONS = {"version": "ALTER TABLE nodes ADD COLUMN version INTEGER NOT NULL DEFAULT 1"}
+
+_COLUMN_NAMES = (
+    "node_id",
+    "node_type",
+    "lifecycle_state",
+    "capabilities",
+    "artifact_ref",
+    "metadata",
+    "last_updated",
+    "version",
+)
+_COLUMNS = ", ".join(_COLUMN_NAMES)
+# Position of ``rev`` in rows selected as ``{_COLUMNS}, rev``.
+_REV = len(_COLUMN_NAMES)
+
+Row = tuple[str, str, str, str, str | None, str, str, int]
+
+
+def _to_row(record: NodeRecord) -> Row:
+    return (
+        record.node_id,
+        record.node_type.value,
+        record.lifecycle_state.value,
+        json.dumps(record.capabilities),
+        record.artifact_ref,
+        json.dumps(record.metadata),
+        record.last_updated.isoformat(),
+        record.version,
+    )
+
+
+def _from_row(row: tuple[Any, ...]) -> NodeRecord:
+    return NodeRecord(
+        node_id=row[0],
+        node_type=NodeType(row[1]),
+        lifecycle_state=NodeLifecycleState(row[2]),
+        capabilities=json.loads(row[3]),
+        artifact_ref=row[4],
+        metadata=json.loads(row[5]),
+        last_updated=datetime.fromisoformat(row[6]),
+        version=row[7],
+    )
+
+
+class SQLiteNodeStorage:
+    """``NodeStorage`` over one SQLite database in WAL mode.
+
+    Every save commits before it returns, so a write the API acknowledged
+    survives a crash and is visible to other workers at once. Each write is
+    a compare-and-set on the row's version inside that transaction, so two
+    workers that read the same version cannot both write the next one; the
+    loser gets the stored row back and the registry retries on top of it.
+    Every committed row gets a
+    new value of a database-wide revision counter, so ``changes`` fetches
+    only rows newer than the last one seen, and only after ``PRAGMA
+    data_version`` reports a commit from another connection; that check
+    itself runs at most once per ``refresh_interval``.
+    """
+
+    def __init__(self, path: Path, refresh_interval: float = REFRESH_INTERVAL_SECONDS) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._path = path
+        self._refresh_interval = refresh_interval
+        self._reader = self._connect()
+        self._reader.executescript(_SCHEMA)
+        existing = {row[1] for row in self._reader.execute("PRAGMA table_info(nodes)")}
+        for column, statement in _MIGRATIONS.items():
+            if column not in existing:
+                self._reader.execute(statement)
+        self._writer = self._connect()
+        self._read_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._seen_rev = 0
+        # Revisions committed by this connection; ``changes`` skips them, the registry already has them.
+        self._own_revs: set[int] = set()
+        self._data_version: int | None = None
+        self._next_check = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def load(self) -> list[NodeRecord]:
+        with self._read_lock:
+            self._data_version = self._reader.execute("PRAGMA data_version").fetchone()[0]
+            rows = self._reader.execute(f"SELECT {_COLUMNS}, rev FROM nodes").fetchall()
+        self._seen_rev = max((row[_REV] for row in rows), default=0)
+        return [_from_row(row) for row in rows]
+
+    def changes(self, force: bool = False) -> list[NodeRecord]:
+        with self._read_lock:
+            now = time.monotonic()
+            if now < self._next_check and not force:
+                return []
+            self._next_check = now + self._refresh_interval
+            data_version = self._reader.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return []
+            self._data_version = data_version
+            rows = self._reader.execute(
+                f"SELECT {_COLUMNS}, rev FROM nodes WHERE rev > ? ORDER BY rev", (self._seen_rev,)
+            ).fetchall()
+            if not rows:
+                return []
+            self._seen_rev = rows[-1][_REV]
+        with self._write_lock:
+            own = self._own_revs
+            self._own_revs = {rev for rev in own if rev > self._seen_rev}
+        return [_from_row(row) for row in rows if row[_REV] not in own]
+
+    def save(self, writes: Sequence[NodeWrite]) -> list[NodeRecord]:
+        if not writes:
+            return []
+        with self._write_lock:
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                self._writer.execute("UPDATE registry_meta SET value = value + ? WHERE key = 'rev'", (len(writes),))
+                (rev,) = self._writer.execute("SELECT value FROM registry_meta WHERE key = 'rev'").fetchone()
+                revs = range(rev - len(writes) + 1, rev + 1)
+                stale = [
+                    node_id for write, row_rev in zip(writes, revs) if (node_id := self._write_row(write, row_rev))
+                ]
+                if stale:
+                    current = [self._stored(node_id) for node_id in stale]
+                    self._writer.execute("ROLLBACK")
+                    return current
+                self._writer.execute("COMMIT")
+            except BaseException:
+                if self._writer.in_transaction:
+                    self._writer.execute("ROLLBACK")
+                raise
+            self._own_revs.update(revs)
+        return []
+
+    def _write_row(self, write: NodeWrite, rev: int) -> str | None:
+        """Apply one write; returns the node id when the stored row is not at the write's base version."""
+        row = _to_row(write.record)
+        if write.base_version == 0:
+            cursor = self._writer.execute(
+                f"INSERT OR IGNORE INTO nodes ({_COLUMNS}, rev) VALUES ({', '.join('?' * (_REV + 1))})", (*row, rev)
+            )
+            return None if cursor.rowcount else row[0]
+        # The version check happens here, in the same statement as the write, so two workers
+        # that both read version N cannot both store N + 1.
+        assignments = ", ".join(f"{name} = ?" for name in _COLUMN_NAMES[1:])
+        cursor = self._writer.execute(
+            f"UPDATE nodes SET {assignments}, rev = ? WHERE node_id = ? AND version = ?",
+            (*row[1:], rev, row[0], write.base_version),
+        )
+        if cursor.rowcount:
+            return None
+        # A node this registry knows but the database does not (e.g. the database was replaced) is simply stored.
+        cursor = self._writer.execute(
+            f"INSERT OR IGNORE INTO nodes ({_COLUMNS}, rev) VALUES ({', '.join('?' * (_REV + 1))})", (*row, rev)
+        )
+        return None if cursor.rowcount else row[0]
+
+    def _stored(self, node_id: str) -> NodeRecord:
+        return _from_row(self._writer.execute(f"SELECT {_COLUMNS} FROM nodes WHERE node_id = ?", (node_id,)).fetchone())
+
+    def close(self) -> None:
+        with self._write_lock:
+            self._writer.close()
+        with self._read_lock:
+            self._reader.close()
@@ -7,6 +7,8 @@ Can be run as a cron job or service.
 import time
 from typing import NoReturn
 
+from roundhouse.services.artifact_compression import precompress_artifacts
+from roundhouse.services.artifact_paths import ARTIFACTS_DIR
 from roundhouse.services.manifest_sync import fetch_manifest_from_github, get_manifest_sync_config
 
 SYNC_INTERVAL_SECONDS = 3600  # 1 hour
@@ -23,6 +25,8 @@ def main() -> NoReturn:
                 ok = False
             if ok:
                 print(f"[manifest-sync] Refreshed manifest from {repo} ({release_tag})")
+                # Keep brotli/gzip variants of simulator bundles ready before the viewer asks for them.
+                precompress_artifacts(p for p in ARTIFACTS_DIR.iterdir() if p.is_file())
             else:
                 print(f"[manifest-sync] Failed to refresh manifest from {repo} ({release_tag})")
         else:
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import gzip
+import os
+import shutil
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Protocol, cast
+
+from roundhouse.services.artifact_digest import get_digest_cache
+from roundhouse.services.artifact_paths import ARTIFACTS_DIR
+
+try:
+    import brotli  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Variants are addressed by the sha256 of the identity file, so a re-upload
+# under the same name can never be served a stale compressed body.
+VARIANTS_DIR = ARTIFACTS_DIR / ".variants"
+COMPRESSIBLE_SUFFIXES = frozenset({".wasm", ".js", ".mjs"})
+# Skip variants that do not save at least this fraction of the original size.
+MIN_SAVINGS_RATIO = 0.05
+COMPRESS_CHUNK_SIZE = 1024 * 1024
+
+_EXTENSIONS = {"br": "br", "gzip": "gz"}
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Encodings we can produce, in server preference order."""
+    if brotli is not None:
+        return ("br", "gzip")
+    return ("gzip",)
+
+
+def is_compressible(name: str) -> bool:
+    return Path(name).suffix.lower() in COMPRESSIBLE_SUFFIXES
+
+
+def variant_path(digest: str, encoding: str) -> Path:
+    return VARIANTS_DIR / f"{digest}.{_EXTENSIONS[encoding]}"
+
+
+def parse_accept_encoding(header: str | None) -> dict[str, float]:
+    weights: dict[str, float] = {}
+    if not header:
+        return weights
+    for item in header.split(","):
+        token, *params = (part.strip() for part in item.split(";"))
+        if not token:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[token.lower()] = quality
+    return weights
+
+
+def negotiate_encoding(header: str | None, offered: Iterable[str]) -> str | None:
+    """Pick the best offered encoding acceptable to the client, or None for identity."""
+    weights = parse_accept_encoding(header)
+    best: str | None = None
+    best_quality = 0.0
+    for encoding in offered:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _gzip_stream(source: BinaryIO, target: BinaryIO) -> None:
+    # mtime=0 keeps the output deterministic for a given input.
+    with gzip.GzipFile(fileobj=target, mode="wb", compresslevel=9, mtime=0) as stream:
+        shutil.copyfileobj(source, stream, COMPRESS_CHUNK_SIZE)
+
+
+class _BrotliCompressor(Protocol):
+    """The part of ``brotli.Compressor`` we use; the package ships no type information."""
+
+    def process(self, data: bytes) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+def _brotli_stream(source: BinaryIO, target: BinaryIO) -> None:
+    compressor = cast(_BrotliCompressor, brotli.Compressor(quality=11))  # type: ignore[union-attr]
+    while chunk := source.read(COMPRESS_CHUNK_SIZE):
+        target.write(compressor.process(chunk))
+    target.write(compressor.finish())
+
+
+_COMPRESSORS: dict[str, Callable[[BinaryIO, BinaryIO], None]] = {
+    "br": _brotli_stream,
+    "gzip": _gzip_stream,
+}
+
+
+def compress_variant(source: Path, digest: str, encoding: str) -> Path | None:
+    """Write one compressed variant atomically; returns None if it is not worth keeping."""
+    dest = variant_path(digest, encoding)
+    if dest.exists():
+        return dest
+    VARIANTS_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f"{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with source.open("rb") as src, tmp.open("wb") as out:
+            _COMPRESSORS[encoding](src, out)
+        if tmp.stat().st_size > source.stat().st_size * (1 - MIN_SAVINGS_RATIO):
+            tmp.unlink()
+            return None
+        os.replace(tmp, dest)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return dest
+
+
+class ArtifactCompressor:
+    """Background pool that materializes brotli/gzip variants of simulator artifacts."""
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or min(4, os.cpu_count() or 1),
+            thread_name_prefix="artifact-compress",
+        )
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future[None]] = {}
+        self._incompressible: set[tuple[str, str]] = set()
+
+    def needs_variants(self, digest: str) -> bool:
+        for encoding in available_encodings():
+            if (digest, encoding) in self._incompressible:
+                continue
+            if not variant_path(digest, encoding).is_file():
+                return True
+        return False
+
+    def schedule(self, path: Path) -> Future[None] | None:
+        if not is_compressible(path.name) or not path.is_file():
+            return None
+        with self._lock:
+            key = str(path)
+            pending = self._inflight.get(key)
+            if pending is not None and not pending.done():
+                return pending
+            future = self._executor.submit(self._compress_all, path)
+            self._inflight[key] = future
+        future.add_done_callback(lambda _f: self._discard(key, future))
+        return future
+
+    def schedule_many(self, paths: Iterable[Path]) -> list[Future[None]]:
+        futures: list[Future[None]] = []
+        for path in paths:
+            future = self.schedule(path)
+            if future is not None:
+                futures.append(future)
+        return futures
+
+    def _discard(self, key: str, future: Future[None]) -> None:
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _compress_all(self, path: Path) -> None:
+        digest = get_digest_cache().digest(path)
+        for encoding in available_encodings():
+            if compress_variant(path, digest, encoding) is None:
+                with self._lock:
+                    self._incompressible.add((digest, encoding))
+
+
+def find_variant(digest: str, encoding: str) -> Path | None:
+    path = variant_path(digest, encoding)
+    return path if path.is_file() else None
+
+
+def remove_variants(digest: str) -> None:
+    for encoding in _EXTENSIONS:
+        path = variant_path(digest, encoding)
+        if path.exists():
+            path.unlink()
+
+
+def precompress_artifacts(paths: Iterable[Path]) -> None:
+    """Blocking helper for batch jobs: compress every eligible artifact and wait."""
+    for future in get_artifact_compressor().schedule_many(paths):
+        future.result()
+
+
+_compressor: ArtifactCompressor | None = None
+
+
+def get_artifact_compressor() -> ArtifactCompressor:
+    global _compressor
+    if _compressor is None:
+        _compressor = ArtifactCompressor()
+    return _compressor
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class FileFingerprint:
+    path: str
+    size: int
+    mtime_ns: int
+
+
+def fingerprint(path: Path) -> FileFingerprint:
+    stat = path.stat()
+    return FileFingerprint(path=str(path), size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+
+def file_sha256(path: str) -> str:
+    """Hash a file in fixed-size chunks.
+
+    Module-level so it can be shipped to a process pool.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        while chunk := handle.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DigestCache:
+    """sha256 digests keyed by (path, size, mtime) so unchanged files are hashed once."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._digests: dict[str, tuple[FileFingerprint, str]] = {}
+
+    def peek(self, fp: FileFingerprint) -> str | None:
+        with self._lock:
+            entry = self._digests.get(fp.path)
+        if entry is None or entry[0] != fp:
+            return None
+        return entry[1]
+
+    def remember(self, fp: FileFingerprint, digest: str) -> None:
+        with self._lock:
+            self._digests[fp.path] = (fp, digest)
+
+    def forget(self, path: Path) -> None:
+        with self._lock:
+            self._digests.pop(str(path), None)
+
+    def digest(self, path: Path) -> str:
+        fp = fingerprint(path)
+        cached = self.peek(fp)
+        if cached is not None:
+            return cached
+        value = file_sha256(fp.path)
+        # Only cache if the file was not rewritten while we were reading it.
+        if fingerprint(path) == fp:
+            self.remember(fp, value)
+        return value
+
+
+_digest_cache: DigestCache | None = None
+
+
+def get_digest_cache() -> DigestCache:
+    global _digest_cache
+    if _digest_cache is None:
+        _digest_cache = DigestCache()
+    return _digest_cache
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import mimetypes
+from pathlib import Path
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+MAX_RANGES = 16
+# Pinned rather than left to the platform mimetypes table: instantiateStreaming
+# rejects anything but application/wasm, and some systems map .mjs to nothing.
+ARTIFACT_MEDIA_TYPES = {
+    ".wasm": "application/wasm",
+    ".js": "text/javascript",
+    ".mjs": "text/javascript",
+}
+
+
+class RangeNotSatisfiableError(ValueError):
+    def __init__(self, size: int) -> None:
+        super().__init__("Requested range not satisfiable")
+        self.size = size
+
+
+def artifact_media_type(name: str) -> str:
+    suffix = Path(name).suffix.lower()
+    if suffix in ARTIFACT_MEDIA_TYPES:
+        return ARTIFACT_MEDIA_TYPES[suffix]
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+
+def strong_etag(digest: str) -> str:
+    return f'"{digest}"'
+
+
+def _opaque_tags(header: str) -> list[str]:
+    tags: list[str] = []
+    for raw in header.split(","):
+        tag = raw.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.append(tag)
+    return tags
+
+
+def if_none_match_matches(header: str | None, etag: str) -> bool:
+    """Weak comparison, as RFC 9110 requires for If-None-Match."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in _opaque_tags(header)
+
+
+def if_range_matches(header: str | None, etag: str) -> bool:
+    """Strong comparison; date validators are not supported and never match."""
+    if header is None:
+        return True
+    return header.strip() == etag
+
+
+def parse_range_header(header: str | None, size: int) -> list[tuple[int, int]] | None:
+    """Parse a ``bytes=`` Range header into inclusive (start, end) pairs.
+
+    Returns None when the header is absent, malformed or uses another unit, in
+    which case the full representation is served. Raises RangeNotSatisfiableError
+    when the header is valid but no range overlaps the file.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+    ranges: list[tuple[int, int]] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, sep, last = part.partition("-")
+        if not sep:
+            return None
+        first = first.strip()
+        last = last.strip()
+        try:
+            if first == "":
+                if last == "":
+                    return None
+                suffix = int(last)
+                if suffix <= 0:
+                    continue
+                ranges.append((max(size - suffix, 0), size - 1))
+                continue
+            start = int(first)
+            end = int(last) if last else size - 1
+        except ValueError:
+            return None
+        if last and end < start:
+            return None
+        if start >= size:
+            continue
+        ranges.append((start, min(end, size - 1)))
+    if not ranges or size == 0:
+        raise RangeNotSatisfiableError(size)
+    if len(ranges) > MAX_RANGES:
+        # Refuse to fan out pathological requests; serve the whole file instead.
+        return None
+    return _coalesce(ranges)
+
+
+def _coalesce(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    ordered = sorted(ranges)
+    merged: list[tuple[int, int]] = [ordered[0]]
+    for start, end in ordered[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def content_range(start: int, end: int, size: int) -> str:
+    return f"bytes {start}-{end}/{size}"
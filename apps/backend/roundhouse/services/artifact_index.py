@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import base64
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from roundhouse.services.artifact_paths import ARTIFACTS_DIR
+from roundhouse.services.manifest_sync import MANIFEST_PATH
+from roundhouse.services.simulator_audit import AUDIT_LOG_PATH
+from roundhouse.services.simulator_selection import SELECTION_PATH
+from roundhouse.services.simulator_telemetry import TELEMETRY_PATH
+
+INDEX_PATH = ARTIFACTS_DIR / ".index" / "artifacts.sqlite3"
+# Downloads of the same artifact within this window share one index write.
+ACCESS_RESOLUTION_SECONDS = 60.0
+
+SYSTEM_KIND = "system"
+SYSTEM_FILES = frozenset({MANIFEST_PATH.name, SELECTION_PATH.name, AUDIT_LOG_PATH.name, TELEMETRY_PATH.name})
+_SUFFIX_KINDS = {".wasm": "simulator", ".js": "simulator", ".mjs": "simulator", ".zip": "bundle"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    name TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+"""
+# Columns added after the first release of the index; applied with ALTER TABLE when missing.
+_MIGRATIONS = {
+    "sha256": "ALTER TABLE artifacts ADD COLUMN sha256 TEXT",
+    "uploaded_at": "ALTER TABLE artifacts ADD COLUMN uploaded_at REAL NOT NULL DEFAULT 0",
+}
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS artifacts_last_access ON artifacts (last_access, name);
+CREATE INDEX IF NOT EXISTS artifacts_kind ON artifacts (kind);
+CREATE INDEX IF NOT EXISTS artifacts_size ON artifacts (size_bytes, name);
+CREATE INDEX IF NOT EXISTS artifacts_uploaded_at ON artifacts (uploaded_at, name);
+CREATE INDEX IF NOT EXISTS artifacts_sha256 ON artifacts (sha256);
+"""
+_COLUMNS = "name, kind, size_bytes, mtime, last_access, sha256, uploaded_at"
+SORT_FIELDS = ("name", "size_bytes", "uploaded_at", "last_access")
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def classify_artifact(name: str, kind: str | None = None) -> str:
+    """Bookkeeping files are always ``system``; otherwise honour the caller's kind."""
+    if name in SYSTEM_FILES:
+        return SYSTEM_KIND
+    if kind and kind != "generic":
+        return kind
+    return _SUFFIX_KINDS.get(Path(name).suffix.lower(), kind or "generic")
+
+
+def is_indexable(path: Path) -> bool:
+    # Dot-prefixed entries are internal (.index, .uploads, .variants, temp files).
+    return path.is_file() and not path.name.startswith(".")
+
+
+@dataclass(frozen=True)
+class ArtifactIndexEntry:
+    name: str
+    kind: str
+    size_bytes: int
+    mtime: float
+    last_access: float
+    sha256: str | None = None
+    uploaded_at: float = 0.0
+
+
+def _encode_cursor(sort: str, descending: bool, value: Any, name: str) -> str:
+    raw = json.dumps([sort, descending, value, name], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str, descending: bool) -> tuple[Any, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_desc, value, name = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursorError("Malformed cursor") from exc
+    if cursor_sort != sort or cursor_desc != descending:
+        raise InvalidCursorError("Cursor was issued for a different sort order")
+    return value, str(name)
+
+
+class ArtifactIndex:
+    """Persistent catalog of stored artifacts backed by SQLite in WAL mode.
+
+    Keeps enough per-file state (kind, size, last access) that retention and
+    listing never have to stat the whole artifacts directory.
+    """
+
+    def __init__(self, path: Path = INDEX_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(artifacts)")}
+        for column, statement in _MIGRATIONS.items():
+            if column not in existing:
+                self._conn.execute(statement)
+        self._conn.executescript(_INDEXES)
+        self._recent_access: dict[str, float] = {}
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifact-index")
+
+    def close(self) -> None:
+        self._writer.shutdown(wait=True)
+        self._conn.close()
+
+    def upsert(
+        self,
+        name: str,
+        kind: str | None,
+        size_bytes: int,
+        mtime: float,
+        last_access: float | None = None,
+        sha256: str | None = None,
+        uploaded_at: float | None = None,
+    ) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO artifacts (name, kind, size_bytes, mtime, last_access, sha256, uploaded_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    kind = excluded.kind,
+                    size_bytes = excluded.size_bytes,
+                    mtime = excluded.mtime,
+                    last_access = excluded.last_access,
+                    sha256 = excluded.sha256,
+                    uploaded_at = excluded.uploaded_at
+                """,
+                (
+                    name,
+                    classify_artifact(name, kind),
+                    size_bytes,
+                    mtime,
+                    last_access if last_access is not None else now,
+                    sha256,
+                    uploaded_at if uploaded_at is not None else now,
+                ),
+            )
+
+    def record_file(self, path: Path, kind: str | None = None, sha256: str | None = None) -> None:
+        stat = path.stat()
+        self.upsert(path.name, kind, stat.st_size, stat.st_mtime, sha256=sha256)
+
+    def remove(self, name: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM artifacts WHERE name = ?", (name,))
+            self._recent_access.pop(name, None)
+
+    def touch(self, name: str, when: float | None = None, sha256: str | None = None) -> None:
+        """Record a download without blocking the caller; repeated hits are coalesced.
+
+        The download path already knows the digest, so it also backfills rows
+        adopted by ``reconcile`` that have never been hashed.
+        """
+        now = when if when is not None else time.time()
+        with self._lock:
+            previous = self._recent_access.get(name)
+            if previous is not None and now - previous < ACCESS_RESOLUTION_SECONDS:
+                return
+            self._recent_access[name] = now
+        self._writer.submit(self._write_access, name, now, sha256)
+
+    def _write_access(self, name: str, when: float, sha256: str | None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE artifacts SET last_access = MAX(last_access, ?), sha256 = COALESCE(sha256, ?) WHERE name = ?",
+                (when, sha256, name),
+            )
+
+    def get(self, name: str) -> ArtifactIndexEntry | None:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM artifacts WHERE name = ?",
+                (name,),
+            ).fetchone()
+        return ArtifactIndexEntry(*row) if row else None
+
+    def iter_lru(self, batch_size: int = 256) -> Iterator[ArtifactIndexEntry]:
+        """Yield entries least-recently-accessed first using keyset pagination."""
+        cursor: tuple[float, str] = (float("-inf"), "")
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"""
+                    SELECT {_COLUMNS} FROM artifacts
+                    WHERE (last_access, name) > (?, ?)
+                    ORDER BY last_access, name
+                    LIMIT ?
+                    """,
+                    (cursor[0], cursor[1], batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield ArtifactIndexEntry(*row)
+            cursor = (rows[-1][4], rows[-1][0])
+
+    def query(
+        self,
+        kind: str | None = None,
+        prefix: str | None = None,
+        sort: str = "name",
+        descending: bool = False,
+        limit: int = 100,
+        cursor: str | None = None,
+    ) -> tuple[list[ArtifactIndexEntry], str | None]:
+        """Filtered, keyset-paginated listing; returns the page and the cursor for the next one."""
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Unsupported sort field: {sort}")
+        clauses: list[str] = []
+        params: list[Any] = []
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if prefix:
+            # A half-open range on the primary key instead of LIKE, so the prefix scan uses the index.
+            clauses.append("name >= ? AND name < ?")
+            params.extend([prefix, prefix + "\U0010ffff"])
+        if cursor:
+            value, name = _decode_cursor(cursor, sort, descending)
+            comparison = "<" if descending else ">"
+            if sort == "name":
+                clauses.append(f"name {comparison} ?")
+                params.append(name)
+            else:
+                clauses.append(f"({sort}, name) {comparison} (?, ?)")
+                params.extend([value, name])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        direction = "DESC" if descending else "ASC"
+        order = f"name {direction}" if sort == "name" else f"{sort} {direction}, name {direction}"
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM artifacts {where} ORDER BY {order} LIMIT ?",
+                (*params, limit + 1),
+            ).fetchall()
+        entries = [ArtifactIndexEntry(*row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit and entries:
+            last = entries[-1]
+            next_cursor = _encode_cursor(sort, descending, getattr(last, sort), last.name)
+        return entries, next_cursor
+
+    def digest_in_use(self, sha256: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM artifacts WHERE sha256 = ? LIMIT 1", (sha256,)).fetchone()
+        return row is not None
+
+    def usage_by_kind(self) -> dict[str, tuple[int, int]]:
+        """Return ``{kind: (count, total_bytes)}``."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, COUNT(*), COALESCE(SUM(size_bytes), 0) FROM artifacts GROUP BY kind"
+            ).fetchall()
+        return {kind: (count, total) for kind, count, total in rows}
+
+    def reconcile(self, artifacts_dir: Path) -> tuple[int, int]:
+        """One-off directory scan to adopt files written outside the API and drop vanished rows."""
+        with self._lock:
+            known = {
+                name: (size, mtime)
+                for name, size, mtime in self._conn.execute("SELECT name, size_bytes, mtime FROM artifacts")
+            }
+        seen: set[str] = set()
+        added = 0
+        for path in artifacts_dir.iterdir():
+            if not is_indexable(path):
+                continue
+            seen.add(path.name)
+            stat = path.stat()
+            if known.get(path.name) != (stat.st_size, stat.st_mtime):
+                previous = self.get(path.name)
+                self.upsert(
+                    path.name,
+                    previous.kind if previous else None,
+                    stat.st_size,
+                    stat.st_mtime,
+                    last_access=previous.last_access if previous else stat.st_mtime,
+                    uploaded_at=previous.uploaded_at if previous else stat.st_mtime,
+                )
+                added += 1
+        removed = 0
+        for name in known.keys() - seen:
+            self.remove(name)
+            removed += 1
+        return added, removed
+
+
+_artifact_index: ArtifactIndex | None = None
+
+
+def get_artifact_index() -> ArtifactIndex:
+    global _artifact_index
+    if _artifact_index is None:
+        _artifact_index = ArtifactIndex()
+        _artifact_index.reconcile(ARTIFACTS_DIR)
+    return _artifact_index
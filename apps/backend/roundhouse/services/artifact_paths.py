@@ -0,0 +1,6 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+# Uploaded artifacts and the state derived from them (index, variants, upload sessions) live here.
+ARTIFACTS_DIR = Path(__file__).resolve().parent.parent.parent / "artifacts"
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from pydantic import ValidationError
+
+from core.nodes.registry import get_node_registry
+from roundhouse.services.artifact_compression import remove_variants
+from roundhouse.services.artifact_digest import get_digest_cache
+from roundhouse.services.artifact_index import (
+    SYSTEM_KIND,
+    ArtifactIndex,
+    ArtifactIndexEntry,
+    get_artifact_index,
+)
+from roundhouse.services.artifact_paths import ARTIFACTS_DIR
+from roundhouse.services.manifest_sync import BuildManifest, ManifestError, load_manifest_from_disk
+from roundhouse.services.simulator_selection import get_selected_artifact
+from roundhouse.services.simulator_verifier import get_simulator_verifier
+from roundhouse.settings import RoundhouseSettings
+
+# Seconds to wait after a write before an incremental pass runs, so bursts of uploads share one pass.
+DEBOUNCE_SECONDS = 2.0
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Per-kind limits. ``None`` disables a limit."""
+
+    max_count: int | None = 5
+    max_age_seconds: float | None = None
+    evictable: bool = True
+
+
+DEFAULT_POLICY = RetentionPolicy()
+DEFAULT_POLICIES: dict[str, RetentionPolicy] = {SYSTEM_KIND: RetentionPolicy(max_count=None, evictable=False)}
+
+
+def _empty_names() -> list[str]:
+    return []
+
+
+@dataclass
+class RetentionReport:
+    dry_run: bool
+    deleted: list[str] = field(default_factory=_empty_names)
+    protected: list[str] = field(default_factory=_empty_names)
+    # Everything still stored after the pass, most recently used first; only listed on request.
+    retained: list[str] = field(default_factory=_empty_names)
+    bytes_freed: int = 0
+    bytes_total: int = 0
+    byte_budget: int | None = None
+
+
+def delete_artifact(index: ArtifactIndex, artifacts_dir: Path, entry: ArtifactIndexEntry) -> None:
+    """Remove an artifact, its index row and, once no other name shares the digest, its variants."""
+    path = artifacts_dir / entry.name
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+    get_digest_cache().forget(path)
+    index.remove(entry.name)
+    get_simulator_verifier().invalidate(entry.name)
+    if entry.sha256 and not index.digest_in_use(entry.sha256):
+        remove_variants(entry.sha256)
+
+
+def parse_policies(raw: str | None) -> dict[str, RetentionPolicy]:
+    """Parse ``{"kind": {"max_count": 10, "max_age_seconds": 86400}}`` on top of the defaults.
+
+    Raises ``ValueError`` when ``raw`` is not a JSON object of policy objects.
+    """
+    policies = dict(DEFAULT_POLICIES)
+    if not raw:
+        return policies
+    try:
+        data: dict[str, dict[str, Any]] = json.loads(raw)
+        for kind, values in data.items():
+            policies[kind] = RetentionPolicy(**values)
+    except (ValueError, TypeError, AttributeError) as exc:
+        raise ValueError(f"Invalid artifact retention policies: {exc}") from exc
+    return policies
+
+
+def automatic_retention_enabled(settings: RoundhouseSettings) -> bool:
+    """Evict after uploads only when limits were configured; otherwise only explicit cleanup evicts."""
+    return settings.artifact_byte_budget is not None or bool(settings.artifact_retention_policies)
+
+
+def _with_glue(names: set[str], filename: str) -> None:
+    names.add(filename)
+    if filename.lower().endswith(".wasm"):
+        base = filename[:-5]
+        names.update({f"{base}.js", f"{base}.mjs"})
+
+
+def collect_protected_refs() -> set[str]:
+    """Artifacts that are in use: manifest entries, node artifact refs and the current selection."""
+    protected: set[str] = set()
+    try:
+        for raw in load_manifest_from_disk():
+            try:
+                manifest = BuildManifest.model_validate(raw)
+            except ValidationError:
+                continue
+            for artifact in manifest.artifacts:
+                _with_glue(protected, artifact.filename)
+    except ManifestError:
+        pass
+    for record in get_node_registry().list_nodes():
+        if record.artifact_ref:
+            protected.add(record.artifact_ref)
+    selected = get_selected_artifact()
+    if selected:
+        _with_glue(protected, selected)
+    return protected
+
+
+class RetentionEngine:
+    """Evicts artifacts least-recently-used first until per-kind and byte limits hold.
+
+    Works off the artifact index, so a pass only touches as many rows as it
+    evicts (plus the protected ones it has to step over).
+    """
+
+    def __init__(
+        self,
+        index: ArtifactIndex,
+        artifacts_dir: Path,
+        byte_budget: int | None = None,
+        policies: dict[str, RetentionPolicy] | None = None,
+        protected_refs: Callable[[], set[str]] = collect_protected_refs,
+    ) -> None:
+        self._index = index
+        self._artifacts_dir = artifacts_dir
+        self._byte_budget = byte_budget
+        self._policies = policies if policies is not None else dict(DEFAULT_POLICIES)
+        self._protected_refs = protected_refs
+        self._run_lock = threading.Lock()
+        self._schedule_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifact-retention")
+        self._pending: Future[RetentionReport] | None = None
+
+    def policy_for(self, kind: str) -> RetentionPolicy:
+        return self._policies.get(kind, DEFAULT_POLICY)
+
+    def run(self, dry_run: bool = False, now: float | None = None, list_retained: bool = False) -> RetentionReport:
+        with self._run_lock:
+            report = self._run(dry_run, now if now is not None else time.time())
+            if list_retained:
+                deleted = set(report.deleted)
+                report.retained = [entry.name for entry in self._index.iter_lru() if entry.name not in deleted]
+                report.retained.reverse()
+            return report
+
+    def _run(self, dry_run: bool, now: float) -> RetentionReport:
+        usage = self._index.usage_by_kind()
+        counts = {kind: count for kind, (count, _total) in usage.items()}
+        total_bytes = sum(total for _count, total in usage.values())
+        report = RetentionReport(dry_run=dry_run, bytes_total=total_bytes, byte_budget=self._byte_budget)
+        protected = self._protected_refs()
+        # Protected entries are never evicted, so they do not use up a kind's count.
+        for name in protected:
+            entry = self._index.get(name)
+            if entry is not None and entry.kind in counts:
+                counts[entry.kind] -= 1
+        age_limits = [
+            p.max_age_seconds for p in self._policies.values() if p.evictable and p.max_age_seconds is not None
+        ]
+        oldest_allowed = now - min(age_limits) if age_limits else None
+
+        for entry in self._index.iter_lru():
+            over_budget = self._byte_budget is not None and total_bytes > self._byte_budget
+            over_count = any(
+                (limit := self.policy_for(kind).max_count) is not None and count > limit
+                for kind, count in counts.items()
+                if self.policy_for(kind).evictable
+            )
+            # Entries arrive oldest-access first, so once nothing is over a limit and this
+            # entry is too fresh for every age policy, no later entry can be evicted either.
+            if not over_budget and not over_count and (oldest_allowed is None or entry.last_access >= oldest_allowed):
+                break
+            policy = self.policy_for(entry.kind)
+            if not policy.evictable:
+                continue
+            if entry.name in protected:
+                report.protected.append(entry.name)
+                continue
+            expired = policy.max_age_seconds is not None and now - entry.last_access > policy.max_age_seconds
+            kind_over = policy.max_count is not None and counts.get(entry.kind, 0) > policy.max_count
+            if not (over_budget or kind_over or expired):
+                continue
+            if not dry_run:
+                self._delete(entry)
+            report.deleted.append(entry.name)
+            report.bytes_freed += entry.size_bytes
+            total_bytes -= entry.size_bytes
+            counts[entry.kind] = counts.get(entry.kind, 0) - 1
+        report.bytes_total = total_bytes
+        return report
+
+    def _delete(self, entry: ArtifactIndexEntry) -> None:
+        delete_artifact(self._index, self._artifacts_dir, entry)
+
+    def request_pass(self) -> Future[RetentionReport]:
+        """Schedule a debounced background pass; concurrent requests share the pending one."""
+        with self._schedule_lock:
+            if self._pending is not None and not self._pending.done():
+                return self._pending
+            self._pending = self._executor.submit(self._delayed_run)
+            return self._pending
+
+    def _delayed_run(self) -> RetentionReport:
+        time.sleep(DEBOUNCE_SECONDS)
+        return self.run()
+
+
+_engine: RetentionEngine | None = None
+
+
+def get_retention_engine(settings: RoundhouseSettings) -> RetentionEngine:
+    global _engine
+    if _engine is None:
+        _engine = RetentionEngine(
+            index=get_artifact_index(),
+            artifacts_dir=ARTIFACTS_DIR,
+            byte_budget=settings.artifact_byte_budget,
+            policies=parse_policies(settings.artifact_retention_policies),
+        )
+    return _engine
@@ -0,0 +1,355 @@
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import os
+import secrets
+import shutil
+import threading
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from roundhouse.services.artifact_paths import ARTIFACTS_DIR
+
+UPLOADS_DIR = ARTIFACTS_DIR / ".uploads"
+SESSION_TTL_SECONDS = 24 * 60 * 60
+MAX_CHUNK_BYTES = 32 * 1024 * 1024
+RECOMMENDED_CHUNK_BYTES = 8 * 1024 * 1024
+HASH_READ_CHUNK = 1024 * 1024
+EXPIRE_INTERVAL_SECONDS = 60 * 60
+
+_SESSION_FILE = "session.json"
+_DATA_FILE = "data.part"
+_LOCK_FILE = "session.lock"
+
+
+class UploadError(RuntimeError):
+    def __init__(self, message: str, code: str = "upload_error", status_code: int = 400) -> None:
+        super().__init__(message)
+        self.code = code
+        self.status_code = status_code
+
+
+def _default_received() -> list[list[int]]:
+    return []
+
+
+@dataclass
+class UploadSession:
+    session_id: str
+    filename: str
+    kind: str
+    size: int
+    expected_sha256: str | None
+    created_at: float
+    updated_at: float
+    # Sorted, non-overlapping half-open [start, end) byte intervals already on disk.
+    received: list[list[int]] = field(default_factory=_default_received)
+
+    @property
+    def received_bytes(self) -> int:
+        return sum(end - start for start, end in self.received)
+
+    @property
+    def contiguous_bytes(self) -> int:
+        if self.received and self.received[0][0] == 0:
+            return self.received[0][1]
+        return 0
+
+    @property
+    def complete(self) -> bool:
+        return self.contiguous_bytes == self.size
+
+    def missing(self) -> list[list[int]]:
+        gaps: list[list[int]] = []
+        cursor = 0
+        for start, end in self.received:
+            if start > cursor:
+                gaps.append([cursor, start])
+            cursor = end
+        if cursor < self.size:
+            gaps.append([cursor, self.size])
+        return gaps
+
+    def add_interval(self, start: int, end: int) -> None:
+        merged: list[list[int]] = []
+        for current in sorted([*self.received, [start, end]]):
+            if merged and current[0] <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], current[1])
+            else:
+                merged.append(list(current))
+        self.received = merged
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> UploadSession:
+        return cls(**data)
+
+
+class _SessionState:
+    """Per-process state that cannot be persisted: the lock and the running hash."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.hasher = hashlib.sha256()
+        self.hashed_offset = 0
+
+
+def validate_artifact_filename(filename: str) -> str:
+    if not filename or Path(filename).name != filename or filename.startswith("."):
+        raise UploadError("Invalid artifact filename", code="UPLOAD_INVALID_FILENAME")
+    return filename
+
+
+class ChunkedUploadManager:
+    """Resumable uploads: chunks are written at their offsets into a sparse part file.
+
+    Session metadata is rewritten atomically after every chunk, so a restart
+    only loses the in-memory hash state, which is rebuilt from the part file.
+    Bytes already received are never changed, so the running hash always
+    matches what finalize moves into place.
+    """
+
+    def __init__(
+        self,
+        uploads_dir: Path = UPLOADS_DIR,
+        ttl_seconds: int = SESSION_TTL_SECONDS,
+        expire_interval: float = EXPIRE_INTERVAL_SECONDS,
+    ) -> None:
+        self._uploads_dir = uploads_dir
+        self._ttl_seconds = ttl_seconds
+        self._expire_interval = expire_interval
+        self._lock = threading.Lock()
+        self._states: dict[str, _SessionState] = {}
+        self._expirer: threading.Thread | None = None
+        self._closed = threading.Event()
+
+    @property
+    def ttl_seconds(self) -> int:
+        return self._ttl_seconds
+
+    def _session_dir(self, session_id: str) -> Path:
+        if not session_id.isalnum():
+            raise UploadError("Upload session not found", code="UPLOAD_NOT_FOUND", status_code=404)
+        return self._uploads_dir / session_id
+
+    def _state(self, session_id: str) -> _SessionState:
+        with self._lock:
+            state = self._states.get(session_id)
+            if state is None:
+                state = _SessionState()
+                self._states[session_id] = state
+            return state
+
+    def _forget(self, session_id: str) -> None:
+        with self._lock:
+            self._states.pop(session_id, None)
+
+    @contextmanager
+    def _locked(self, session_id: str) -> Generator[_SessionState, None, None]:
+        """Serialize chunk writes and finalize across threads and, via flock, across workers."""
+        lock_path = self._session_dir(session_id) / _LOCK_FILE
+        state = self._state(session_id)
+        with state.lock:
+            try:
+                handle = lock_path.open("a")
+            except FileNotFoundError as exc:
+                self._forget(session_id)
+                raise UploadError("Upload session not found", code="UPLOAD_NOT_FOUND", status_code=404) from exc
+            with handle:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                yield state
+
+    def _load(self, session_id: str) -> UploadSession:
+        path = self._session_dir(session_id) / _SESSION_FILE
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                return UploadSession.from_dict(json.load(f))
+        except FileNotFoundError as exc:
+            raise UploadError("Upload session not found", code="UPLOAD_NOT_FOUND", status_code=404) from exc
+
+    def _save(self, session: UploadSession) -> None:
+        path = self._session_dir(session.session_id) / _SESSION_FILE
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(asdict(session), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def create(self, filename: str, size: int, kind: str = "generic", sha256: str | None = None) -> UploadSession:
+        validate_artifact_filename(filename)
+        if size < 0:
+            raise UploadError("Upload size must be non-negative", code="UPLOAD_INVALID_SIZE")
+        now = time.time()
+        session = UploadSession(
+            session_id=secrets.token_hex(16),
+            filename=filename,
+            kind=kind,
+            size=size,
+            expected_sha256=sha256.lower() if sha256 else None,
+            created_at=now,
+            updated_at=now,
+        )
+        session_dir = self._session_dir(session.session_id)
+        session_dir.mkdir(parents=True)
+        with (session_dir / _DATA_FILE).open("wb") as f:
+            f.truncate(size)
+        self._save(session)
+        return session
+
+    def get(self, session_id: str) -> UploadSession:
+        return self._load(session_id)
+
+    def write_chunk(self, session_id: str, offset: int, data: bytes) -> UploadSession:
+        if len(data) > MAX_CHUNK_BYTES:
+            raise UploadError("Chunk exceeds maximum size", code="UPLOAD_CHUNK_TOO_LARGE", status_code=413)
+        # The write happens under the session lock so finalize can never hash or move the
+        # part file while a chunk is landing in it.
+        with self._locked(session_id) as state:
+            session = self._load(session_id)
+            if offset < 0 or offset + len(data) > session.size:
+                raise UploadError(
+                    "Chunk lies outside the declared upload size", code="UPLOAD_INVALID_RANGE", status_code=416
+                )
+            try:
+                fd = os.open(self._session_dir(session_id) / _DATA_FILE, os.O_RDWR)
+            except FileNotFoundError as exc:
+                # Finalized by another worker that had not yet removed the session directory.
+                raise UploadError("Upload session not found", code="UPLOAD_NOT_FOUND", status_code=404) from exc
+            try:
+                if _rewrites_received(fd, session, offset, data):
+                    raise UploadError(
+                        "Chunk changes bytes that were already received",
+                        code="UPLOAD_CHUNK_CONFLICT",
+                        status_code=409,
+                    )
+                written = 0
+                while written < len(data):
+                    written += os.pwrite(fd, data[written:], offset + written)
+            finally:
+                os.close(fd)
+            if data:
+                session.add_interval(offset, offset + len(data))
+            session.updated_at = time.time()
+            self._save(session)
+            self._advance_hash(session, state)
+        return session
+
+    def _advance_hash(self, session: UploadSession, state: _SessionState) -> None:
+        target = session.contiguous_bytes
+        if state.hashed_offset >= target:
+            return
+        with (self._session_dir(session.session_id) / _DATA_FILE).open("rb") as f:
+            f.seek(state.hashed_offset)
+            while state.hashed_offset < target:
+                chunk = f.read(min(HASH_READ_CHUNK, target - state.hashed_offset))
+                if not chunk:
+                    break
+                state.hasher.update(chunk)
+                state.hashed_offset += len(chunk)
+
+    def finalize(self, session_id: str, dest_dir: Path, sha256: str | None = None) -> tuple[UploadSession, Path, str]:
+        with self._locked(session_id) as state:
+            session = self._load(session_id)
+            if not session.complete:
+                raise UploadError("Upload is missing chunks", code="UPLOAD_INCOMPLETE", status_code=409)
+            self._advance_hash(session, state)
+            digest = state.hasher.hexdigest()
+            expected = (sha256 or session.expected_sha256 or "").lower()
+            if expected and expected != digest:
+                raise UploadError(
+                    "Uploaded content does not match expected digest", code="UPLOAD_DIGEST_MISMATCH", status_code=422
+                )
+            session_dir = self._session_dir(session_id)
+            data_path = session_dir / _DATA_FILE
+            with data_path.open("rb+") as f:
+                os.fsync(f.fileno())
+            dest = dest_dir / session.filename
+            # Same filesystem, so the artifact appears atomically or not at all.
+            os.replace(data_path, dest)
+            shutil.rmtree(session_dir, ignore_errors=True)
+        self._forget(session_id)
+        return session, dest, digest
+
+    def abort(self, session_id: str) -> None:
+        session_dir = self._session_dir(session_id)
+        if not session_dir.exists():
+            raise UploadError("Upload session not found", code="UPLOAD_NOT_FOUND", status_code=404)
+        shutil.rmtree(session_dir, ignore_errors=True)
+        self._forget(session_id)
+
+    def start(self) -> None:
+        """Expire abandoned sessions now and then every ``expire_interval`` in the background."""
+        if self._expirer is None and not self._closed.is_set():
+            with self._lock:
+                if self._expirer is None:
+                    self._expirer = threading.Thread(target=self._run, name="artifact-upload-expiry", daemon=True)
+                    self._expirer.start()
+
+    def _run(self) -> None:
+        while True:
+            self.expire()
+            if self._closed.wait(self._expire_interval):
+                return
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._expirer is not None:
+            self._expirer.join()
+
+    def expire(self, now: float | None = None) -> list[str]:
+        """Remove sessions that have not received a chunk within the TTL."""
+        if not self._uploads_dir.exists():
+            return []
+        cutoff = (now if now is not None else time.time()) - self._ttl_seconds
+        expired: list[str] = []
+        for session_dir in self._uploads_dir.iterdir():
+            if not session_dir.is_dir() or self._updated_at(session_dir) >= cutoff:
+                continue
+            try:
+                # Re-checked under the lock: a chunk may have arrived since the scan.
+                with self._locked(session_dir.name):
+                    if self._updated_at(session_dir) >= cutoff:
+                        continue
+                    shutil.rmtree(session_dir, ignore_errors=True)
+            except UploadError:
+                continue
+            self._forget(session_dir.name)
+            expired.append(session_dir.name)
+        return expired
+
+    def _updated_at(self, session_dir: Path) -> float:
+        try:
+            return self._load(session_dir.name).updated_at
+        except (UploadError, ValueError, TypeError):
+            # Unreadable metadata (e.g. crash before the first save): age by directory mtime.
+            try:
+                return session_dir.stat().st_mtime
+            except FileNotFoundError:
+                return float("inf")
+
+
+def _rewrites_received(fd: int, session: UploadSession, offset: int, data: bytes) -> bool:
+    """True when ``data`` overlaps received bytes and differs from them; identical resends are fine."""
+    end = offset + len(data)
+    for start, stop in session.received:
+        low, high = max(start, offset), min(stop, end)
+        if low < high and os.pread(fd, high - low, low) != data[low - offset : high - offset]:
+            return True
+    return False
+
+
+_upload_manager: ChunkedUploadManager | None = None
+
+
+def get_upload_manager() -> ChunkedUploadManager:
+    global _upload_manager
+    if _upload_manager is None:
+        _upload_manager = ChunkedUploadManager()
+        _upload_manager.start()
+    return _upload_manager
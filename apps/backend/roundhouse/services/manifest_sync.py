@@ -5,10 +5,12 @@ import os
 from pathlib import Path
 from typing import Any, Dict, List, cast
 
+import httpx
 import requests
 from pydantic import BaseModel, ValidationError, field_validator, model_validator
 
 from apps.backend.roundhouse.settings import RoundhouseSettings
+from roundhouse.services.release_metadata import get_release_metadata_cache
 from roundhouse.settings import load_settings
 
 MANIFEST_PATH = Path(__file__).resolve().parent.parent.parent / "artifacts" / "build-artifact-manifests.json"
@@ -23,26 +25,26 @@ class ManifestError(RuntimeError):
         self.status_code = status_code
 
 
-def _raise_for_repo_response(resp: requests.Response) -> None:
-    if resp.status_code == 401:
+def _raise_for_repo_status(status_code: int) -> None:
+    if status_code == 401:
         raise ManifestError(
             "GitHub authentication failed for repository",
             code="REPO_AUTH_FAILED",
             status_code=401,
         )
-    if resp.status_code == 403:
+    if status_code == 403:
         raise ManifestError(
             "GitHub token does not have access to this repository",
             code="REPO_FORBIDDEN",
             status_code=403,
         )
-    if resp.status_code == 404:
+    if status_code == 404:
         raise ManifestError(
             "Repository or release not found",
             code="REPO_NOT_FOUND",
             status_code=404,
         )
-    if resp.status_code >= 400:
+    if status_code >= 400:
         raise ManifestError(
             "Repository URL is invalid or unreachable",
             code="REPO_INVALID_URL",
@@ -50,12 +52,6 @@ def _raise_for_repo_response(resp: requests.Response) -> None:
         )
 
 
-def _release_api_url(repo: str, release_tag: str) -> str:
-    if release_tag == "latest":
-        return f"https://api.github.com/repos/{repo}/releases/latest"
-    return f"https://api.github.com/repos/{repo}/releases/tags/{release_tag}"
-
-
 class ManifestArtifactFile(BaseModel):
     filename: str
     sha256: str | None = None
@@ -103,21 +99,20 @@ def fetch_manifest_from_github(repo: str, release_tag: str, asset_name: str, tok
     Download the manifest asset from a GitHub release and save to MANIFEST_PATH.
     Returns True if successful, False otherwise.
     """
-    api_url = _release_api_url(repo, release_tag)
     headers = {"Accept": "application/vnd.github+json"}
     if token:
         headers["Authorization"] = f"token {token}"
     try:
-        resp = requests.get(api_url, headers=headers, timeout=20)
-    except requests.RequestException as exc:
+        # An explicit refresh must see a re-published release, not the cached one.
+        release = get_release_metadata_cache().get_sync(repo, release_tag, token, revalidate=True)
+    except httpx.HTTPError as exc:
         raise ManifestError(
             "Repository URL is invalid or unreachable",
             code="REPO_INVALID_URL",
             status_code=400,
         ) from exc
-    _raise_for_repo_response(resp)
-    release = resp.json()
-    assets = [a for a in release.get("assets", []) if a.get("name", "").endswith(asset_name)]
+    _raise_for_repo_status(release.status_code)
+    assets = [a for a in release.assets if a.get("name", "").endswith(asset_name)]
     if not assets:
         raise ManifestError(
             "No canonical manifest found in release assets",
@@ -126,9 +121,16 @@ def fetch_manifest_from_github(repo: str, release_tag: str, asset_name: str, tok
         )
     manifests: list[dict[str, Any]] = []
     for asset in assets:
-        download_url = asset.get("url") or asset.get("browser_download_url")
+        api_url = asset.get("url")
+        download_url = api_url or asset.get("browser_download_url")
+        if not isinstance(download_url, str):
+            raise ManifestError(
+                "Manifest asset has no download URL",
+                code="MANIFEST_NOT_FOUND",
+                status_code=404,
+            )
         download_headers = headers.copy()
-        if asset.get("url"):
+        if api_url:
             download_headers["Accept"] = "application/octet-stream"
         try:
             asset_resp = requests.get(download_url, headers=download_headers, timeout=20)
@@ -217,3 +219,18 @@ def get_manifest_sync_config() -> tuple[str | None, str, str, str | None]:
     asset_name = os.getenv("ROUNDHOUSE_PANEL_MANIFEST_NAME", "build-artifact-manifest.json")
     token = settings.panel_release_token
     return repo, release_tag, asset_name, token
+
+
+def find_local_manifest_artifact(filename: str) -> tuple[BuildManifest, ManifestArtifactFile] | None:
+    """Look up an artifact in the manifest already on disk; never fetches from GitHub."""
+    if not MANIFEST_PATH.exists():
+        return None
+    try:
+        manifests = get_manifest(*get_manifest_sync_config())
+    except ManifestError:
+        return None
+    for manifest in manifests:
+        for entry in manifest.artifacts:
+            if entry.filename == filename:
+                return manifest, entry
+    return None
@@ -1,16 +1,49 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime
+import asyncio
+import hashlib
+import os
+import secrets
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from pathlib import Path
-import subprocess
-from typing import Any, cast
-import zipfile
+from typing import Literal, cast
 
 import httpx
 
+from core.panel.models import PanelLifecycleSnapshot
+from roundhouse.services.panel_install_index import (
+    InstallIndex,
+    InstallManifest,
+    scan_executables,
+    write_install_manifest,
+)
+from roundhouse.services.panel_logs import LogRing, PanelLogStore
+from roundhouse.services.panel_metrics import ProcessMetricsSampler, ProcessSample
+from roundhouse.services.panel_release_cache import CACHE_DIR_NAME, PanelReleaseCache, source_key
+from roundhouse.services.panel_supervisor import (
+    ProcessState,
+    ProcessSupervisor,
+    RestartPolicy,
+    SupervisedProcess,
+)
+from roundhouse.services.release_metadata import (
+    ReleaseMetadata,
+    ReleaseMetadataCache,
+    ReleaseMetadataError,
+    get_release_metadata_cache,
+)
 from roundhouse.settings import RoundhouseSettings
 
+DOWNLOAD_CHUNK_BYTES = 256 * 1024
+# Finished jobs kept for the status endpoint before the oldest are dropped.
+MAX_FINISHED_JOBS = 100
+DEFAULT_EXECUTABLE = "ha_panel_sim"
+
+InstallState = Literal["queued", "downloading", "extracting", "materializing", "completed", "failed"]
+
 
 @dataclass(frozen=True)
 class PanelDesktopInstallResult:
@@ -28,73 +61,188 @@ class PanelDesktopProcessStatus:
     started_at: datetime | None
     executable: str | None
     return_code: int | None
+    state: ProcessState = "stopped"
+    restarts: int = 0
+    next_restart_at: datetime | None = None
+    error: str | None = None
+    metrics: ProcessSample | None = None
+    cpu_percent: float | None = None
+    last_log: str | None = None
 
 
 @dataclass
-class _DesktopProcess:
-    process: subprocess.Popen[str]
-    started_at: datetime
-    executable: str
+class PanelInstallJob:
+    """Progress of one install; fields are updated in place while the job runs."""
+
+    job_id: str
+    node_id: str
+    repo: str
+    tag: str
+    asset_name: str
+    created_at: datetime
+    # What the caller asked for, so a duplicate request can be told apart from a conflicting one.
+    asset_url: str | None = None
+    expected_sha256: str | None = None
+    state: InstallState = "queued"
+    bytes_downloaded: int = 0
+    bytes_total: int | None = None
+    files_extracted: int = 0
+    files_linked: int = 0
+    files_total: int | None = None
+    cache_hit: bool = False
+    sha256: str | None = None
+    error: str | None = None
+    finished_at: datetime | None = None
+    result: PanelDesktopInstallResult | None = None
+    task: asyncio.Task[PanelDesktopInstallResult] | None = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.state in ("completed", "failed")
+
+
+class InstallDigestError(ValueError):
+    pass
+
+
+class InstallConflictError(Exception):
+    """A pending install for the same node and release was asked for a different URL or digest."""
+
+
+def _node_dir_name(node_id: str) -> str:
+    """Node ids name directories under the install root, next to the shared ``.release-cache``."""
+    if not node_id or Path(node_id).name != node_id or node_id.startswith("."):
+        raise ValueError(f"Invalid node id for a desktop install: {node_id!r}")
+    return node_id
 
 
 class PanelDesktopManager:
-    def __init__(self, settings: RoundhouseSettings) -> None:
+    def __init__(
+        self,
+        settings: RoundhouseSettings,
+        transport: httpx.AsyncBaseTransport | None = None,
+        release_metadata: ReleaseMetadataCache | None = None,
+    ) -> None:
         self._settings = settings
-        self._processes: dict[str, _DesktopProcess] = {}
-
-    def _github_headers(self) -> dict[str, str]:
-        token = self._settings.panel_release_token
-        if not token:
-            return {"Accept": "application/vnd.github+json"}
-        return {
-            "Accept": "application/vnd.github+json",
-            "Authorization": f"Bearer {token}",
-        }
-
-    def _resolve_release_asset_url(self, repo: str, tag: str, asset_name: str) -> str:
-        url = f"https://api.github.com/repos/{repo}/releases/tags/{tag}"
-        with httpx.Client(timeout=20) as client:
-            response = client.get(url, headers=self._github_headers())
-            response.raise_for_status()
-            payload = response.json()
-        assets = payload.get("assets", [])
-        for asset in assets:
-            if asset.get("name") == asset_name:
-                return cast(str, asset.get("browser_download_url"))
-        raise ValueError("Release asset not found")
-
-    def _download_asset(self, url: str, dest: Path) -> None:
+        self._transport = transport
+        self._release_metadata = release_metadata or get_release_metadata_cache()
+        self._logs = PanelLogStore(Path(settings.panel_log_dir) if settings.panel_log_dir else None)
+        self._metrics = ProcessMetricsSampler(self._running_pids)
+        self._supervisor = ProcessSupervisor(logs=self._logs, on_exit=self._metrics.forget)
+        self._jobs: OrderedDict[str, PanelInstallJob] = OrderedDict()
+        self._install_slots: asyncio.Semaphore | None = None
+        self._node_install_locks: dict[str, asyncio.Lock] = {}
+        self._release_locks: dict[str, asyncio.Lock] = {}
+        self._install_index = InstallIndex()
+
+    def _client(self, timeout: float) -> httpx.AsyncClient:
+        return httpx.AsyncClient(timeout=timeout, follow_redirects=True, transport=self._transport)
+
+    async def _resolve_release_asset(self, repo: str, tag: str, asset_name: str) -> tuple[str, str | None]:
+        """Return the download URL and, when GitHub publishes one, the asset's sha256."""
+        metadata, asset = await self._release_metadata.find_asset(
+            repo, tag, asset_name, self._settings.panel_release_token
+        )
+        if metadata.status_code == 404:
+            raise ValueError("Release not found")
+        if not metadata.found:
+            raise ReleaseMetadataError(f"GitHub release lookup failed with status {metadata.status_code}")
+        if asset is None:
+            raise ValueError("Release asset not found")
+        digest = cast(str | None, asset.get("digest"))
+        sha256 = digest.split(":", 1)[1] if digest and digest.startswith("sha256:") else None
+        return cast(str, asset.get("browser_download_url")), sha256
+
+    async def _download_asset(self, url: str, dest: Path, job: PanelInstallJob, expected_sha256: str | None) -> str:
+        """Stream to a part file, hashing as bytes arrive; the archive only appears once verified."""
         dest.parent.mkdir(parents=True, exist_ok=True)
-        with httpx.Client(timeout=60) as client:
-            with client.stream("GET", url) as response:
-                response.raise_for_status()
-                with dest.open("wb") as handle:
-                    for chunk in response.iter_bytes():
-                        handle.write(chunk)
-
-    def _extract_zip(self, zip_path: Path, target_dir: Path) -> None:
-        target_dir.mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(zip_path) as archive:
-            archive.extractall(target_dir)
-
-    def install_from_release(
+        part = dest.with_name(f".{dest.name}.part")
+        digest = hashlib.sha256()
+        try:
+            async with self._client(timeout=60) as client:
+                async with client.stream("GET", url) as response:
+                    response.raise_for_status()
+                    length = response.headers.get("content-length")
+                    job.bytes_total = int(length) if length and length.isdigit() else None
+                    with part.open("wb") as handle:
+                        async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_BYTES):
+                            handle.write(chunk)
+                            digest.update(chunk)
+                            job.bytes_downloaded += len(chunk)
+            sha256 = digest.hexdigest()
+            if expected_sha256 and expected_sha256.lower() != sha256:
+                raise InstallDigestError("Downloaded asset does not match the expected sha256")
+            os.replace(part, dest)
+        finally:
+            part.unlink(missing_ok=True)
+        return sha256
+
+    async def prewarm_releases(self, repo: str, tags: list[str]) -> list[ReleaseMetadata | BaseException]:
+        return await self._release_metadata.prewarm(repo, tags, self._settings.panel_release_token)
+
+    async def install_from_release(
         self,
         node_id: str,
         repo: str,
         tag: str,
         asset_name: str,
         asset_url: str | None = None,
+        sha256: str | None = None,
+        job: PanelInstallJob | None = None,
     ) -> PanelDesktopInstallResult:
         install_root = self._settings.panel_install_dir
         if not install_root:
             raise ValueError("panel_install_dir not configured")
-        resolved_url = asset_url or self._resolve_release_asset_url(repo, tag, asset_name)
-        install_dir = Path(install_root) / node_id / tag
-        archive_path = install_dir / asset_name
-        self._download_asset(resolved_url, archive_path)
-        if not archive_path.suffix.lower().endswith("zip"):
+        if not asset_name.lower().endswith(".zip"):
             raise ValueError("Only .zip assets are supported")
-        self._extract_zip(archive_path, install_dir)
+        if job is None:
+            job = self._new_job(node_id, repo, tag, asset_name)
+        install_dir = Path(install_root) / _node_dir_name(node_id) / tag
+        cache = PanelReleaseCache(Path(install_root) / CACHE_DIR_NAME)
+        key = source_key(repo, tag, asset_name)
+
+        def extracted(done: int, total: int) -> None:
+            job.files_extracted, job.files_total = done, total
+
+        def linked(done: int, total: int) -> None:
+            job.files_linked, job.files_total = done, total
+
+        # Concurrent installs of one release share a single download and extraction.
+        async with self._release_locks.setdefault(key, asyncio.Lock()):
+            cached = cache.lookup(repo, tag, asset_name)
+            if cached is not None and (not sha256 or cached[0] == sha256.lower()):
+                digest, tree = cached
+                job.cache_hit = True
+            else:
+                expected = sha256
+                resolved_url = asset_url
+                if resolved_url is None:
+                    resolved_url, published = await self._resolve_release_asset(repo, tag, asset_name)
+                    expected = expected or published
+                archive_path = cache.downloads_dir / f"{key}.zip"
+                job.state = "downloading"
+                digest = await self._download_asset(resolved_url, archive_path, job, expected)
+                job.state = "extracting"
+                try:
+                    tree = await asyncio.to_thread(cache.extract, archive_path, digest, extracted)
+                finally:
+                    archive_path.unlink(missing_ok=True)
+                cache.record(repo, tag, asset_name, digest)
+        job.sha256 = digest
+        job.state = "materializing"
+        await asyncio.to_thread(cache.materialize, tree, install_dir, linked)
+        # Resolve executables now, against the shared read-only tree, so start() never walks the install.
+        executables = await asyncio.to_thread(scan_executables, tree, [self._default_executable()])
+        manifest = InstallManifest(
+            version=tag,
+            install_dir=install_dir.name,
+            repo=repo,
+            asset_name=asset_name,
+            sha256=digest,
+            installed_at=datetime.now(timezone.utc).isoformat(),
+            executables=executables,
+        )
+        await asyncio.to_thread(write_install_manifest, install_dir.parent, manifest)
         return PanelDesktopInstallResult(
             node_id=node_id,
             install_dir=str(install_dir),
@@ -102,56 +250,184 @@ class PanelDesktopManager:
             asset_name=asset_name,
         )
 
-    def _find_executable(self, install_dir: Path, executable_name: str) -> Path:
-        direct = install_dir / executable_name
-        if direct.exists():
-            return direct
-        for path in install_dir.rglob(executable_name):
-            if path.is_file():
-                return path
-        raise FileNotFoundError(f"Executable not found: {executable_name}")
-
-    def start(self, node_id: str, executable_name: str) -> PanelDesktopProcessStatus:
-        record = self._processes.get(node_id)
-        if record and record.process.poll() is None:
-            return self.status(node_id)
-        if not executable_name:
-            executable_name = self._settings.panel_desktop_executable or "ha_panel_sim"
+    def _new_job(self, node_id: str, repo: str, tag: str, asset_name: str) -> PanelInstallJob:
+        return PanelInstallJob(
+            job_id=secrets.token_hex(8),
+            node_id=node_id,
+            repo=repo,
+            tag=tag,
+            asset_name=asset_name,
+            created_at=datetime.now(timezone.utc),
+        )
+
+    def submit_install(
+        self,
+        node_id: str,
+        repo: str,
+        tag: str,
+        asset_name: str,
+        asset_url: str | None = None,
+        sha256: str | None = None,
+        on_complete: Callable[[PanelDesktopInstallResult], None] | None = None,
+    ) -> PanelInstallJob:
+        """Start an install in the background; must be called from the event loop.
+
+        Installs for different nodes run concurrently up to the configured cap,
+        installs for the same node run one after another, and a request that
+        duplicates a pending job for the same node returns that job. A request
+        for the same release with a different ``asset_url`` or ``sha256`` than
+        the pending job raises ``InstallConflictError`` instead. ``on_complete``
+        runs in a worker thread once the install succeeds.
+        """
+        _node_dir_name(node_id)
+        expected = sha256.lower() if sha256 else None
+        for existing in self._jobs.values():
+            if existing.done or (existing.node_id, existing.repo, existing.tag, existing.asset_name) != (
+                node_id,
+                repo,
+                tag,
+                asset_name,
+            ):
+                continue
+            # Leaving a field out accepts whatever the pending job uses.
+            if (asset_url is not None and asset_url != existing.asset_url) or (
+                expected is not None and expected != existing.expected_sha256
+            ):
+                raise InstallConflictError(
+                    f"An install of {repo} {tag} for node {node_id} is already pending with a different asset"
+                )
+            return existing
+        job = self._new_job(node_id, repo, tag, asset_name)
+        job.asset_url, job.expected_sha256 = asset_url, expected
+        self._jobs[job.job_id] = job
+        self._prune_jobs()
+        job.task = asyncio.create_task(self._run_install(job, asset_url, sha256, on_complete))
+        # Failures are reported through the job; mark the exception retrieved for fire-and-forget callers.
+        job.task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return job
+
+    async def _run_install(
+        self,
+        job: PanelInstallJob,
+        asset_url: str | None,
+        sha256: str | None,
+        on_complete: Callable[[PanelDesktopInstallResult], None] | None,
+    ) -> PanelDesktopInstallResult:
+        if self._install_slots is None:
+            self._install_slots = asyncio.Semaphore(self._settings.panel_install_concurrency)
+        node_lock = self._node_install_locks.setdefault(job.node_id, asyncio.Lock())
+        try:
+            async with node_lock, self._install_slots:
+                job.result = await self.install_from_release(
+                    job.node_id, job.repo, job.tag, job.asset_name, asset_url=asset_url, sha256=sha256, job=job
+                )
+                if on_complete is not None:
+                    await asyncio.to_thread(on_complete, job.result)
+        except Exception as exc:
+            job.state = "failed"
+            job.error = str(exc) or type(exc).__name__
+            job.finished_at = datetime.now(timezone.utc)
+            raise
+        job.state = "completed"
+        job.finished_at = datetime.now(timezone.utc)
+        return job.result
+
+    async def wait_for_install(self, job: PanelInstallJob) -> PanelDesktopInstallResult:
+        if job.task is None:
+            raise ValueError("Install job was never started")
+        return await asyncio.shield(job.task)
+
+    def install_job(self, job_id: str) -> PanelInstallJob | None:
+        return self._jobs.get(job_id)
+
+    def install_jobs(self, node_id: str | None = None) -> list[PanelInstallJob]:
+        return [job for job in self._jobs.values() if node_id is None or job.node_id == node_id]
+
+    def _prune_jobs(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def _default_executable(self) -> str:
+        return self._settings.panel_desktop_executable or DEFAULT_EXECUTABLE
+
+    async def _resolve_start(
+        self, node_id: str, executable_name: str, policy: RestartPolicy | None
+    ) -> tuple[str, list[str], Path, RestartPolicy | None]:
         install_root = self._settings.panel_install_dir
         if not install_root:
             raise ValueError("panel_install_dir not configured")
-        install_dir = Path(install_root) / node_id
-        if not install_dir.exists():
-            raise FileNotFoundError("Install directory not found")
-        latest_dir = max(install_dir.iterdir(), key=lambda p: p.stat().st_mtime)
-        executable_path = self._find_executable(latest_dir, executable_name)
-        process = subprocess.Popen([str(executable_path)], cwd=latest_dir, text=True)
-        entry = _DesktopProcess(
-            process=process,
-            started_at=datetime.now(),
-            executable=str(executable_path),
+        # Usually a manifest read; legacy installs may need one search of the tree.
+        cwd, executable = await asyncio.to_thread(
+            self._install_index.resolve,
+            Path(install_root) / _node_dir_name(node_id),
+            executable_name or self._default_executable(),
         )
-        self._processes[node_id] = entry
+        return node_id, [str(executable)], cwd, policy
+
+    async def start(
+        self, node_id: str, executable_name: str = "", policy: RestartPolicy | None = None
+    ) -> PanelDesktopProcessStatus:
+        entry = self._supervisor.get(node_id)
+        if entry is not None and entry.active:
+            return self.status(node_id)
+        await self._supervisor.start(*await self._resolve_start(node_id, executable_name, policy))
+        self._metrics.ensure_running()
         return self.status(node_id)
 
-    def stop(self, node_id: str) -> PanelDesktopProcessStatus:
-        record = self._processes.get(node_id)
-        if not record:
-            return PanelDesktopProcessStatus(
-                node_id=node_id,
-                running=False,
-                pid=None,
-                started_at=None,
-                executable=None,
-                return_code=None,
-            )
-        record.process.terminate()
-        record.process.wait(timeout=10)
+    async def start_many(
+        self, requests: list[tuple[str, str]], policy: RestartPolicy | None = None
+    ) -> list[PanelDesktopProcessStatus | BaseException]:
+        """Start ``(node_id, executable_name)`` pairs concurrently; failures are returned per node."""
+        return await asyncio.gather(
+            *(self.start(node_id, executable_name, policy) for node_id, executable_name in requests),
+            return_exceptions=True,
+        )
+
+    async def stop(self, node_id: str, timeout: float | None = None) -> PanelDesktopProcessStatus:
+        await self._supervisor.stop(node_id, timeout)
         return self.status(node_id)
 
+    async def stop_many(
+        self, node_ids: list[str], timeout: float | None = None
+    ) -> list[PanelDesktopProcessStatus | BaseException]:
+        return await asyncio.gather(*(self.stop(node_id, timeout) for node_id in node_ids), return_exceptions=True)
+
+    async def shutdown(self) -> None:
+        await self._metrics.stop()
+        await self._supervisor.shutdown()
+
+    def _running_pids(self) -> dict[str, int]:
+        return {entry.node_id: pid for entry in self._supervisor.entries() if (pid := entry.pid) is not None}
+
+    def metrics(self, node_id: str, limit: int | None = None) -> list[ProcessSample]:
+        return self._metrics.samples(node_id, limit)
+
+    def metrics_node_ids(self) -> list[str]:
+        return self._metrics.node_ids()
+
+    def logs(self, node_id: str) -> LogRing | None:
+        return self._logs.get(node_id)
+
+    def lifecycle_snapshot(self, node_id: str, log_lines: int = 5) -> PanelLifecycleSnapshot:
+        """Process-level view of a desktop panel.
+
+        The supervisor only sees the process, so readiness flags stay False;
+        the panel itself reports transport and UI readiness.
+        """
+        status = self.status(node_id)
+        return PanelLifecycleSnapshot(
+            env_id=node_id,
+            state=status.state,
+            transport_connected=False,
+            accepting_ingress=False,
+            ui_ready=False,
+            last_log=self._logs.last_log(node_id, log_lines),
+        )
+
     def status(self, node_id: str) -> PanelDesktopProcessStatus:
-        record = self._processes.get(node_id)
-        if not record:
+        entry = self._supervisor.get(node_id)
+        if entry is None:
             return PanelDesktopProcessStatus(
                 node_id=node_id,
                 running=False,
@@ -160,16 +436,28 @@ class PanelDesktopManager:
                 executable=None,
                 return_code=None,
             )
-        return_code = record.process.poll()
-        running = return_code is None
-        return PanelDesktopProcessStatus(
-            node_id=node_id,
-            running=running,
-            pid=record.process.pid if running else None,
-            started_at=record.started_at,
-            executable=record.executable,
-            return_code=return_code,
-        )
+        sample, cpu = self._metrics.latest(node_id)
+        return _process_status(entry, sample, cpu, self._logs.last_log(node_id))
+
+
+def _process_status(
+    entry: SupervisedProcess, sample: ProcessSample | None, cpu_percent: float | None, last_log: str | None
+) -> PanelDesktopProcessStatus:
+    return PanelDesktopProcessStatus(
+        node_id=entry.node_id,
+        running=entry.running,
+        pid=entry.pid,
+        started_at=entry.started_at,
+        executable=entry.executable,
+        return_code=entry.return_code,
+        state=entry.state,
+        restarts=entry.restarts,
+        next_restart_at=entry.next_restart_at,
+        error=entry.error,
+        metrics=sample,
+        cpu_percent=cpu_percent,
+        last_log=last_log,
+    )
 
 
 _manager: PanelDesktopManager | None = None
@@ -180,3 +468,11 @@ def get_panel_desktop_manager(settings: RoundhouseSettings) -> PanelDesktopManag
     if _manager is None:
         _manager = PanelDesktopManager(settings)
     return _manager
+
+
+async def shutdown_panel_desktop_manager() -> None:
+    """Stop every supervised panel process; a no-op when the manager was never used."""
+    global _manager
+    if _manager is not None:
+        await _manager.shutdown()
+        _manager = None
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+# Written into <panel_install_dir>/<node_id>/ after every install; describes the current tree.
+INSTALL_MANIFEST_NAME = ".roundhouse-install.json"
+
+
+def _no_executables() -> dict[str, str]:
+    return {}
+
+
+@dataclass(frozen=True)
+class InstallManifest:
+    version: str
+    install_dir: str
+    repo: str
+    asset_name: str
+    sha256: str | None
+    installed_at: str
+    # Executable basename -> path relative to install_dir, resolved once at install time.
+    executables: dict[str, str] = field(default_factory=_no_executables)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> InstallManifest:
+        return cls(**data)
+
+
+def find_executable(install_dir: Path, executable_name: str) -> Path:
+    direct = install_dir / executable_name
+    if direct.exists():
+        return direct
+    for path in install_dir.rglob(executable_name):
+        if path.is_file():
+            return path
+    raise FileNotFoundError(f"Executable not found: {executable_name}")
+
+
+def scan_executables(tree: Path, names: Iterable[str] = ()) -> dict[str, str]:
+    """Map basenames of executable files (plus any explicitly requested names) to relative paths.
+
+    Shallower paths win, matching ``find_executable``'s preference for the top level.
+    """
+    wanted = set(names)
+    found: dict[str, str] = {}
+    for path in sorted(tree.rglob("*"), key=lambda p: (len(p.parts), str(p))):
+        if path.name in found or path.is_dir():
+            continue
+        if path.name in wanted or os.access(path, os.X_OK):
+            found[path.name] = str(path.relative_to(tree))
+    return found
+
+
+def write_install_manifest(node_dir: Path, manifest: InstallManifest) -> None:
+    path = node_dir / INSTALL_MANIFEST_NAME
+    tmp = node_dir / f"{INSTALL_MANIFEST_NAME}.tmp"
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(asdict(manifest), f)
+    os.replace(tmp, path)
+
+
+@dataclass
+class _IndexedInstall:
+    mtime_ns: int
+    install_dir: Path
+    executables: dict[str, Path]
+
+
+class InstallIndex:
+    """Resolves a node's current install directory and executable without walking the tree.
+
+    The install manifest is re-read only when its mtime changes. Installs made
+    before manifests existed fall back to the newest tag directory, re-indexed
+    only when the node directory itself changes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[Path, _IndexedInstall] = {}
+
+    def resolve(self, node_dir: Path, executable_name: str) -> tuple[Path, Path]:
+        """Return ``(install_dir, executable_path)``."""
+        entry = self._entry(node_dir)
+        with self._lock:
+            executable = entry.executables.get(executable_name)
+        if executable is None or not executable.exists():
+            # Name not recorded at install time (or the file vanished): search once and remember it.
+            executable = find_executable(entry.install_dir, executable_name)
+            with self._lock:
+                entry.executables[executable_name] = executable
+        return entry.install_dir, executable
+
+    def _entry(self, node_dir: Path) -> _IndexedInstall:
+        manifest_path = node_dir / INSTALL_MANIFEST_NAME
+        try:
+            mtime_ns = manifest_path.stat().st_mtime_ns
+            source = manifest_path
+        except FileNotFoundError:
+            try:
+                mtime_ns = node_dir.stat().st_mtime_ns
+            except FileNotFoundError as exc:
+                raise FileNotFoundError("Install directory not found") from exc
+            source = node_dir
+        key = source
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached is not None and cached.mtime_ns == mtime_ns:
+            return cached
+        if source is manifest_path:
+            with manifest_path.open("r", encoding="utf-8") as f:
+                manifest = InstallManifest.from_dict(json.load(f))
+            install_dir = node_dir / manifest.install_dir
+            executables = {name: install_dir / rel for name, rel in manifest.executables.items()}
+        else:
+            candidates = [p for p in node_dir.iterdir() if p.is_dir() and not p.name.startswith(".")]
+            if not candidates:
+                raise FileNotFoundError("Install directory not found")
+            install_dir = max(candidates, key=lambda p: p.stat().st_mtime)
+            executables = {}
+        entry = _IndexedInstall(mtime_ns=mtime_ns, install_dir=install_dir, executables=executables)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
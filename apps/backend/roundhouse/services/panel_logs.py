@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+LogStream = Literal["stdout", "stderr", "system"]
+
+# Per-node memory ceiling in characters; the oldest lines are dropped first.
+RING_MAX_CHARS = 256 * 1024
+# Longer lines are truncated so a single runaway line cannot evict the whole ring.
+MAX_LINE_CHARS = 4096
+READ_CHUNK_BYTES = 64 * 1024
+ROTATE_MAX_BYTES = 10 * 1024 * 1024
+ROTATE_BACKUPS = 3
+
+
+@dataclass(frozen=True)
+class LogLine:
+    seq: int
+    timestamp: float
+    stream: LogStream
+    text: str
+
+
+class LogRing:
+    """Recent output of one node, bounded by total size rather than line count."""
+
+    def __init__(self, max_chars: int = RING_MAX_CHARS) -> None:
+        self._max_chars = max_chars
+        self._lines: deque[LogLine] = deque()
+        self._chars = 0
+        self._next_seq = 1
+        self._changed = asyncio.Event()
+
+    @property
+    def next_seq(self) -> int:
+        return self._next_seq
+
+    def append(self, stream: LogStream, text: str) -> LogLine:
+        if len(text) > MAX_LINE_CHARS:
+            text = text[:MAX_LINE_CHARS] + "…"
+        line = LogLine(seq=self._next_seq, timestamp=time.time(), stream=stream, text=text)
+        self._next_seq += 1
+        self._lines.append(line)
+        self._chars += len(text)
+        while self._chars > self._max_chars and len(self._lines) > 1:
+            self._chars -= len(self._lines.popleft().text)
+        # Wake followers; each waits on the event that was current when it looked.
+        self._changed.set()
+        self._changed = asyncio.Event()
+        return line
+
+    def tail(self, lines: int | None = None, since: int | None = None) -> list[LogLine]:
+        selected = [line for line in self._lines if since is None or line.seq > since]
+        return selected[-lines:] if lines else selected
+
+    async def follow(self, since: int | None = None) -> AsyncIterator[LogLine]:
+        """Yield lines after ``since`` (default: only new ones) as they arrive; never returns."""
+        cursor = self._next_seq - 1 if since is None else since
+        while True:
+            changed = self._changed
+            for line in self.tail(since=cursor):
+                cursor = line.seq
+                yield line
+            await changed.wait()
+
+
+class RotatingLogFile:
+    """Appends lines to ``<node_id>.log``, rolling to ``.1`` … ``.<backups>`` past ``max_bytes``."""
+
+    def __init__(self, path: Path, max_bytes: int = ROTATE_MAX_BYTES, backups: int = ROTATE_BACKUPS) -> None:
+        self._path = path
+        self._max_bytes = max_bytes
+        self._backups = backups
+        # stdout and stderr pumps write from separate worker threads.
+        self._lock = threading.Lock()
+
+    def write_lines(self, lines: list[LogLine]) -> None:
+        with self._lock:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with self._path.open("a", encoding="utf-8") as f:
+                for line in lines:
+                    f.write(f"{line.timestamp:.3f} {line.stream} {line.text}\n")
+                size = f.tell()
+            if size > self._max_bytes:
+                self._rotate()
+
+    def _rotate(self) -> None:
+        for index in range(self._backups, 0, -1):
+            source = self._path if index == 1 else self._path.with_name(f"{self._path.name}.{index - 1}")
+            if source.exists():
+                source.replace(self._path.with_name(f"{self._path.name}.{index}"))
+
+
+def log_file_name(node_id: str) -> str:
+    """``<node_id>.log`` when the id is a plain file name; otherwise a name derived from its hash.
+
+    Node ids come from API callers, so ``../x`` or ``/etc/x`` must never become a path.
+    """
+    if node_id and Path(node_id).name == node_id and not node_id.startswith(".") and "\0" not in node_id:
+        return f"{node_id}.log"
+    return f"node-{hashlib.sha256(node_id.encode('utf-8', 'surrogatepass')).hexdigest()[:16]}.log"
+
+
+class PanelLogStore:
+    """Captures supervised process output into per-node rings, optionally mirrored to disk."""
+
+    def __init__(self, log_dir: Path | None = None, ring_max_chars: int = RING_MAX_CHARS) -> None:
+        self._log_dir = log_dir
+        self._ring_max_chars = ring_max_chars
+        self._rings: dict[str, LogRing] = {}
+        self._files: dict[str, RotatingLogFile] = {}
+
+    def ring(self, node_id: str) -> LogRing:
+        ring = self._rings.get(node_id)
+        if ring is None:
+            ring = self._rings[node_id] = LogRing(self._ring_max_chars)
+        return ring
+
+    def get(self, node_id: str) -> LogRing | None:
+        return self._rings.get(node_id)
+
+    def last_log(self, node_id: str, lines: int = 1) -> str | None:
+        ring = self._rings.get(node_id)
+        if ring is None:
+            return None
+        recent = ring.tail(lines)
+        return "\n".join(line.text for line in recent) if recent else None
+
+    async def _write(self, node_id: str, lines: list[LogLine]) -> None:
+        if self._log_dir is None or not lines:
+            return
+        writer = self._files.get(node_id)
+        if writer is None:
+            writer = self._files[node_id] = RotatingLogFile(self._log_dir / log_file_name(node_id))
+        await asyncio.to_thread(writer.write_lines, lines)
+
+    async def note(self, node_id: str, text: str) -> None:
+        await self._write(node_id, [self.ring(node_id).append("system", text)])
+
+    async def pump(self, node_id: str, stream: LogStream, reader: asyncio.StreamReader) -> None:
+        """Drain ``reader`` until EOF; reads in chunks so disk writes are batched per chunk."""
+        ring = self.ring(node_id)
+        pending = b""
+        while True:
+            chunk = await reader.read(READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            *complete, pending = (pending + chunk).split(b"\n")
+            if len(pending) > MAX_LINE_CHARS:
+                complete.append(pending)
+                pending = b""
+            appended = [ring.append(stream, raw.decode("utf-8", "replace").rstrip("\r")) for raw in complete]
+            await self._write(node_id, appended)
+        if pending:
+            await self._write(node_id, [ring.append(stream, pending.decode("utf-8", "replace"))])
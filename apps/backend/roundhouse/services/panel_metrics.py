@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+PROC_ROOT = Path("/proc")
+SAMPLE_INTERVAL_SECONDS = 5.0
+# One hour of history per node at the default interval.
+SAMPLES_PER_NODE = 720
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+@dataclass(frozen=True)
+class ProcessSample:
+    timestamp: float
+    pid: int
+    cpu_seconds: float
+    rss_bytes: int
+    open_fds: int | None
+    threads: int
+
+
+def read_process_sample(pid: int, proc_root: Path = PROC_ROOT) -> ProcessSample | None:
+    """Read one sample from ``/proc/<pid>``; None when the process is gone or /proc is unavailable."""
+    base = proc_root / str(pid)
+    try:
+        raw = (base / "stat").read_text()
+    except OSError:
+        return None
+    # The command name may contain spaces and parentheses; fields resume after the last ")".
+    fields = raw[raw.rfind(")") + 2 :].split()
+    # Indices are relative to field 3 (state) of proc(5): utime=14, stime=15, num_threads=20, rss=24.
+    utime, stime = int(fields[11]), int(fields[12])
+    threads, rss_pages = int(fields[17]), int(fields[21])
+    try:
+        open_fds: int | None = len(os.listdir(base / "fd"))
+    except OSError:
+        open_fds = None
+    return ProcessSample(
+        timestamp=time.time(),
+        pid=pid,
+        cpu_seconds=(utime + stime) / _CLOCK_TICKS,
+        rss_bytes=rss_pages * _PAGE_SIZE,
+        open_fds=open_fds,
+        threads=threads,
+    )
+
+
+def cpu_percent(previous: ProcessSample, current: ProcessSample) -> float | None:
+    elapsed = current.timestamp - previous.timestamp
+    if previous.pid != current.pid or elapsed <= 0:
+        return None
+    return 100.0 * (current.cpu_seconds - previous.cpu_seconds) / elapsed
+
+
+class ProcessMetricsSampler:
+    """Samples every supervised process from one loop, keeping a fixed-size history per node.
+
+    ``targets`` returns the current node -> pid mapping; each tick reads all of
+    them in a single worker-thread hop, so cost grows with the number of
+    processes, not the number of readers.
+    """
+
+    def __init__(
+        self,
+        targets: Callable[[], dict[str, int]],
+        interval: float = SAMPLE_INTERVAL_SECONDS,
+        capacity: int = SAMPLES_PER_NODE,
+        proc_root: Path = PROC_ROOT,
+    ) -> None:
+        self._targets = targets
+        self._interval = interval
+        self._capacity = capacity
+        self._proc_root = proc_root
+        self._history: dict[str, deque[ProcessSample]] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    def ensure_running(self) -> None:
+        """Start the sampling loop if needed; must be called from the event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.sample_once()
+            await asyncio.sleep(self._interval)
+
+    async def sample_once(self) -> None:
+        targets = self._targets()
+        if not targets:
+            return
+        samples = await asyncio.to_thread(self._read_all, targets)
+        # A node that exited (and was forgotten) during the read must not get its history back.
+        live = self._targets()
+        for node_id, sample in samples.items():
+            if live.get(node_id) != sample.pid:
+                continue
+            history = self._history.get(node_id)
+            if history is None:
+                history = self._history[node_id] = deque(maxlen=self._capacity)
+            history.append(sample)
+
+    def _read_all(self, targets: dict[str, int]) -> dict[str, ProcessSample]:
+        samples: dict[str, ProcessSample] = {}
+        for node_id, pid in targets.items():
+            sample = read_process_sample(pid, self._proc_root)
+            if sample is not None:
+                samples[node_id] = sample
+        return samples
+
+    def samples(self, node_id: str, limit: int | None = None) -> list[ProcessSample]:
+        history = list(self._history.get(node_id, ()))
+        return history[-limit:] if limit else history
+
+    def latest(self, node_id: str) -> tuple[ProcessSample | None, float | None]:
+        """Return the newest sample and the CPU percentage since the one before it."""
+        history = self._history.get(node_id)
+        if not history:
+            return None, None
+        if len(history) < 2:
+            return history[-1], None
+        return history[-1], cpu_percent(history[-2], history[-1])
+
+    def node_ids(self) -> list[str]:
+        return list(self._history)
+
+    def forget(self, node_id: str) -> None:
+        self._history.pop(node_id, None)
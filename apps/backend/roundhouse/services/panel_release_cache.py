@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import errno
+import hashlib
+import json
+import os
+import secrets
+import shutil
+import stat
+import zipfile
+from collections.abc import Callable
+from pathlib import Path
+
+CACHE_DIR_NAME = ".release-cache"
+_WRITE_BITS = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
+# Hardlinking is impossible across devices or on some filesystems; those installs fall back to copies.
+_LINK_FALLBACK_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP}
+
+Progress = Callable[[int, int], None]
+
+
+def source_key(repo: str, tag: str, asset_name: str) -> str:
+    return hashlib.sha256(f"{repo}\0{tag}\0{asset_name}".encode("utf-8")).hexdigest()
+
+
+class PanelReleaseCache:
+    """Content-addressed store of extracted release assets shared by every node.
+
+    ``trees/<sha256>`` holds one read-only extraction per distinct archive;
+    ``sources/<key>.json`` maps a (repo, tag, asset) to the archive digest so a
+    repeat install skips the download entirely. Node installs are real
+    directories whose files are hardlinks into the tree, so nodes can add
+    files of their own but cannot modify shared ones in place.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self._root = root
+        self._trees = root / "trees"
+        self._sources = root / "sources"
+        self._staging = root / "staging"
+
+    @property
+    def downloads_dir(self) -> Path:
+        return self._root / "downloads"
+
+    def tree_path(self, sha256: str) -> Path:
+        return self._trees / sha256
+
+    def lookup(self, repo: str, tag: str, asset_name: str) -> tuple[str, Path] | None:
+        """Return (digest, tree) when this release asset was already extracted."""
+        try:
+            with (self._sources / f"{source_key(repo, tag, asset_name)}.json").open("r", encoding="utf-8") as f:
+                sha256 = str(json.load(f)["sha256"])
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+        tree = self.tree_path(sha256)
+        return (sha256, tree) if tree.is_dir() else None
+
+    def record(self, repo: str, tag: str, asset_name: str, sha256: str) -> None:
+        self._sources.mkdir(parents=True, exist_ok=True)
+        path = self._sources / f"{source_key(repo, tag, asset_name)}.json"
+        tmp = self._staging_path(path.name)
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"repo": repo, "tag": tag, "asset_name": asset_name, "sha256": sha256}, f)
+        os.replace(tmp, path)
+
+    def _staging_path(self, label: str) -> Path:
+        self._staging.mkdir(parents=True, exist_ok=True)
+        return self._staging / f"{label}.{secrets.token_hex(6)}"
+
+    def extract(self, archive_path: Path, sha256: str, progress: Progress | None = None) -> Path:
+        """Extract an archive into the store once; later calls for the same digest are no-ops."""
+        tree = self.tree_path(sha256)
+        if tree.is_dir():
+            return tree
+        staging = self._staging_path(sha256)
+        staging.mkdir()
+        try:
+            _extract_zip(archive_path, staging, progress)
+            _make_read_only(staging)
+            self._trees.mkdir(parents=True, exist_ok=True)
+            try:
+                os.replace(staging, tree)
+            except OSError:
+                # Another install extracted the same archive first.
+                if not tree.is_dir():
+                    raise
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+        return tree
+
+    def materialize(self, tree: Path, dest: Path, progress: Progress | None = None) -> None:
+        """Build ``dest`` as a private directory tree whose files link to the shared tree."""
+        staging = self._staging_path(dest.name)
+        files = [path for path in tree.rglob("*") if not path.is_dir()]
+        staging.mkdir()
+        try:
+            for directory in (path for path in tree.rglob("*") if path.is_dir()):
+                (staging / directory.relative_to(tree)).mkdir(parents=True, exist_ok=True)
+            for done, source in enumerate(files, start=1):
+                target = staging / source.relative_to(tree)
+                if source.is_symlink():
+                    os.symlink(os.readlink(source), target)
+                else:
+                    _link_or_copy(source, target)
+                if progress is not None:
+                    progress(done, len(files))
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            if dest.exists():
+                shutil.rmtree(dest)
+            os.replace(staging, dest)
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+
+
+def _extract_zip(archive_path: Path, target_dir: Path, progress: Progress | None) -> None:
+    root = target_dir.resolve()
+    with zipfile.ZipFile(archive_path) as archive:
+        members = archive.infolist()
+        for done, member in enumerate(members, start=1):
+            if not (root / member.filename).resolve().is_relative_to(root):
+                raise ValueError(f"Archive member escapes install directory: {member.filename}")
+            extracted = Path(archive.extract(member, target_dir))
+            # zipfile drops Unix permissions; restore them so executables stay executable.
+            mode = (member.external_attr >> 16) & 0o777
+            if mode and not member.is_dir():
+                extracted.chmod(mode)
+            if progress is not None:
+                progress(done, len(members))
+
+
+def _make_read_only(tree: Path) -> None:
+    for path in tree.rglob("*"):
+        if path.is_file() and not path.is_symlink():
+            path.chmod(path.stat().st_mode & ~_WRITE_BITS)
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    try:
+        os.link(source, target)
+    except OSError as exc:
+        if exc.errno not in _LINK_FALLBACK_ERRNOS:
+            raise
+        shutil.copy2(source, target)
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+
+from core.panel.models import PanelLifecycleSnapshot
+
+# Store-wide ceiling; past it the oldest downsampled buckets of the largest series go first.
+MAX_BYTES = 64 * 1024 * 1024
+# Raw samples are kept this long, then folded into fixed-width buckets.
+RAW_RETENTION_SECONDS = 3600.0
+BUCKET_SECONDS = 60
+COMPACT_INTERVAL_SECONDS = 60.0
+# Series visited per lock hold by compaction and fleet queries, so ingestion interleaves with long passes.
+LOCK_CHUNK_SERIES = 256
+# Over budget, history is trimmed down to this fraction of it.
+BUDGET_LOW_WATERMARK = 0.9
+
+FLAG_TRANSPORT = 1
+FLAG_INGRESS = 2
+FLAG_UI_READY = 4
+_FLAG_BITS = (0, 1, 2)
+# translate() tables that map a flags byte to 0/1 for one bit, so counting a flag is two C-level passes.
+_BIT_TABLES = tuple(bytes((value >> bit) & 1 for value in range(256)) for bit in _FLAG_BITS)
+_MAX_RAW_OFFSET_MS = 2**32 - 1
+_REBASE_AFTER_MS = 2**31
+# Fixed per-series cost (object, dict slot, arrays) used for the memory estimate.
+_SERIES_OVERHEAD_BYTES = 800
+
+
+def snapshot_flags(snapshot: PanelLifecycleSnapshot) -> int:
+    return (
+        (FLAG_TRANSPORT if snapshot.transport_connected else 0)
+        | (FLAG_INGRESS if snapshot.accepting_ingress else 0)
+        | (FLAG_UI_READY if snapshot.ui_ready else 0)
+    )
+
+
+@dataclass(frozen=True)
+class SnapshotStats:
+    env_id: str
+    samples: int
+    transport_ratio: float | None
+    ingress_ratio: float | None
+    ui_ready_ratio: float | None
+    first_seen: float | None
+    last_seen: float | None
+
+
+class _Series:
+    """Columnar samples for one env: a raw tier and a downsampled tier.
+
+    Raw timestamps are stored as ``uint32`` millisecond offsets from a
+    per-series base, so range queries bisect the column in place; the flags
+    column packs the three booleans into one byte. Buckets store second
+    offsets and per-flag true counts, so ratios stay exact after downsampling
+    even though individual samples are gone.
+    """
+
+    def __init__(self, snapshot: PanelLifecycleSnapshot) -> None:
+        self.latest = snapshot
+        self.raw_base_ms = 0
+        self.last_ms = 0
+        self.raw_offsets = array("I")
+        self.raw_flags = bytearray()
+        self.bucket_base_s = 0
+        self.bucket_offsets = array("I")
+        self.bucket_samples = array("I")
+        self.bucket_true = tuple(array("I") for _ in _FLAG_BITS)
+
+    @property
+    def nbytes(self) -> int:
+        raw = len(self.raw_offsets) * self.raw_offsets.itemsize + len(self.raw_flags)
+        buckets = len(self.bucket_offsets) * self.bucket_offsets.itemsize * (2 + len(_FLAG_BITS))
+        return _SERIES_OVERHEAD_BYTES + raw + buckets
+
+    def append(self, ts_ms: int, flags: int, bucket_seconds: int) -> bool:
+        if (self.raw_offsets or self.bucket_offsets) and ts_ms < self.last_ms:
+            return False
+        if self.raw_offsets and ts_ms - self.raw_base_ms > _MAX_RAW_OFFSET_MS:
+            # A gap wider than the offset column: everything raw is ancient, fold it first.
+            self.compact(ts_ms + 1, bucket_seconds)
+        if not self.raw_offsets:
+            self.raw_base_ms = ts_ms
+        self.raw_offsets.append(ts_ms - self.raw_base_ms)
+        self.raw_flags.append(flags)
+        self.last_ms = ts_ms
+        return True
+
+    def counts(self, start_ms: int, end_ms: int) -> tuple[int, list[int]]:
+        """Samples and per-flag true counts with timestamps in ``[start_ms, end_ms]``."""
+        samples = 0
+        true = [0] * len(_FLAG_BITS)
+        if self.bucket_offsets:
+            lo = bisect_left(self.bucket_offsets, start_ms // 1000 - self.bucket_base_s)
+            hi = bisect_right(self.bucket_offsets, end_ms // 1000 - self.bucket_base_s)
+            samples += sum(self.bucket_samples[lo:hi])
+            for i, column in enumerate(self.bucket_true):
+                true[i] += sum(column[lo:hi])
+        if self.raw_offsets:
+            lo = bisect_left(self.raw_offsets, start_ms - self.raw_base_ms)
+            hi = bisect_right(self.raw_offsets, end_ms - self.raw_base_ms)
+            segment = self.raw_flags[lo:hi]
+            samples += len(segment)
+            for i, table in enumerate(_BIT_TABLES):
+                true[i] += segment.translate(table).count(1)
+        return samples, true
+
+    def first_ms(self) -> int | None:
+        if self.bucket_offsets:
+            return (self.bucket_base_s + self.bucket_offsets[0]) * 1000
+        return self.raw_base_ms + self.raw_offsets[0] if self.raw_offsets else None
+
+    def _add_to_bucket(self, bucket_s: int, samples: int, true: list[int]) -> None:
+        if not self.bucket_offsets:
+            self.bucket_base_s = bucket_s
+        if not self.bucket_offsets or self.bucket_base_s + self.bucket_offsets[-1] != bucket_s:
+            self.bucket_offsets.append(bucket_s - self.bucket_base_s)
+            self.bucket_samples.append(0)
+            for column in self.bucket_true:
+                column.append(0)
+        self.bucket_samples[-1] += samples
+        for column, count in zip(self.bucket_true, true):
+            column[-1] += count
+
+    def compact(self, cutoff_ms: int, bucket_seconds: int) -> None:
+        """Fold raw samples older than ``cutoff_ms`` into buckets, one bisect and C-level count per bucket."""
+        split = bisect_left(self.raw_offsets, cutoff_ms - self.raw_base_ms)
+        if split == 0:
+            return
+        bucket_ms = bucket_seconds * 1000
+        index = 0
+        while index < split:
+            bucket_s = (self.raw_base_ms + self.raw_offsets[index]) // bucket_ms * bucket_seconds
+            next_offset = (bucket_s + bucket_seconds) * 1000 - self.raw_base_ms
+            end = min(split, bisect_left(self.raw_offsets, next_offset, index))
+            segment = self.raw_flags[index:end]
+            self._add_to_bucket(bucket_s, len(segment), [segment.translate(table).count(1) for table in _BIT_TABLES])
+            index = end
+        del self.raw_offsets[:split]
+        del self.raw_flags[:split]
+        if self.raw_offsets and self.raw_offsets[0] > _REBASE_AFTER_MS:
+            # Keep headroom in the offset column; rare (about every 25 days of continuous samples).
+            head = self.raw_offsets[0]
+            self.raw_base_ms += head
+            self.raw_offsets = array("I", (offset - head for offset in self.raw_offsets))
+
+    def drop_buckets(self, count: int) -> int:
+        """Drop the oldest ``count`` buckets (or raw samples once buckets are gone); returns bytes freed."""
+        before = self.nbytes
+        if self.bucket_offsets:
+            for column in (self.bucket_offsets, self.bucket_samples, *self.bucket_true):
+                del column[:count]
+        elif self.raw_offsets:
+            # Always keep the newest sample so last_seen stays meaningful.
+            count = min(count, len(self.raw_offsets) - 1)
+            del self.raw_offsets[:count]
+            del self.raw_flags[:count]
+        return before - self.nbytes
+
+
+class PanelSnapshotStore:
+    """In-memory time series of panel lifecycle snapshots, keyed by ``env_id``.
+
+    Sized for tens of thousands of panels sampled every few seconds: each raw
+    sample costs five bytes, each downsampled bucket twenty. The byte budget
+    is enforced as samples arrive; folding old raw samples into buckets runs
+    on a background thread that takes the lock a few hundred series at a
+    time, so ingestion and queries are never stuck behind a full pass.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = MAX_BYTES,
+        raw_retention_seconds: float = RAW_RETENTION_SECONDS,
+        bucket_seconds: int = BUCKET_SECONDS,
+        compact_interval: float = COMPACT_INTERVAL_SECONDS,
+    ) -> None:
+        self._max_bytes = max_bytes
+        self._raw_retention_ms = int(raw_retention_seconds * 1000)
+        self._bucket_seconds = bucket_seconds
+        self._compact_interval = compact_interval
+        self._lock = threading.Lock()
+        self._series: dict[str, _Series] = {}
+        self._bytes = 0
+        self._compactor: threading.Thread | None = None
+        self._closed = threading.Event()
+        self.dropped = 0
+
+    @property
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return self._bytes
+
+    def record(self, snapshot: PanelLifecycleSnapshot, timestamp: float | None = None) -> bool:
+        """Add one sample; returns False when it is older than the env's newest sample."""
+        return self.record_many([(snapshot, timestamp)]) == 1
+
+    def record_many(self, samples: list[tuple[PanelLifecycleSnapshot, float | None]]) -> int:
+        self._ensure_compactor()
+        now = time.time()
+        accepted = 0
+        with self._lock:
+            for snapshot, timestamp in samples:
+                series = self._series.get(snapshot.env_id)
+                if series is None:
+                    series = self._series[snapshot.env_id] = _Series(snapshot)
+                    self._bytes += series.nbytes
+                before = series.nbytes
+                ts_ms = int((now if timestamp is None else timestamp) * 1000)
+                if series.append(ts_ms, snapshot_flags(snapshot), self._bucket_seconds):
+                    series.latest = snapshot
+                    accepted += 1
+                self._bytes += series.nbytes - before
+            self.dropped += len(samples) - accepted
+            if self._bytes > self._max_bytes:
+                self._enforce_budget()
+        return accepted
+
+    def _ensure_compactor(self) -> None:
+        if self._compactor is None and not self._closed.is_set():
+            with self._lock:
+                if self._compactor is None:
+                    self._compactor = threading.Thread(target=self._run, name="panel-snapshot-compactor", daemon=True)
+                    self._compactor.start()
+
+    def _run(self) -> None:
+        while not self._closed.wait(self._compact_interval):
+            self.compact()
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._compactor is not None:
+            self._compactor.join()
+
+    def compact(self, now: float | None = None) -> None:
+        """Fold raw samples past retention into buckets, a chunk of series per lock hold."""
+        cutoff_ms = int(((time.time() if now is None else now) * 1000) - self._raw_retention_ms)
+        with self._lock:
+            env_ids = list(self._series)
+        for chunk_start in range(0, len(env_ids), LOCK_CHUNK_SERIES):
+            with self._lock:
+                for env_id in env_ids[chunk_start : chunk_start + LOCK_CHUNK_SERIES]:
+                    series = self._series.get(env_id)
+                    if series is None:
+                        continue
+                    before = series.nbytes
+                    series.compact(cutoff_ms, self._bucket_seconds)
+                    self._bytes += series.nbytes - before
+                # Folding can grow a series (a sparse bucket costs more than the sample it replaces).
+                if self._bytes > self._max_bytes:
+                    self._enforce_budget()
+
+    def _enforce_budget(self) -> None:
+        # Trim below the ceiling so steady ingestion at the budget does not re-trim on every batch.
+        target = int(self._max_bytes * BUDGET_LOW_WATERMARK)
+        # Trim the largest series first, a quarter of its history at a time.
+        heap = [(-series.nbytes, env_id) for env_id, series in self._series.items()]
+        heapq.heapify(heap)
+        while self._bytes > target and heap:
+            _, env_id = heapq.heappop(heap)
+            series = self._series[env_id]
+            length = len(series.bucket_offsets) or len(series.raw_offsets)
+            freed = series.drop_buckets(max(1, length // 4))
+            if freed <= 0:
+                continue
+            self._bytes -= freed
+            heapq.heappush(heap, (-series.nbytes, env_id))
+
+    def latest(self, env_id: str) -> PanelLifecycleSnapshot | None:
+        with self._lock:
+            series = self._series.get(env_id)
+            return series.latest if series else None
+
+    def env_ids(self) -> list[str]:
+        with self._lock:
+            return list(self._series)
+
+    def stats(self, env_id: str, start: float | None = None, end: float | None = None) -> SnapshotStats | None:
+        results = self.fleet_stats([env_id], start, end)
+        return results[0] if results else None
+
+    def fleet_stats(
+        self, env_ids: list[str] | None = None, start: float | None = None, end: float | None = None
+    ) -> list[SnapshotStats]:
+        start_ms = 0 if start is None else int(start * 1000)
+        end_ms = 2**63 - 1 if end is None else int(end * 1000)
+        results: list[SnapshotStats] = []
+        if env_ids is None:
+            with self._lock:
+                env_ids = list(self._series)
+        for chunk_start in range(0, len(env_ids), LOCK_CHUNK_SERIES):
+            with self._lock:
+                for env_id in env_ids[chunk_start : chunk_start + LOCK_CHUNK_SERIES]:
+                    series = self._series.get(env_id)
+                    if series is None:
+                        continue
+                    samples, (transport, ingress, ui_ready) = series.counts(start_ms, end_ms)
+                    first_ms = series.first_ms()
+                    results.append(
+                        SnapshotStats(
+                            env_id=env_id,
+                            samples=samples,
+                            transport_ratio=transport / samples if samples else None,
+                            ingress_ratio=ingress / samples if samples else None,
+                            ui_ready_ratio=ui_ready / samples if samples else None,
+                            first_seen=first_ms / 1000 if first_ms is not None else None,
+                            last_seen=series.last_ms / 1000 if first_ms is not None else None,
+                        )
+                    )
+        return results
+
+
+_snapshot_store: PanelSnapshotStore | None = None
+
+
+def get_panel_snapshot_store() -> PanelSnapshotStore:
+    global _snapshot_store
+    if _snapshot_store is None:
+        _snapshot_store = PanelSnapshotStore()
+    return _snapshot_store
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Literal
+
+from roundhouse.services.panel_logs import LogStream, PanelLogStore
+
+RestartMode = Literal["never", "on-failure", "always"]
+ProcessState = Literal["running", "backoff", "stopping", "stopped", "exited", "failed"]
+
+STOP_TIMEOUT_SECONDS = 10.0
+# How long an exit waits for the output pumps to drain before it is reported.
+DRAIN_TIMEOUT_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class RestartPolicy:
+    mode: RestartMode = "on-failure"
+    initial_backoff: float = 1.0
+    max_backoff: float = 60.0
+    multiplier: float = 2.0
+    # Consecutive restarts allowed before giving up; None retries forever.
+    max_restarts: int | None = 10
+    # A run at least this long counts as healthy and resets the backoff.
+    reset_after: float = 30.0
+
+    def should_restart(self, return_code: int) -> bool:
+        if self.mode == "always":
+            return True
+        return self.mode == "on-failure" and return_code != 0
+
+    def backoff(self, attempt: int) -> float:
+        return min(self.initial_backoff * self.multiplier**attempt, self.max_backoff)
+
+
+def _no_argv() -> list[str]:
+    return []
+
+
+def _no_pumps() -> list[asyncio.Task[None]]:
+    return []
+
+
+@dataclass
+class SupervisedProcess:
+    """One supervised node; fields are updated in place by the exit watcher."""
+
+    node_id: str
+    argv: list[str] = field(default_factory=_no_argv)
+    cwd: Path | None = None
+    policy: RestartPolicy = field(default_factory=RestartPolicy)
+    state: ProcessState = "running"
+    process: asyncio.subprocess.Process | None = field(default=None, repr=False)
+    started_at: datetime | None = None
+    return_code: int | None = None
+    restarts: int = 0
+    consecutive_restarts: int = 0
+    next_restart_at: datetime | None = None
+    error: str | None = None
+    # Bookkeeping owned by ProcessSupervisor.
+    started_monotonic: float = field(default=0.0, repr=False)
+    stop_requested: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    watcher: asyncio.Task[None] | None = field(default=None, repr=False)
+    pumps: list[asyncio.Task[None]] = field(default_factory=_no_pumps, repr=False)
+
+    @property
+    def executable(self) -> str:
+        return self.argv[0]
+
+    @property
+    def pid(self) -> int | None:
+        if self.process is None or self.process.returncode is not None:
+            return None
+        return self.process.pid
+
+    @property
+    def running(self) -> bool:
+        return self.pid is not None
+
+    @property
+    def active(self) -> bool:
+        """Running, or waiting to be restarted."""
+        return self.state in ("running", "backoff")
+
+
+async def terminate_process(process: asyncio.subprocess.Process, timeout: float) -> int:
+    """Send SIGTERM, then SIGKILL if the process has not exited within ``timeout`` seconds."""
+    if process.returncode is not None:
+        return process.returncode
+    try:
+        process.terminate()
+    except ProcessLookupError:
+        return await process.wait()
+    try:
+        return await asyncio.wait_for(process.wait(), timeout)
+    except asyncio.TimeoutError:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+        return await process.wait()
+
+
+class ProcessSupervisor:
+    """Runs processes on the event loop, restarting them per policy when they exit.
+
+    Each process gets an exit watcher task, so exits are observed when they
+    happen rather than when someone polls. Nothing here blocks the loop.
+    ``on_exit`` is called with the node id once a node is done for good:
+    stopped, given up on, or exited without a restart.
+    """
+
+    def __init__(
+        self,
+        stop_timeout: float = STOP_TIMEOUT_SECONDS,
+        logs: PanelLogStore | None = None,
+        on_exit: Callable[[str], None] | None = None,
+    ) -> None:
+        self._stop_timeout = stop_timeout
+        self._logs = logs
+        self._on_exit = on_exit
+        self._entries: dict[str, SupervisedProcess] = {}
+        self._node_locks: dict[str, asyncio.Lock] = {}
+
+    def get(self, node_id: str) -> SupervisedProcess | None:
+        return self._entries.get(node_id)
+
+    def entries(self) -> list[SupervisedProcess]:
+        return list(self._entries.values())
+
+    async def start(
+        self, node_id: str, argv: list[str], cwd: Path | None = None, policy: RestartPolicy | None = None
+    ) -> SupervisedProcess:
+        async with self._node_locks.setdefault(node_id, asyncio.Lock()):
+            existing = self._entries.get(node_id)
+            if existing is not None and existing.active:
+                return existing
+            entry = SupervisedProcess(node_id=node_id, argv=argv, cwd=cwd, policy=policy or RestartPolicy())
+            await self._spawn(entry)
+            self._entries[node_id] = entry
+            entry.watcher = asyncio.create_task(self._watch(entry))
+            return entry
+
+    async def stop(self, node_id: str, timeout: float | None = None) -> SupervisedProcess | None:
+        async with self._node_locks.setdefault(node_id, asyncio.Lock()):
+            entry = self._entries.get(node_id)
+            if entry is None:
+                return None
+            entry.stop_requested.set()
+            if entry.process is not None and entry.process.returncode is None:
+                entry.state = "stopping"
+                entry.return_code = await terminate_process(
+                    entry.process, self._stop_timeout if timeout is None else timeout
+                )
+            if entry.watcher is not None:
+                await entry.watcher
+            entry.state = "stopped"
+            entry.next_restart_at = None
+            return entry
+
+    async def start_many(
+        self, specs: Iterable[tuple[str, list[str], Path | None, RestartPolicy | None]]
+    ) -> list[SupervisedProcess | BaseException]:
+        return await asyncio.gather(*(self.start(*spec) for spec in specs), return_exceptions=True)
+
+    async def stop_many(
+        self, node_ids: Iterable[str], timeout: float | None = None
+    ) -> list[SupervisedProcess | None | BaseException]:
+        return await asyncio.gather(*(self.stop(node_id, timeout) for node_id in node_ids), return_exceptions=True)
+
+    async def shutdown(self) -> None:
+        await self.stop_many(list(self._entries))
+
+    async def _spawn(self, entry: SupervisedProcess) -> None:
+        if self._logs is None:
+            entry.process = await asyncio.create_subprocess_exec(*entry.argv, cwd=entry.cwd)
+        else:
+            entry.process = await asyncio.create_subprocess_exec(
+                *entry.argv, cwd=entry.cwd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+            await self._logs.note(entry.node_id, f"started pid {entry.process.pid}: {' '.join(entry.argv)}")
+            outputs: list[tuple[LogStream, asyncio.StreamReader | None]] = [
+                ("stdout", entry.process.stdout),
+                ("stderr", entry.process.stderr),
+            ]
+            entry.pumps = [
+                asyncio.create_task(self._logs.pump(entry.node_id, stream, reader))
+                for stream, reader in outputs
+                if reader is not None
+            ]
+        entry.state = "running"
+        entry.started_at = datetime.now()
+        entry.return_code = None
+        entry.next_restart_at = None
+        entry.started_monotonic = time.monotonic()
+
+    async def _watch(self, entry: SupervisedProcess) -> None:
+        try:
+            await self._supervise(entry)
+        finally:
+            if self._on_exit is not None:
+                self._on_exit(entry.node_id)
+
+    async def _supervise(self, entry: SupervisedProcess) -> None:
+        while entry.process is not None:
+            return_code = await entry.process.wait()
+            entry.return_code = return_code
+            if self._logs is not None:
+                if entry.pumps:
+                    await asyncio.wait(entry.pumps, timeout=DRAIN_TIMEOUT_SECONDS)
+                await self._logs.note(entry.node_id, f"exited with code {return_code}")
+            if entry.stop_requested.is_set():
+                return
+            policy = entry.policy
+            if time.monotonic() - entry.started_monotonic >= policy.reset_after:
+                entry.consecutive_restarts = 0
+            if not policy.should_restart(return_code) or (
+                policy.max_restarts is not None and entry.consecutive_restarts >= policy.max_restarts
+            ):
+                entry.state = "exited" if return_code == 0 else "failed"
+                return
+            delay = policy.backoff(entry.consecutive_restarts)
+            entry.state = "backoff"
+            entry.next_restart_at = datetime.fromtimestamp(time.time() + delay)
+            try:
+                # stop() sets the event, cutting the backoff short.
+                await asyncio.wait_for(entry.stop_requested.wait(), delay)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self._spawn(entry)
+            except OSError as exc:
+                entry.state = "failed"
+                entry.error = str(exc)
+                return
+            entry.restarts += 1
+            entry.consecutive_restarts += 1
+            if entry.stop_requested.is_set():
+                # stop() raced with the respawn; it is waiting on this watcher.
+                entry.return_code = await terminate_process(entry.process, self._stop_timeout)
+                return
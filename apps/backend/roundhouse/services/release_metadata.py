@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, cast
+
+import httpx
+
+# Fresh entries are served without contacting GitHub; stale ones are revalidated with
+# If-None-Match, and GitHub does not count 304 responses against the rate limit.
+FRESH_SECONDS = 60.0
+# Missing releases and assets are remembered this long before GitHub is asked again.
+NEGATIVE_TTL_SECONDS = 300.0
+PREWARM_CONCURRENCY = 8
+REQUEST_TIMEOUT_SECONDS = 20.0
+
+
+class ReleaseMetadataError(RuntimeError):
+    pass
+
+
+def release_api_url(repo: str, tag: str) -> str:
+    if tag == "latest":
+        return f"https://api.github.com/repos/{repo}/releases/latest"
+    return f"https://api.github.com/repos/{repo}/releases/tags/{tag}"
+
+
+@dataclass(frozen=True)
+class ReleaseMetadata:
+    repo: str
+    tag: str
+    status_code: int
+    payload: dict[str, Any] | None
+    etag: str | None
+    fetched_at: float
+
+    @property
+    def found(self) -> bool:
+        return self.payload is not None
+
+    @property
+    def assets(self) -> list[dict[str, Any]]:
+        if self.payload is None:
+            return []
+        return cast(list[dict[str, Any]], self.payload.get("assets", []))
+
+    def find_asset(self, asset_name: str) -> dict[str, Any] | None:
+        return next((asset for asset in self.assets if asset.get("name") == asset_name), None)
+
+
+def _cache_key(repo: str, tag: str, token: str | None) -> tuple[str, str, str]:
+    # Different credentials can see different releases (private repos), so they never share entries.
+    credential = hashlib.sha256(token.encode("utf-8")).hexdigest()[:16] if token else ""
+    return repo, tag, credential
+
+
+class ReleaseMetadataCache:
+    """GitHub release metadata shared by panel installs and manifest sync.
+
+    Usable from both the event loop (``get``) and worker threads or scripts
+    (``get_sync``); both paths read and write the same entries.
+    """
+
+    def __init__(
+        self,
+        fresh_seconds: float = FRESH_SECONDS,
+        negative_ttl_seconds: float = NEGATIVE_TTL_SECONDS,
+        transport: httpx.AsyncBaseTransport | None = None,
+        sync_transport: httpx.BaseTransport | None = None,
+    ) -> None:
+        self._fresh_seconds = fresh_seconds
+        self._negative_ttl_seconds = negative_ttl_seconds
+        self._transport = transport
+        self._sync_transport = sync_transport
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str, str], ReleaseMetadata] = {}
+        self._missing_assets: dict[tuple[str, str, str, str], float] = {}
+        self._inflight: dict[tuple[str, str, str], asyncio.Task[ReleaseMetadata]] = {}
+
+    def _headers(self, token: str | None, cached: ReleaseMetadata | None) -> dict[str, str]:
+        headers = {"Accept": "application/vnd.github+json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        if cached is not None and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        return headers
+
+    def _usable(self, cached: ReleaseMetadata | None, now: float) -> bool:
+        if cached is None:
+            return False
+        ttl = self._fresh_seconds if cached.found else self._negative_ttl_seconds
+        return now - cached.fetched_at < ttl
+
+    def _store(
+        self, key: tuple[str, str, str], cached: ReleaseMetadata | None, response: httpx.Response
+    ) -> ReleaseMetadata:
+        repo, tag, _credential = key
+        now = time.time()
+        if response.status_code == 304 and cached is not None:
+            entry = ReleaseMetadata(repo, tag, cached.status_code, cached.payload, cached.etag, now)
+        elif response.status_code == 200:
+            try:
+                payload = response.json()
+            except ValueError as exc:
+                # Callers already handle transport failures; a garbled body is reported the same way.
+                raise httpx.DecodingError("Release metadata is not valid JSON", request=response.request) from exc
+            entry = ReleaseMetadata(repo, tag, 200, payload, response.headers.get("etag"), now)
+        elif response.status_code == 404:
+            entry = ReleaseMetadata(repo, tag, 404, None, None, now)
+        else:
+            # Auth failures, rate limiting and server errors are reported but never cached.
+            return ReleaseMetadata(repo, tag, response.status_code, None, None, now)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def _cached(self, key: tuple[str, str, str]) -> ReleaseMetadata | None:
+        with self._lock:
+            return self._entries.get(key)
+
+    async def get(self, repo: str, tag: str, token: str | None = None, revalidate: bool = False) -> ReleaseMetadata:
+        key = _cache_key(repo, tag, token)
+        cached = self._cached(key)
+        if not revalidate and self._usable(cached, time.time()):
+            return cast(ReleaseMetadata, cached)
+        task = self._inflight.get(key)
+        if task is None:
+            # Concurrent callers for the same release share one request.
+            task = asyncio.ensure_future(self._fetch(key, token, cached))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self, key: tuple[str, str, str], token: str | None, cached: ReleaseMetadata | None
+    ) -> ReleaseMetadata:
+        async with httpx.AsyncClient(
+            timeout=REQUEST_TIMEOUT_SECONDS, follow_redirects=True, transport=self._transport
+        ) as client:
+            response = await client.get(release_api_url(key[0], key[1]), headers=self._headers(token, cached))
+        return self._store(key, cached, response)
+
+    def get_sync(self, repo: str, tag: str, token: str | None = None, revalidate: bool = False) -> ReleaseMetadata:
+        key = _cache_key(repo, tag, token)
+        cached = self._cached(key)
+        if not revalidate and self._usable(cached, time.time()):
+            return cast(ReleaseMetadata, cached)
+        with httpx.Client(
+            timeout=REQUEST_TIMEOUT_SECONDS, follow_redirects=True, transport=self._sync_transport
+        ) as client:
+            response = client.get(release_api_url(repo, tag), headers=self._headers(token, cached))
+        return self._store(key, cached, response)
+
+    async def find_asset(
+        self, repo: str, tag: str, asset_name: str, token: str | None = None
+    ) -> tuple[ReleaseMetadata, dict[str, Any] | None]:
+        """Look an asset up, revalidating once on a miss in case it was uploaded since.
+
+        Misses are remembered for the negative TTL, so repeated installs of a
+        missing asset do not keep asking GitHub.
+        """
+        metadata = await self.get(repo, tag, token)
+        asset = metadata.find_asset(asset_name)
+        if asset is not None or not metadata.found:
+            return metadata, asset
+        miss_key = (*_cache_key(repo, tag, token), asset_name)
+        now = time.time()
+        with self._lock:
+            missed_at = self._missing_assets.get(miss_key)
+        if missed_at is not None and now - missed_at < self._negative_ttl_seconds:
+            return metadata, None
+        metadata = await self.get(repo, tag, token, revalidate=True)
+        asset = metadata.find_asset(asset_name)
+        with self._lock:
+            if asset is None:
+                self._missing_assets[miss_key] = now
+            else:
+                self._missing_assets.pop(miss_key, None)
+        return metadata, asset
+
+    async def prewarm(
+        self, repo: str, tags: list[str], token: str | None = None, concurrency: int = PREWARM_CONCURRENCY
+    ) -> list[ReleaseMetadata | BaseException]:
+        """Fetch metadata for several tags concurrently; failures are returned, not raised."""
+        slots = asyncio.Semaphore(concurrency)
+
+        async def one(tag: str) -> ReleaseMetadata:
+            async with slots:
+                return await self.get(repo, tag, token)
+
+        return await asyncio.gather(*(one(tag) for tag in tags), return_exceptions=True)
+
+
+_release_metadata_cache: ReleaseMetadataCache | None = None
+
+
+def get_release_metadata_cache() -> ReleaseMetadataCache:
+    global _release_metadata_cache
+    if _release_metadata_cache is None:
+        _release_metadata_cache = ReleaseMetadataCache()
+    return _release_metadata_cache
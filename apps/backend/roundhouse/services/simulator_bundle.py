@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import quote
+
+from roundhouse.services.artifact_digest import fingerprint, get_digest_cache
+from roundhouse.services.artifact_paths import ARTIFACTS_DIR
+from roundhouse.services.manifest_sync import find_local_manifest_artifact
+
+GLUE_SUFFIXES = (".js", ".mjs")
+
+
+class BundleError(RuntimeError):
+    def __init__(self, message: str, code: str = "bundle_error", status_code: int = 404) -> None:
+        super().__init__(message)
+        self.code = code
+        self.status_code = status_code
+
+
+@dataclass(frozen=True)
+class BundleFile:
+    filename: str
+    sha256: str
+    size_bytes: int
+
+    @property
+    def url(self) -> str:
+        # Digest-pinned URLs are served with an immutable Cache-Control.
+        return f"/api/artifacts/download/{quote(self.filename)}?digest={self.sha256}"
+
+
+@dataclass(frozen=True)
+class SimulatorBundle:
+    artifact: str
+    glue: BundleFile
+    wasm: BundleFile | None
+
+    @property
+    def module(self) -> bool:
+        return self.glue.filename.endswith(".mjs")
+
+
+def _is_plain_name(filename: str) -> bool:
+    """A single, non-hidden file name directly inside the artifacts directory."""
+    return bool(filename) and Path(filename).name == filename and not filename.startswith(".")
+
+
+def _bundle_file(artifacts_dir: Path, filename: str) -> BundleFile | None:
+    path = artifacts_dir / filename
+    try:
+        fp = fingerprint(path)
+        sha256 = get_digest_cache().digest(path)
+    except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+        # A directory under a bundle file's name is treated as missing, not as a server error.
+        return None
+    return BundleFile(filename=filename, sha256=sha256, size_bytes=fp.size)
+
+
+def resolve_bundle(artifact: str, artifacts_dir: Path = ARTIFACTS_DIR) -> SimulatorBundle:
+    """Resolve the glue script and wasm binary for a simulator artifact in one pass.
+
+    May hash files that have not been seen since startup; call it off the event loop.
+    """
+    if not _is_plain_name(artifact):
+        raise BundleError("Invalid artifact name", code="BUNDLE_INVALID_ARTIFACT", status_code=400)
+    is_wasm = artifact.lower().endswith(".wasm")
+    base = artifact[:-5] if is_wasm else artifact
+    candidates = [f"{base}{suffix}" for suffix in GLUE_SUFFIXES] if is_wasm else [artifact]
+    found = find_local_manifest_artifact(artifact)
+    if found is not None and found[1].entrypoint:
+        # The build declared its glue script explicitly; a declaration that is not a
+        # plain file name (e.g. "dist/" or "..") falls back to the naming convention.
+        entrypoint = Path(found[1].entrypoint).name
+        if _is_plain_name(entrypoint):
+            candidates.insert(0, entrypoint)
+
+    wasm = _bundle_file(artifacts_dir, artifact) if is_wasm else None
+    if is_wasm and wasm is None:
+        raise BundleError("Simulator artifact not found", code="BUNDLE_ARTIFACT_NOT_FOUND")
+    for candidate in candidates:
+        glue = _bundle_file(artifacts_dir, candidate)
+        if glue is not None:
+            return SimulatorBundle(artifact=artifact, glue=glue, wasm=wasm)
+    raise BundleError("Missing glue script (.js or .mjs) for simulator", code="BUNDLE_GLUE_NOT_FOUND")
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+
+from roundhouse.services.artifact_http import strong_etag
+from roundhouse.services.artifact_paths import ARTIFACTS_DIR
+from roundhouse.services.manifest_sync import MANIFEST_PATH
+from roundhouse.services.simulator_selection import get_selection_revision
+from roundhouse.services.simulator_verifier import get_simulator_verifier
+
+
+@dataclass(frozen=True)
+class RenderedResponse:
+    body: bytes
+    etag: str
+
+
+def render_bytes(body: bytes) -> RenderedResponse:
+    # Content-derived, so a re-render that produces identical JSON keeps clients' 304s valid.
+    return RenderedResponse(body=body, etag=strong_etag(hashlib.sha256(body).hexdigest()))
+
+
+def manifest_revision() -> int | None:
+    try:
+        return MANIFEST_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def artifacts_revision() -> int | None:
+    """Changes whenever a file is added to, removed from or replaced in the artifacts directory.
+
+    Uploads land by rename and deletions unlink, so this sees changes made by
+    other worker processes or outside the API, at the cost of one stat.
+    """
+    try:
+        return ARTIFACTS_DIR.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+class RenderedResponseCache:
+    """Serialized response bodies, re-rendered only when their revision key changes.
+
+    Render failures propagate and are not cached, so error responses are
+    always computed fresh.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[Hashable, RenderedResponse]] = {}
+
+    def get(self, name: str, key: Hashable, render: Callable[[], bytes]) -> RenderedResponse:
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        rendered = render_bytes(render())
+        with self._lock:
+            self._entries[name] = (key, rendered)
+        return rendered
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def inventory_key() -> Hashable:
+    # The verifier revision only moves for changes this process saw; the directory catches the rest.
+    return manifest_revision(), artifacts_revision(), get_simulator_verifier().revision
+
+
+def active_key() -> Hashable:
+    return manifest_revision(), get_selection_revision()
+
+
+_response_cache: RenderedResponseCache | None = None
+
+
+def get_response_cache() -> RenderedResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = RenderedResponseCache()
+    return _response_cache
@@ -5,6 +5,16 @@ from pathlib import Path
 from typing import Optional
 
 SELECTION_PATH = Path(__file__).resolve().parent.parent.parent / "artifacts" / "simulator-selection.json"
+_selection_writes = 0
+
+
+def get_selection_revision() -> tuple[int, int | None]:
+    """Changes whenever the selection does: local writes plus the file mtime for external edits."""
+    try:
+        mtime_ns: int | None = SELECTION_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = None
+    return _selection_writes, mtime_ns
 
 
 def get_selected_version() -> Optional[str]:
@@ -32,5 +42,7 @@ def get_selected_artifact() -> Optional[str]:
 
 
 def set_selected_version(version: str, artifact_name: str, release_tag: str | None = None) -> None:
+    global _selection_writes
     with SELECTION_PATH.open("w", encoding="utf-8") as f:
         json.dump({"version": version, "artifact_name": artifact_name, "release_tag": release_tag}, f)
+    _selection_writes += 1
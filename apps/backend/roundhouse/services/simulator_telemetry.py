@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from roundhouse.services.manifest_sync import find_local_manifest_artifact
+from roundhouse.services.simulator_selection import get_selected_artifact, get_selected_version
+
+TELEMETRY_PATH = Path(__file__).resolve().parent.parent.parent / "artifacts" / "simulator-telemetry.json"
+FLUSH_INTERVAL_SECONDS = 30.0
+# Bounds memory when clients report arbitrary artifact names; the least recently updated series goes first.
+MAX_SERIES = 256
+BOOT_PHASES = ("bundle", "fetch", "compile", "runtime", "total")
+BOOT_CACHE_SOURCES = ("module", "response", "network")
+PERCENTILES = (0.5, 0.95, 0.99)
+_FORMAT_VERSION = 1
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with a fixed relative error, in the spirit of HdrHistogram.
+
+    Bucket ``i`` covers ``(gamma**(i-1), gamma**i]`` milliseconds, so memory grows
+    with the dynamic range of the samples rather than their number, and
+    histograms from different processes merge by adding counts.
+    """
+
+    MIN_VALUE_MS = 0.01
+
+    def __init__(self, relative_error: float = 0.01) -> None:
+        self.relative_error = relative_error
+        self._gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _bucket(self, value: float) -> int:
+        return math.ceil(math.log(max(value, self.MIN_VALUE_MS)) / self._log_gamma)
+
+    def _estimate(self, bucket: int) -> float:
+        return 2 * self._gamma**bucket / (self._gamma + 1)
+
+    def record(self, value_ms: float) -> None:
+        if value_ms < 0 or not math.isfinite(value_ms):
+            return
+        bucket = self._bucket(value_ms)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value_ms
+        self.min = min(self.min, value_ms)
+        self.max = max(self.max, value_ms)
+
+    def percentile(self, q: float) -> float | None:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen > rank:
+                return min(max(self._estimate(bucket), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "relative_error": self.relative_error,
+            "counts": {str(bucket): count for bucket, count in self.counts.items()},
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> LatencyHistogram:
+        histogram = cls(float(data.get("relative_error", 0.01)))
+        histogram.counts = {int(bucket): int(count) for bucket, count in data.get("counts", {}).items()}
+        histogram.count = int(data.get("count", sum(histogram.counts.values())))
+        histogram.total = float(data.get("total", 0.0))
+        histogram.min = float(data["min"]) if data.get("min") is not None else math.inf
+        histogram.max = float(data.get("max", 0.0))
+        return histogram
+
+
+def _empty_phases() -> dict[str, LatencyHistogram]:
+    return {}
+
+
+def _empty_cache_counts() -> dict[str, int]:
+    return {}
+
+
+@dataclass
+class BootSeries:
+    artifact: str
+    version: str
+    boots: int = 0
+    errors: int = 0
+    updated_at: float = 0.0
+    phases: dict[str, LatencyHistogram] = field(default_factory=_empty_phases)
+    cache: dict[str, int] = field(default_factory=_empty_cache_counts)
+
+
+@dataclass(frozen=True)
+class BootEvent:
+    artifact: str
+    outcome: str
+    version: str | None = None
+    timings: dict[str, float] | None = None
+    cache: str | None = None
+
+
+def resolve_artifact_version(artifact: str) -> str:
+    found = find_local_manifest_artifact(artifact)
+    if found is not None:
+        return found[0].version
+    if get_selected_artifact() == artifact:
+        return get_selected_version() or "unknown"
+    return "unknown"
+
+
+class BootTelemetry:
+    """Per (artifact, version) boot latency histograms, flushed to disk in the background."""
+
+    def __init__(self, path: Path = TELEMETRY_PATH, flush_interval: float = FLUSH_INTERVAL_SECONDS) -> None:
+        self._path = path
+        self._flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._series: OrderedDict[tuple[str, str], BootSeries] = OrderedDict()
+        self._dirty = False
+        self._load()
+        # Flushes on a timer, so the last events before a quiet period still reach disk.
+        self._closed = threading.Event()
+        self._writer = threading.Thread(target=self._run, name="simulator-telemetry", daemon=True)
+        self._writer.start()
+
+    def _load(self) -> None:
+        try:
+            with self._path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        for raw in data.get("series", []):
+            series = BootSeries(
+                artifact=raw["artifact"],
+                version=raw["version"],
+                boots=int(raw.get("boots", 0)),
+                errors=int(raw.get("errors", 0)),
+                updated_at=float(raw.get("updated_at", 0.0)),
+                phases={name: LatencyHistogram.from_dict(h) for name, h in raw.get("phases", {}).items()},
+                cache={name: int(count) for name, count in raw.get("cache", {}).items()},
+            )
+            self._series[(series.artifact, series.version)] = series
+
+    def record(self, event: BootEvent) -> BootSeries:
+        version = event.version or resolve_artifact_version(event.artifact)
+        key = (event.artifact, version)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = BootSeries(artifact=event.artifact, version=version)
+                self._series[key] = series
+                while len(self._series) > MAX_SERIES:
+                    self._series.popitem(last=False)
+            self._series.move_to_end(key)
+            series.updated_at = time.time()
+            if event.outcome == "error":
+                series.errors += 1
+            else:
+                series.boots += 1
+                for phase, value in (event.timings or {}).items():
+                    if phase in BOOT_PHASES:
+                        series.phases.setdefault(phase, LatencyHistogram()).record(value)
+                if event.cache in BOOT_CACHE_SOURCES:
+                    series.cache[event.cache] = series.cache.get(event.cache, 0) + 1
+            self._dirty = True
+        return series
+
+    def series(self, artifact: str | None = None, version: str | None = None) -> list[BootSeries]:
+        with self._lock:
+            return [
+                s
+                for s in self._series.values()
+                if (artifact is None or s.artifact == artifact) and (version is None or s.version == version)
+            ]
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {
+                "format": _FORMAT_VERSION,
+                "series": [
+                    {
+                        "artifact": s.artifact,
+                        "version": s.version,
+                        "boots": s.boots,
+                        "errors": s.errors,
+                        "updated_at": s.updated_at,
+                        "phases": {name: h.to_dict() for name, h in s.phases.items()},
+                        "cache": dict(s.cache),
+                    }
+                    for s in self._series.values()
+                ],
+            }
+            self._dirty = False
+        tmp = self._path.with_name(f".{self._path.name}.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp, self._path)
+
+    def _run(self) -> None:
+        while not self._closed.wait(self._flush_interval):
+            try:
+                self.flush()
+            except OSError:
+                # Nothing was written; try again on the next tick.
+                with self._lock:
+                    self._dirty = True
+
+    def close(self) -> None:
+        self._closed.set()
+        self._writer.join()
+        self.flush()
+
+
+_telemetry: BootTelemetry | None = None
+
+
+def get_boot_telemetry() -> BootTelemetry:
+    global _telemetry
+    if _telemetry is None:
+        _telemetry = BootTelemetry()
+        atexit.register(_telemetry.close)
+    return _telemetry
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from collections.abc import Iterable
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Literal
+
+from roundhouse.services.artifact_digest import FileFingerprint, file_sha256, fingerprint, get_digest_cache
+from roundhouse.services.artifact_paths import ARTIFACTS_DIR
+from roundhouse.services.manifest_sync import BuildManifest
+
+VerificationStatus = Literal["missing", "corrupt", "verified", "pending", "unverified"]
+
+
+@dataclass(frozen=True)
+class ArtifactVerification:
+    filename: str
+    status: VerificationStatus
+    size_bytes: int = 0
+    mtime: float | None = None
+    sha256: str | None = None
+
+    @property
+    def build_timestamp(self) -> str:
+        if self.mtime is None:
+            return ""
+        return datetime.fromtimestamp(self.mtime, timezone.utc).isoformat()
+
+
+@dataclass(frozen=True)
+class _CachedResult:
+    fingerprint: FileFingerprint
+    expected_sha256: str
+    actual_sha256: str
+
+
+class SimulatorArtifactVerifier:
+    """Checks manifest artifacts against local storage without hashing on the request path.
+
+    ``lookup`` only stats the file. Hashes are computed in a process pool and
+    cached per (path, size, mtime), so a file is re-hashed only after it changes.
+    """
+
+    def __init__(self, artifacts_dir: Path = ARTIFACTS_DIR, max_workers: int | None = None) -> None:
+        self._artifacts_dir = artifacts_dir
+        self._max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._results: dict[str, _CachedResult] = {}
+        self._inflight: dict[str, tuple[FileFingerprint, Future[str]]] = {}
+        self._revision = 0
+
+    @property
+    def revision(self) -> int:
+        """Bumped whenever a verification result lands, so callers can invalidate derived caches."""
+        return self._revision
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: the API process is multi-threaded, and forking it is unsafe.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def lookup(self, filename: str, expected_sha256: str | None) -> ArtifactVerification:
+        # Artifacts are stored flat; manifests may carry the build-tree path.
+        name = Path(filename).name
+        path = self._artifacts_dir / name
+        try:
+            fp = fingerprint(path)
+        except (FileNotFoundError, NotADirectoryError):
+            return ArtifactVerification(filename=filename, status="missing")
+        if not expected_sha256:
+            return ArtifactVerification(filename, "unverified", fp.size, fp.mtime_ns / 1e9)
+        expected = expected_sha256.lower()
+        with self._lock:
+            cached = self._results.get(name)
+        if cached is not None and cached.fingerprint == fp and cached.expected_sha256 == expected:
+            status: VerificationStatus = "verified" if cached.actual_sha256 == expected else "corrupt"
+            return ArtifactVerification(filename, status, fp.size, fp.mtime_ns / 1e9, cached.actual_sha256)
+        self._schedule(name, fp, expected)
+        return ArtifactVerification(filename, "pending", fp.size, fp.mtime_ns / 1e9)
+
+    def invalidate(self, filename: str) -> None:
+        """Forget a result after the artifact was rewritten or deleted through the API."""
+        with self._lock:
+            self._results.pop(Path(filename).name, None)
+            self._revision += 1
+
+    def verify_manifests(self, manifests: Iterable[BuildManifest]) -> None:
+        """Queue hashing for every manifest artifact, e.g. right after a manifest refresh."""
+        for manifest in manifests:
+            for artifact in manifest.artifacts:
+                self.lookup(artifact.filename, artifact.sha256)
+
+    def _schedule(self, filename: str, fp: FileFingerprint, expected: str) -> None:
+        with self._lock:
+            inflight = self._inflight.get(filename)
+            if inflight is not None and inflight[0] == fp and not inflight[1].done():
+                return
+            cached_digest = get_digest_cache().peek(fp)
+            if cached_digest is not None:
+                # Already hashed for an ETag or upload; no need to touch the pool.
+                self._results[filename] = _CachedResult(fp, expected, cached_digest)
+                self._revision += 1
+                return
+            future = self._pool().submit(file_sha256, fp.path)
+            self._inflight[filename] = (fp, future)
+        future.add_done_callback(lambda f: self._complete(filename, fp, expected, f))
+
+    def _complete(self, filename: str, fp: FileFingerprint, expected: str, future: Future[str]) -> None:
+        with self._lock:
+            if self._inflight.get(filename, (None, None))[1] is future:
+                del self._inflight[filename]
+            if future.cancelled() or future.exception() is not None:
+                return
+            digest = future.result()
+            self._results[filename] = _CachedResult(fp, expected, digest)
+            self._revision += 1
+        get_digest_cache().remember(fp, digest)
+
+
+_verifier: SimulatorArtifactVerifier | None = None
+
+
+def get_simulator_verifier() -> SimulatorArtifactVerifier:
+    global _verifier
+    if _verifier is None:
+        _verifier = SimulatorArtifactVerifier()
+    return _verifier
@@ -13,6 +13,17 @@ class RoundhouseSettings:
     panel_release_token: str | None
     panel_install_dir: str | None
     panel_desktop_executable: str | None
+    panel_install_concurrency: int
+    panel_log_dir: str | None
+    node_registry_path: str | None
+    node_indexed_metadata: str | None
+    artifact_byte_budget: int | None
+    artifact_retention_policies: str | None
+
+
+def _optional_int(name: str) -> int | None:
+    value = os.getenv(name)
+    return int(value) if value else None
 
 
 def load_settings() -> RoundhouseSettings:
@@ -24,4 +35,10 @@ def load_settings() -> RoundhouseSettings:
         panel_release_token=os.getenv("ROUNDHOUSE_PANEL_RELEASE_TOKEN"),
         panel_install_dir=os.getenv("ROUNDHOUSE_PANEL_INSTALL_DIR"),
         panel_desktop_executable=os.getenv("ROUNDHOUSE_PANEL_DESKTOP_EXECUTABLE"),
+        panel_install_concurrency=_optional_int("ROUNDHOUSE_PANEL_INSTALL_CONCURRENCY") or 2,
+        panel_log_dir=os.getenv("ROUNDHOUSE_PANEL_LOG_DIR"),
+        node_registry_path=os.getenv("ROUNDHOUSE_NODE_REGISTRY_PATH"),
+        node_indexed_metadata=os.getenv("ROUNDHOUSE_NODE_INDEXED_METADATA"),
+        artifact_byte_budget=_optional_int("ROUNDHOUSE_ARTIFACT_BYTE_BUDGET"),
+        artifact_retention_policies=os.getenv("ROUNDHOUSE_ARTIFACT_RETENTION_POLICIES"),
     )
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import gzip
+import os
+from pathlib import Path
+
+import pytest
+from roundhouse.services import artifact_compression
+from roundhouse.services.artifact_compression import compress_variant, negotiate_encoding
+
+
+def test_negotiate_encoding_honours_quality_values() -> None:
+    offered = ("br", "gzip")
+    assert negotiate_encoding("gzip;q=0.9, br;q=0.5", offered) == "gzip"
+    assert negotiate_encoding("gzip, br", offered) == "br"
+    assert negotiate_encoding("GZIP;Q=0.4", offered) == "gzip"
+    assert negotiate_encoding("gzip;q=oops", offered) is None
+    assert negotiate_encoding("identity", offered) is None
+    assert negotiate_encoding(None, offered) is None
+
+
+def test_negotiate_encoding_wildcard_and_explicit_refusal() -> None:
+    offered = ("br", "gzip")
+    assert negotiate_encoding("*", offered) == "br"
+    # An explicit q=0 beats the wildcard for that coding only.
+    assert negotiate_encoding("br;q=0, *", offered) == "gzip"
+    assert negotiate_encoding("*;q=0", offered) is None
+    assert negotiate_encoding("br;q=0", ("br",)) is None
+
+
+def test_compress_variant_discards_variants_below_minimum_savings(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(artifact_compression, "VARIANTS_DIR", tmp_path / ".variants")
+    noise = tmp_path / "noise.wasm"
+    noise.write_bytes(os.urandom(64 * 1024))
+    assert compress_variant(noise, "a" * 64, "gzip") is None
+    assert list((tmp_path / ".variants").iterdir()) == []
+
+    text = tmp_path / "glue.js"
+    text.write_bytes(b"export const answer = 42;\n" * 4096)
+    variant = compress_variant(text, "b" * 64, "gzip")
+    assert variant == tmp_path / ".variants" / f"{'b' * 64}.gz"
+    assert variant is not None
+    assert gzip.decompress(variant.read_bytes()) == text.read_bytes()
+    # An existing variant is reused rather than recompressed.
+    assert compress_variant(text, "b" * 64, "gzip") == variant
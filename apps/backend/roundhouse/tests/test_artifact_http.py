@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import pytest
+from roundhouse.services.artifact_http import (
+    RangeNotSatisfiableError,
+    artifact_media_type,
+    if_none_match_matches,
+    if_range_matches,
+    parse_range_header,
+)
+
+
+def test_parse_single_and_suffix_ranges() -> None:
+    assert parse_range_header("bytes=0-0", 10) == [(0, 0)]
+    assert parse_range_header("bytes=4-", 10) == [(4, 9)]
+    assert parse_range_header("bytes=-3", 10) == [(7, 9)]
+    assert parse_range_header("bytes=8-100", 10) == [(8, 9)]
+
+
+def test_parse_multi_range_coalesces_overlaps() -> None:
+    assert parse_range_header("bytes=0-1, 6-7", 10) == [(0, 1), (6, 7)]
+    assert parse_range_header("bytes=5-7,0-2,3-4", 10) == [(0, 7)]
+
+
+def test_parse_ignores_malformed_headers() -> None:
+    assert parse_range_header(None, 10) is None
+    assert parse_range_header("items=0-1", 10) is None
+    assert parse_range_header("bytes=a-b", 10) is None
+    assert parse_range_header("bytes=5-2", 10) is None
+
+
+def test_parse_unsatisfiable() -> None:
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_range_header("bytes=10-20", 10)
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_range_header("bytes=9999-", 10)
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_range_header("bytes=0-0", 0)
+
+
+def test_conditional_matching() -> None:
+    etag = '"abc"'
+    assert if_none_match_matches('"x", W/"abc"', etag)
+    assert if_none_match_matches("*", etag)
+    assert not if_none_match_matches('"x"', etag)
+    assert if_range_matches(None, etag)
+    assert if_range_matches('"abc"', etag)
+    assert not if_range_matches('W/"abc"', etag)
+
+
+def test_artifact_media_type_pins_wasm_and_scripts() -> None:
+    assert artifact_media_type("sim.wasm") == "application/wasm"
+    assert artifact_media_type("sim.MJS") == "text/javascript"
+    assert artifact_media_type("bundle.zip") == "application/zip"
+    assert artifact_media_type("blob") == "application/octet-stream"
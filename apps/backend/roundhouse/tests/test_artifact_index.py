@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from roundhouse.services.artifact_index import ArtifactIndex, InvalidCursorError
+
+
+def test_query_filters_sorts_and_paginates(tmp_path: Path) -> None:
+    index = ArtifactIndex(tmp_path / "artifacts.sqlite3")
+    for i, name in enumerate(["a.wasm", "b.wasm", "c.zip", "d.wasm", "e.wasm"]):
+        index.upsert(name, None, size_bytes=10 * (i % 3), mtime=0.0, uploaded_at=float(i))
+
+    first, cursor = index.query(kind="simulator", sort="size_bytes", limit=2)
+    assert [e.name for e in first] == ["a.wasm", "d.wasm"]
+    second, cursor = index.query(kind="simulator", sort="size_bytes", limit=2, cursor=cursor)
+    assert [e.name for e in second] == ["b.wasm", "e.wasm"]
+    assert cursor is None
+
+    newest, _ = index.query(sort="uploaded_at", descending=True, limit=1)
+    assert newest[0].name == "e.wasm"
+    prefixed, _ = index.query(prefix="c")
+    assert [e.name for e in prefixed] == ["c.zip"]
+
+    _page, name_cursor = index.query(limit=1)
+    with pytest.raises(InvalidCursorError):
+        index.query(sort="last_access", cursor=name_cursor)
+    index.close()
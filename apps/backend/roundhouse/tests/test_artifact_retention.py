@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from roundhouse.services.artifact_index import ArtifactIndex
+from roundhouse.services.artifact_retention import (
+    RetentionEngine,
+    RetentionPolicy,
+    automatic_retention_enabled,
+    parse_policies,
+)
+from roundhouse.settings import load_settings
+
+
+def _store(index: ArtifactIndex, root: Path, name: str, size: int, last_access: float, kind: str | None = None) -> None:
+    path = root / name
+    path.write_bytes(b"x" * size)
+    index.upsert(name, kind, size, path.stat().st_mtime, last_access=last_access)
+
+
+def test_evicts_least_recently_used_beyond_kind_count(tmp_path: Path) -> None:
+    index = ArtifactIndex(tmp_path / ".index" / "artifacts.sqlite3")
+    for i in range(4):
+        _store(index, tmp_path, f"sim-{i}.wasm", 10, last_access=100.0 + i)
+    _store(index, tmp_path, "simulator-selection.json", 10, last_access=1.0)
+    engine = RetentionEngine(
+        index,
+        tmp_path,
+        policies=parse_policies('{"simulator": {"max_count": 2}}'),
+        protected_refs=lambda: {"sim-0.wasm"},
+    )
+
+    # The protected artifact does not count toward the limit, so two unprotected ones stay.
+    preview = engine.run(dry_run=True, now=200.0, list_retained=True)
+    assert preview.deleted == ["sim-1.wasm"]
+    assert preview.protected == ["sim-0.wasm"]
+    assert preview.retained == ["sim-3.wasm", "sim-2.wasm", "sim-0.wasm", "simulator-selection.json"]
+    assert (tmp_path / "sim-1.wasm").exists()
+
+    report = engine.run(now=200.0)
+    assert report.deleted == ["sim-1.wasm"]
+    assert not (tmp_path / "sim-1.wasm").exists()
+    assert (tmp_path / "simulator-selection.json").exists()
+    assert index.get("sim-1.wasm") is None
+    index.close()
+
+
+def test_byte_budget_and_max_age(tmp_path: Path) -> None:
+    index = ArtifactIndex(tmp_path / ".index" / "artifacts.sqlite3")
+    _store(index, tmp_path, "old.zip", 50, last_access=10.0)
+    _store(index, tmp_path, "mid.zip", 50, last_access=20.0)
+    _store(index, tmp_path, "new.zip", 50, last_access=30.0)
+    _store(index, tmp_path, "notes.txt", 5, last_access=35.0)
+    engine = RetentionEngine(
+        index,
+        tmp_path,
+        byte_budget=110,
+        policies={"bundle": RetentionPolicy(max_count=None), "generic": RetentionPolicy(max_age_seconds=5)},
+        protected_refs=set,
+    )
+    report = engine.run(now=60.0)
+    assert report.deleted == ["old.zip", "notes.txt"]
+    assert report.bytes_total == 100
+    index.close()
+
+
+def test_policies_are_validated_and_automatic_eviction_is_opt_in(monkeypatch: pytest.MonkeyPatch) -> None:
+    for raw in ("{not json", '{"bundle": {"max_cuont": 1}}', '{"bundle": 3}'):
+        with pytest.raises(ValueError):
+            parse_policies(raw)
+
+    monkeypatch.delenv("ROUNDHOUSE_ARTIFACT_BYTE_BUDGET", raising=False)
+    monkeypatch.delenv("ROUNDHOUSE_ARTIFACT_RETENTION_POLICIES", raising=False)
+    assert not automatic_retention_enabled(load_settings())
+    monkeypatch.setenv("ROUNDHOUSE_ARTIFACT_RETENTION_POLICIES", '{"bundle": {"max_count": 3}}')
+    assert automatic_retention_enabled(load_settings())
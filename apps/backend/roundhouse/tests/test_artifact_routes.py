@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from roundhouse.api import artifact_routes
+from roundhouse.services import artifact_compression
+from roundhouse.services.artifact_digest import get_digest_cache
+from roundhouse.services.artifact_index import ArtifactIndex
+
+GLUE = b"export const answer = 42;\n" * 4096
+
+
+@pytest.fixture
+def client(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> httpx.Client:
+    monkeypatch.setattr(artifact_routes, "ARTIFACTS_DIR", tmp_path)
+    monkeypatch.setattr(artifact_compression, "VARIANTS_DIR", tmp_path / ".variants")
+    index = ArtifactIndex(tmp_path / ".index" / "artifacts.sqlite3")
+    monkeypatch.setattr(artifact_routes, "get_artifact_index", lambda: index)
+    # Only offer gzip so the outcome does not depend on whether brotli is installed.
+    monkeypatch.setattr(artifact_routes, "available_encodings", lambda: ("gzip",))
+    app = FastAPI()
+    app.include_router(artifact_routes.router)
+    return TestClient(app)
+
+
+def test_download_serves_precompressed_variant_when_accepted(client: httpx.Client, tmp_path: Path) -> None:
+    glue = tmp_path / "sim.js"
+    glue.write_bytes(GLUE)
+    sha256 = get_digest_cache().digest(glue)
+    assert artifact_compression.compress_variant(glue, sha256, "gzip") is not None
+
+    response = client.get("/api/artifacts/download/sim.js", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == f'"{sha256}-gzip"'
+    assert response.content == GLUE
+
+    identity = client.get("/api/artifacts/download/sim.js", headers={"Accept-Encoding": "br;q=0, gzip;q=0"})
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["etag"] == f'"{sha256}"'
+    assert identity.content == GLUE
+
+    # Ranges always come from the identity bytes, even when gzip is acceptable.
+    ranged = client.get("/api/artifacts/download/sim.js", headers={"Accept-Encoding": "gzip", "Range": "bytes=0-5"})
+    assert ranged.status_code == 206
+    assert "content-encoding" not in ranged.headers
+    assert ranged.content == GLUE[:6]
+
+
+@pytest.fixture
+def blob(tmp_path: Path) -> tuple[bytes, str]:
+    data = bytes(range(256)) * 4
+    path = tmp_path / "sim.bin"
+    path.write_bytes(data)
+    return data, get_digest_cache().digest(path)
+
+
+def test_download_revalidates_with_etag(client: httpx.Client, blob: tuple[bytes, str]) -> None:
+    data, sha256 = blob
+    response = client.get("/api/artifacts/download/sim.bin")
+    assert response.status_code == 200
+    assert response.content == data
+    assert response.headers["etag"] == f'"{sha256}"'
+    assert response.headers["accept-ranges"] == "bytes"
+    assert "immutable" not in response.headers["cache-control"]
+
+    cached = client.get("/api/artifacts/download/sim.bin", headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    head = client.head("/api/artifacts/download/sim.bin")
+    assert head.status_code == 200
+    assert head.content == b""
+    assert head.headers["etag"] == response.headers["etag"]
+    assert head.headers["content-length"] == str(len(data))
+
+
+def test_download_single_and_multipart_ranges(client: httpx.Client, blob: tuple[bytes, str]) -> None:
+    data, _ = blob
+    single = client.get("/api/artifacts/download/sim.bin", headers={"Range": "bytes=10-19"})
+    assert single.status_code == 206
+    assert single.headers["content-range"] == f"bytes 10-19/{len(data)}"
+    assert single.content == data[10:20]
+
+    multi = client.get("/api/artifacts/download/sim.bin", headers={"Range": "bytes=0-1, -2"})
+    assert multi.status_code == 206
+    assert multi.headers["content-type"].startswith("multipart/byteranges; boundary=")
+    assert int(multi.headers["content-length"]) == len(multi.content)
+    assert f"Content-Range: bytes 0-1/{len(data)}".encode() in multi.content
+    assert f"Content-Range: bytes {len(data) - 2}-{len(data) - 1}/{len(data)}".encode() in multi.content
+    assert data[:2] in multi.content and data[-2:] in multi.content
+
+    # A stale If-Range falls back to the whole body.
+    stale = client.get("/api/artifacts/download/sim.bin", headers={"Range": "bytes=0-1", "If-Range": '"other"'})
+    assert stale.status_code == 200
+    assert stale.content == data
+
+    unsatisfiable = client.get("/api/artifacts/download/sim.bin", headers={"Range": f"bytes={len(data)}-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == f"bytes */{len(data)}"
+
+
+def test_download_by_digest_is_immutable(client: httpx.Client, blob: tuple[bytes, str]) -> None:
+    data, sha256 = blob
+    pinned = client.get(f"/api/artifacts/download/sim.bin?digest={sha256.upper()}")
+    assert pinned.status_code == 200
+    assert pinned.content == data
+    assert "immutable" in pinned.headers["cache-control"]
+
+    mismatch = client.get(f"/api/artifacts/download/sim.bin?digest={'0' * 64}")
+    assert mismatch.status_code == 404
+    assert mismatch.json()["detail"] == "Artifact digest mismatch"
+    assert client.get("/api/artifacts/download/missing.bin").status_code == 404
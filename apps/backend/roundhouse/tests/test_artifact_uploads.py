@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from pathlib import Path
+
+import pytest
+from roundhouse.services.artifact_uploads import ChunkedUploadManager, UploadError
+
+
+def test_out_of_order_chunks_assemble_and_verify(tmp_path: Path) -> None:
+    manager = ChunkedUploadManager(uploads_dir=tmp_path / ".uploads")
+    payload = bytes(range(256)) * 40
+    digest = hashlib.sha256(payload).hexdigest()
+    session = manager.create("bundle.zip", len(payload), sha256=digest)
+
+    manager.write_chunk(session.session_id, 4096, payload[4096:])
+    status = manager.write_chunk(session.session_id, 1024, payload[1024:4096])
+    assert status.missing() == [[0, 1024]]
+    assert not status.complete
+
+    manager.write_chunk(session.session_id, 0, payload[:1024])
+    _session, dest, actual = manager.finalize(session.session_id, tmp_path)
+
+    assert actual == digest
+    assert dest.read_bytes() == payload
+    assert not (tmp_path / ".uploads" / session.session_id).exists()
+
+
+def test_resume_after_restart_rehashes_from_disk(tmp_path: Path) -> None:
+    payload = b"x" * 5000
+    first = ChunkedUploadManager(uploads_dir=tmp_path / ".uploads")
+    session = first.create("bundle.zip", len(payload))
+    first.write_chunk(session.session_id, 0, payload[:3000])
+
+    restarted = ChunkedUploadManager(uploads_dir=tmp_path / ".uploads")
+    assert restarted.get(session.session_id).missing() == [[3000, 5000]]
+    restarted.write_chunk(session.session_id, 3000, payload[3000:])
+    _session, _dest, digest = restarted.finalize(session.session_id, tmp_path)
+    assert digest == hashlib.sha256(payload).hexdigest()
+
+
+def test_finalize_rejects_incomplete_and_mismatched_uploads(tmp_path: Path) -> None:
+    manager = ChunkedUploadManager(uploads_dir=tmp_path / ".uploads")
+    session = manager.create("bundle.zip", 10)
+    manager.write_chunk(session.session_id, 0, b"01234")
+    with pytest.raises(UploadError) as incomplete:
+        manager.finalize(session.session_id, tmp_path)
+    assert incomplete.value.code == "UPLOAD_INCOMPLETE"
+
+    manager.write_chunk(session.session_id, 5, b"56789")
+    with pytest.raises(UploadError) as mismatch:
+        manager.finalize(session.session_id, tmp_path, sha256="0" * 64)
+    assert mismatch.value.code == "UPLOAD_DIGEST_MISMATCH"
+    assert not (tmp_path / "bundle.zip").exists()
+
+    with pytest.raises(UploadError):
+        manager.write_chunk(session.session_id, 8, b"overflow")
+
+
+def test_expire_removes_abandoned_sessions(tmp_path: Path) -> None:
+    manager = ChunkedUploadManager(uploads_dir=tmp_path / ".uploads", ttl_seconds=60)
+    session = manager.create("bundle.zip", 10)
+    assert manager.expire(now=session.updated_at + 30) == []
+    assert manager.expire(now=session.updated_at + 120) == [session.session_id]
+    with pytest.raises(UploadError):
+        manager.get(session.session_id)
+
+
+def test_received_bytes_cannot_change_and_finalized_sessions_reject_chunks(tmp_path: Path) -> None:
+    manager = ChunkedUploadManager(uploads_dir=tmp_path / ".uploads")
+    session = manager.create("bundle.zip", 10)
+    manager.write_chunk(session.session_id, 0, b"01234")
+    manager.write_chunk(session.session_id, 3, b"34567")
+    with pytest.raises(UploadError) as conflict:
+        manager.write_chunk(session.session_id, 0, b"x1234")
+    assert conflict.value.code == "UPLOAD_CHUNK_CONFLICT"
+
+    manager.write_chunk(session.session_id, 8, b"89")
+    _session, dest, digest = manager.finalize(session.session_id, tmp_path)
+    assert digest == hashlib.sha256(b"0123456789").hexdigest()
+    with pytest.raises(UploadError) as finalized:
+        manager.write_chunk(session.session_id, 0, b"01234")
+    assert finalized.value.status_code == 404
+    assert dest.read_bytes() == b"0123456789"
+
+
+def test_expiry_runs_in_the_background(tmp_path: Path) -> None:
+    manager = ChunkedUploadManager(uploads_dir=tmp_path / ".uploads", ttl_seconds=-1, expire_interval=0.01)
+    session = manager.create("bundle.zip", 10)
+    manager.start()
+    try:
+        deadline = time.monotonic() + 5
+        while (tmp_path / ".uploads" / session.session_id).exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        manager.close()
+    assert not (tmp_path / ".uploads" / session.session_id).exists()
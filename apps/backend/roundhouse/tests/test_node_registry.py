@@ -0,0 +1,373 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from roundhouse.api import nodes_routes
+
+from core.lifecycle.models import NodeLifecycleState
+from core.nodes.changes import NodeChangeLog
+from core.nodes.models import NodeType
+from core.nodes.registry import NodeRecord, NodeRegistry, NodeVersionConflictError
+from core.nodes.transitions import (
+    LifecycleTransitionError,
+    check_transition,
+    check_transitions,
+    is_transition_allowed,
+)
+
+
+def test_grouped_transition_checks_match_single_checks() -> None:
+    states = list(NodeLifecycleState)
+    requests = [
+        (current, target, expected)
+        for current in states
+        for target in states
+        for expected in (None, current, *(state for state in states if state is not current))
+    ]
+    assert check_transitions(requests) == [check_transition(*request) for request in requests]
+
+
+def _fleet() -> NodeRegistry:
+    registry = NodeRegistry(indexed_metadata=("runtime_type", "port"))
+    registry.register(
+        NodeRecord(
+            node_id="a", node_type=NodeType.FRONTEND, capabilities=["x", "y"], metadata={"runtime_type": "desktop"}
+        )
+    )
+    registry.register(NodeRecord(node_id="b", node_type=NodeType.FRONTEND, capabilities=["x"], metadata={"port": 8080}))
+    registry.register(NodeRecord(node_id="c", node_type=NodeType.BACKEND, metadata={"zone": "east"}))
+    return registry
+
+
+def _ids(records: list[NodeRecord]) -> list[str]:
+    return sorted(record.node_id for record in records)
+
+
+def test_find_nodes_intersects_indexes() -> None:
+    registry = _fleet()
+    assert _ids(registry.find_nodes(node_type=NodeType.FRONTEND)) == ["a", "b"]
+    assert _ids(registry.find_nodes(node_type=NodeType.FRONTEND, capabilities=["x", "y"])) == ["a"]
+    assert _ids(registry.find_nodes(metadata={"runtime_type": "desktop"})) == ["a"]
+    # Indexed scalars match their query-string form; unindexed keys fall back to a scan.
+    assert _ids(registry.find_nodes(metadata={"port": "8080"})) == ["b"]
+    assert _ids(registry.find_nodes(node_type=NodeType.BACKEND, metadata={"zone": "east"})) == ["c"]
+    assert registry.find_nodes(capabilities=["missing"]) == []
+
+
+def test_indexes_follow_updates_and_lifecycle() -> None:
+    registry = _fleet()
+    registry.set_lifecycle("a", NodeLifecycleState.STARTED)
+    assert _ids(registry.find_nodes(state=NodeLifecycleState.STARTED)) == ["a"]
+    assert _ids(registry.find_nodes(state=NodeLifecycleState.CREATED)) == ["b", "c"]
+
+    record = registry.get_node("a")
+    assert record is not None
+    # Callers mutating the metadata dict in place before update() must not leave stale index entries.
+    record.metadata["runtime_type"] = "web"
+    registry.update("a", capabilities=["y"], metadata=record.metadata)
+    assert registry.find_nodes(metadata={"runtime_type": "desktop"}) == []
+    assert _ids(registry.find_nodes(metadata={"runtime_type": "web"})) == ["a"]
+    assert _ids(registry.find_nodes(capabilities=["x"])) == ["b"]
+
+    registry.register(NodeRecord(node_id="a", node_type=NodeType.BACKEND))
+    assert _ids(registry.find_nodes(node_type=NodeType.BACKEND)) == ["a", "c"]
+    assert registry.find_nodes(capabilities=["y"]) == []
+
+
+def test_list_route_filters() -> None:
+    registry = _fleet()
+    registry.set_lifecycle("b", NodeLifecycleState.STARTED)
+    client = _client(registry)
+
+    def ids(query: str) -> list[str]:
+        response = client.get(f"/api/nodes{query}")
+        assert response.status_code == 200
+        return sorted(node["node_id"] for node in response.json())
+
+    assert ids("") == ["a", "b", "c"]
+    assert ids("?type=frontend&state=started") == ["b"]
+    assert ids("?capability=x&capability=y") == ["a"]
+    assert ids("?metadata=runtime_type=desktop") == ["a"]
+    assert client.get("/api/nodes?metadata=oops").status_code == 400
+    assert client.get("/api/nodes?state=bogus").status_code == 422
+
+
+def _client(registry: NodeRegistry) -> httpx.Client:
+    app = FastAPI()
+    app.include_router(nodes_routes.router)
+    app.dependency_overrides[nodes_routes._get_registry] = lambda: registry  # pyright: ignore[reportPrivateUsage]
+    return TestClient(app)
+
+
+def test_list_route_pages_with_stable_cursors() -> None:
+    registry = NodeRegistry()
+    base = datetime(2026, 1, 1)
+    for i in range(7):
+        # Pairs share a timestamp, so node_id has to break the tie.
+        registry.register(
+            NodeRecord(node_id=f"n{i}", node_type=NodeType.BACKEND, last_updated=base + timedelta(seconds=i // 2))
+        )
+    client = _client(registry)
+    for sort, order in (("node_id", "asc"), ("last_updated", "desc")):
+        seen: list[str] = []
+        query = f"/api/nodes?sort={sort}&order={order}&limit=3"
+        response = client.get(query)
+        while True:
+            assert response.status_code == 200
+            seen.extend(node["node_id"] for node in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+            response = client.get(f"{query}&cursor={cursor}")
+        everything = client.get(f"/api/nodes?sort={sort}&order={order}").json()
+        assert seen == [node["node_id"] for node in everything]
+        assert len(seen) == 7
+    assert seen[:3] == ["n6", "n5", "n4"]
+
+    cursor = client.get("/api/nodes?limit=1").headers["X-Next-Cursor"]
+    assert client.get(f"/api/nodes?sort=last_updated&limit=1&cursor={cursor}").status_code == 400
+    assert client.get("/api/nodes?limit=1&cursor=not-a-cursor").status_code == 400
+
+
+def test_list_route_projects_fields() -> None:
+    registry = _fleet()
+    client = _client(registry)
+    full = client.get("/api/nodes").json()
+    record = registry.get_node("a")
+    assert record is not None
+    assert full[0] == record.to_response().model_dump(mode="json")
+
+    compact = client.get("/api/nodes?compact=true").json()
+    assert set(compact[0]) == {"node_id", "node_type", "lifecycle_state", "last_updated"}
+    projected = client.get("/api/nodes?fields=metadata").json()
+    assert projected[0] == {"node_id": "a", "metadata": {"runtime_type": "desktop"}}
+    assert client.get("/api/nodes?fields=secret").status_code == 400
+
+
+def test_feed_replays_events_then_falls_back_to_snapshot() -> None:
+    registry = NodeRegistry()
+    registry.register(NodeRecord(node_id="a", node_type=NodeType.FRONTEND))
+    start = registry.rev
+    registry.update("a", metadata={"v": 1})
+    registry.set_lifecycle("a", NodeLifecycleState.STARTED)
+
+    feed = registry.feed(start)
+    assert [(change.kind, change.rev) for change in feed.events] == [("update", start + 1), ("lifecycle", start + 2)]
+    # Events hold the record as of their revision.
+    assert feed.events[0].record.lifecycle_state is NodeLifecycleState.CREATED
+    assert feed.events[0].record.metadata == {"v": 1}
+    assert registry.feed(registry.rev).events == []
+
+    full = registry.feed(None)
+    assert full.snapshot is not None and [record.node_id for record in full.snapshot] == ["a"]
+    assert registry.feed(registry.rev + 5).snapshot is not None
+
+    small = NodeChangeLog(capacity=2)
+    for _ in range(3):
+        small.append("update", NodeRecord(node_id="a", node_type=NodeType.FRONTEND))
+    assert small.since(0) is None
+    assert [change.rev for change in small.since(1) or []] == [2, 3]
+    # A negative age bound keeps only the newest event.
+    aged = NodeChangeLog(max_age=-1)
+    for _ in range(3):
+        aged.append("update", NodeRecord(node_id="a", node_type=NodeType.FRONTEND))
+    assert aged.since(1) is None
+    assert [change.rev for change in aged.since(2) or []] == [3]
+
+
+def test_listeners_run_outside_the_registry_lock() -> None:
+    registry = _fleet()
+    seen: list[int] = []
+    # Reading the registry from a listener would deadlock if it ran under the lock.
+    unsubscribe = registry.subscribe(lambda: seen.append(len(registry.list_nodes())))
+    registry.update("a", metadata={"v": 1})
+    unsubscribe()
+    registry.update("a", metadata={"v": 2})
+    assert seen == [3]
+
+
+def test_watch_route_long_polls() -> None:
+    registry = _fleet()
+    client = _client(registry)
+    initial = client.get("/api/nodes/watch?compact=true").json()
+    assert initial["events"] == [] and len(initial["snapshot"]) == 3
+    rev = initial["rev"]
+
+    empty = client.get(f"/api/nodes/watch?since={rev}&timeout=0").json()
+    assert empty == {"rev": rev, "events": [], "snapshot": None}
+
+    # A change from another thread wakes the waiting request well before its timeout.
+    timer = threading.Timer(0.1, registry.set_lifecycle, ("a", NodeLifecycleState.STARTED))
+    timer.start()
+    started = time.monotonic()
+    body = client.get(f"/api/nodes/watch?since={rev}&timeout=30&fields=lifecycle_state").json()
+    timer.join()
+    assert time.monotonic() - started < 5
+    assert body["events"] == [
+        {"rev": rev + 1, "kind": "lifecycle", "node": {"node_id": "a", "lifecycle_state": "started"}}
+    ]
+
+
+def test_bulk_routes_apply_valid_items_or_nothing() -> None:
+    registry = _fleet()
+    client = _client(registry)
+
+    response = client.post(
+        "/api/nodes/bulk/create",
+        json={
+            "nodes": [{"node_id": f"new{i}", "node_type": "backend"} for i in range(3)]
+            + [{"node_id": "a", "node_type": "backend"}]
+        },
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "applied": 3,
+        "failed": [{"index": 3, "node_id": "a", "status": 409, "detail": "Node already exists"}],
+    }
+    assert registry.get_node("new2") is not None
+
+    updates: list[dict[str, Any]] = [{"node_id": "a", "metadata": {"v": 1}}, {"node_id": "ghost", "metadata": {}}]
+    response = client.post("/api/nodes/bulk/update", json={"updates": updates, "atomic": True})
+    assert response.status_code == 409
+    assert [item["node_id"] for item in response.json()["detail"]["failed"]] == ["ghost"]
+    record = registry.get_node("a")
+    assert record is not None and record.metadata == {"runtime_type": "desktop"}
+
+    response = client.post(
+        "/api/nodes/bulk/update",
+        json={"updates": [{"node_id": "a", "metadata": {"v": 1}}, {"node_id": "b", "capabilities": ["z"]}]},
+    )
+    assert response.json() == {"applied": 2, "failed": []}
+    record = registry.get_node("b")
+    assert record is not None and record.capabilities == ["z"] and record.metadata == {"port": 8080}
+
+    response = client.post(
+        "/api/nodes/bulk/lifecycle",
+        json={"transitions": [{"node_id": node_id, "state": "started"} for node_id in ("a", "b", "c", "ghost")]},
+    )
+    assert response.json()["applied"] == 3
+    assert _ids(registry.find_nodes(state=NodeLifecycleState.STARTED)) == ["a", "b", "c"]
+
+
+def test_lifecycle_transitions_are_enforced() -> None:
+    assert is_transition_allowed(NodeLifecycleState.CREATED, NodeLifecycleState.STARTED)
+    assert not is_transition_allowed(NodeLifecycleState.ERROR, NodeLifecycleState.STARTED)
+    registry = _fleet()
+    registry.set_lifecycle("a", NodeLifecycleState.STARTED)
+    # Re-entering the current state is a no-op, not a new change.
+    rev = registry.rev
+    registry.set_lifecycle("a", NodeLifecycleState.STARTED)
+    assert registry.rev == rev
+    with pytest.raises(LifecycleTransitionError) as excinfo:
+        registry.set_lifecycle("a", NodeLifecycleState.CREATED)
+    assert excinfo.value.reason == "not_allowed"
+
+    # Two controllers race to stop the node; only the one that saw it started wins.
+    registry.set_lifecycle("a", NodeLifecycleState.STOPPED, expected_state=NodeLifecycleState.STARTED)
+    with pytest.raises(LifecycleTransitionError) as excinfo:
+        registry.set_lifecycle("a", NodeLifecycleState.ERROR, expected_state=NodeLifecycleState.STARTED)
+    assert excinfo.value.reason == "state_mismatch"
+    record = registry.get_node("a")
+    assert record is not None and record.lifecycle_state is NodeLifecycleState.STOPPED
+
+    client = _client(registry)
+    response = client.post("/api/nodes/a/lifecycle", json={"state": "created"})
+    assert response.status_code == 409
+
+
+def test_bulk_lifecycle_reports_rejections_per_node() -> None:
+    registry = _fleet()
+    registry.set_lifecycle("c", NodeLifecycleState.STARTED)
+    failures = registry.set_lifecycle_many(
+        [
+            ("a", NodeLifecycleState.STARTED, None),
+            ("b", NodeLifecycleState.ERROR, None),
+            ("c", NodeLifecycleState.STOPPED, NodeLifecycleState.CREATED),
+            ("a", NodeLifecycleState.STOPPED, None),
+            ("ghost", NodeLifecycleState.STARTED, None),
+        ]
+    )
+    assert [(failure.index, failure.reason) for failure in failures] == [
+        (1, "not_allowed"),
+        (2, "state_mismatch"),
+        (3, "duplicate"),
+        (4, "not_found"),
+    ]
+    assert _ids(registry.find_nodes(state=NodeLifecycleState.STARTED)) == ["a", "c"]
+
+    failures = registry.set_lifecycle_many(
+        [("a", NodeLifecycleState.STOPPED, None), ("b", NodeLifecycleState.ERROR, None)], atomic=True
+    )
+    assert [failure.node_id for failure in failures] == ["b"]
+    assert _ids(registry.find_nodes(state=NodeLifecycleState.STOPPED)) == []
+
+
+def test_writes_publish_new_versions_copy_on_write() -> None:
+    registry = _fleet()
+    before = registry.get_node("a")
+    assert before is not None and before.version == 1
+    after = registry.update("a", merge_metadata={"zone": "west"})
+    # The old record is untouched; readers holding it never see a half-applied update.
+    assert before.metadata == {"runtime_type": "desktop"} and before.version == 1
+    assert after.metadata == {"runtime_type": "desktop", "zone": "west"} and after.version == 2
+    assert registry.get_node("a") is after
+    with pytest.raises(NodeVersionConflictError):
+        registry.update("a", expected_version=1, artifact_ref="/stale")
+    assert registry.update("a", expected_version=2, artifact_ref="/fresh").version == 3
+
+
+def test_versions_do_not_share_mutable_fields() -> None:
+    registry = NodeRegistry()
+    metadata = {"nested": {"k": 1}}
+    capabilities = ["x"]
+    first = registry.register(
+        NodeRecord(node_id="a", node_type=NodeType.BACKEND, capabilities=capabilities, metadata=metadata)
+    )
+    # The caller's containers are not the registry's.
+    metadata["nested"]["k"] = 2
+    capabilities.append("y")
+    assert first.metadata == {"nested": {"k": 1}} and first.capabilities == ["x"]
+
+    second = registry.update("a", artifact_ref="/r")
+    second.metadata["nested"]["k"] = 3
+    second.capabilities.append("z")
+    assert first.metadata == {"nested": {"k": 1}} and first.capabilities == ["x"]
+
+
+def test_concurrent_metadata_merges_all_survive() -> None:
+    registry = _fleet()
+
+    def merge(i: int) -> None:
+        registry.update("a", merge_metadata={f"k{i}": i})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(merge, range(200)))
+    record = registry.get_node("a")
+    assert record is not None
+    assert record.version == 201
+    assert all(record.metadata[f"k{i}"] == i for i in range(200))
+
+
+def test_patch_honours_if_match() -> None:
+    client = _client(_fleet())
+    response = client.get("/api/nodes/a")
+    etag = response.headers["ETag"]
+    assert etag == '"1"' and response.json()["version"] == 1
+
+    response = client.patch("/api/nodes/a", json={"artifact_ref": "/x"}, headers={"If-Match": etag})
+    assert response.status_code == 200 and response.headers["ETag"] == '"2"'
+    # A second writer still holding the first ETag loses instead of overwriting.
+    response = client.patch("/api/nodes/a", json={"artifact_ref": "/y"}, headers={"If-Match": etag})
+    assert response.status_code == 412
+    response = client.post("/api/nodes/a/lifecycle", json={"state": "started"}, headers={"If-Match": '"1", "2"'})
+    assert response.status_code == 200 and response.json()["lifecycle_state"] == "started"
+    assert client.patch("/api/nodes/a", json={"metadata": {}}, headers={"If-Match": "*"}).status_code == 200
+    assert client.post("/api/nodes", json={"node_id": "a", "node_type": "backend"}).status_code == 409
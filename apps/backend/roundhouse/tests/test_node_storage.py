@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+from roundhouse.nodes.sqlite_storage import SQLiteNodeStorage
+
+from core.lifecycle.models import NodeLifecycleState
+from core.nodes.models import NodeType
+from core.nodes.registry import NodeRecord, NodeRegistry, NodeVersionConflictError
+
+
+def test_registries_sharing_a_database_see_each_others_writes(tmp_path: Path) -> None:
+    db = tmp_path / "nodes.db"
+    storage_a = SQLiteNodeStorage(db, refresh_interval=0)
+    storage_b = SQLiteNodeStorage(db, refresh_interval=0)
+    worker_a, worker_b = NodeRegistry(storage_a), NodeRegistry(storage_b)
+    try:
+        worker_a.register(NodeRecord(node_id="n1", node_type=NodeType.FRONTEND, metadata={"v": 1}))
+        # Committed before register() returned, so the other worker sees it on its next read.
+        seen = worker_b.get_node("n1")
+        assert seen is not None and seen.metadata == {"v": 1}
+
+        worker_b.set_lifecycle("n1", NodeLifecycleState.STARTED)
+        # worker_a has not read since; its metadata write must not undo the lifecycle change.
+        worker_a.update("n1", metadata={"v": 2})
+        for worker in (worker_a, worker_b):
+            record = worker.get_node("n1")
+            assert record is not None
+            assert record.lifecycle_state is NodeLifecycleState.STARTED and record.metadata == {"v": 2}
+    finally:
+        storage_a.close()
+        storage_b.close()
+
+    restarted = SQLiteNodeStorage(db)
+    try:
+        (record,) = NodeRegistry(restarted).list_nodes()
+        assert record.node_id == "n1" and record.node_type is NodeType.FRONTEND
+    finally:
+        restarted.close()
+
+
+def test_writes_are_durable_when_acknowledged(tmp_path: Path) -> None:
+    storage = SQLiteNodeStorage(tmp_path / "nodes.db")
+    registry = NodeRegistry(storage)
+    try:
+        registry.register(NodeRecord(node_id="n1", node_type=NodeType.BACKEND))
+        registry.update("n1", metadata={"i": 1})
+        # A plain connection, as after a crash: nothing is waiting in memory to be written.
+        conn = sqlite3.connect(tmp_path / "nodes.db")
+        try:
+            assert conn.execute("SELECT metadata FROM nodes WHERE node_id = 'n1'").fetchone() == ('{"i": 1}',)
+        finally:
+            conn.close()
+    finally:
+        storage.close()
+
+
+def test_refresh_checks_are_throttled(tmp_path: Path) -> None:
+    db = tmp_path / "nodes.db"
+    writer = SQLiteNodeStorage(db)
+    reader = SQLiteNodeStorage(db, refresh_interval=1.0)
+    try:
+        registry = NodeRegistry(reader)
+        assert registry.get_node("n1") is None
+        NodeRegistry(writer).register(NodeRecord(node_id="n1", node_type=NodeType.BACKEND))
+        # Within the interval reads do not touch the database at all.
+        assert registry.get_node("n1") is None
+        deadline = time.monotonic() + 5
+        while registry.get_node("n1") is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert registry.get_node("n1") is not None
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_versions_persist_and_old_databases_migrate(tmp_path: Path) -> None:
+    db = tmp_path / "nodes.db"
+    conn = sqlite3.connect(db)
+    conn.executescript(
+        """
+        CREATE TABLE nodes (
+            node_id TEXT PRIMARY KEY, node_type TEXT NOT NULL, lifecycle_state TEXT NOT NULL,
+            capabilities TEXT NOT NULL, artifact_ref TEXT, metadata TEXT NOT NULL,
+            last_updated TEXT NOT NULL, rev INTEGER NOT NULL
+        );
+        INSERT INTO nodes VALUES ('old', 'backend', 'created', '[]', NULL, '{}', '2026-01-01T00:00:00', 1);
+        CREATE TABLE registry_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        INSERT INTO registry_meta VALUES ('rev', 1);
+        """
+    )
+    conn.close()
+    storage = SQLiteNodeStorage(db)
+    try:
+        registry = NodeRegistry(storage)
+        old = registry.get_node("old")
+        assert old is not None and old.version == 1
+        registry.update("old", metadata={"v": 1})
+    finally:
+        storage.close()
+    reopened = SQLiteNodeStorage(db)
+    try:
+        (record,) = reopened.load()
+        assert record.version == 2 and record.metadata == {"v": 1}
+    finally:
+        reopened.close()
+
+
+def test_versions_are_checked_in_the_database_across_workers(tmp_path: Path) -> None:
+    db = tmp_path / "nodes.db"
+    # Long refresh intervals: each worker keeps acting on what it last read.
+    storage_a = SQLiteNodeStorage(db, refresh_interval=3600)
+    storage_b = SQLiteNodeStorage(db, refresh_interval=3600)
+    try:
+        worker_a = NodeRegistry(storage_a)
+        worker_a.register(NodeRecord(node_id="n1", node_type=NodeType.BACKEND, metadata={"a": 0}))
+        worker_b = NodeRegistry(storage_b)
+        assert worker_a.update("n1", expected_version=1, merge_metadata={"a": 1}).version == 2
+
+        # worker_b still holds version 1, but the database does not.
+        with pytest.raises(NodeVersionConflictError):
+            worker_b.update("n1", expected_version=1, metadata={"b": 1})
+        # Unconditional writes are re-applied on top of the other worker's.
+        merged = worker_b.update("n1", merge_metadata={"b": 1})
+        assert merged.version == 3 and merged.metadata == {"a": 1, "b": 1}
+        # A version read through another worker is honoured once this one catches up.
+        assert worker_a.update("n1", expected_version=3, artifact_ref="x").version == 4
+        with pytest.raises(NodeVersionConflictError):
+            worker_b.set_lifecycle("n1", NodeLifecycleState.STARTED, expected_version=3)
+    finally:
+        storage_a.close()
+        storage_b.close()
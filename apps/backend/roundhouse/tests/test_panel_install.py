@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import json
+import zipfile
+from dataclasses import replace
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from roundhouse.api import panel_routes
+from roundhouse.services.panel_desktop import InstallConflictError, InstallDigestError, PanelDesktopManager
+from roundhouse.services.panel_install_index import INSTALL_MANIFEST_NAME
+from roundhouse.settings import load_settings
+
+from core.nodes.registry import NodeRegistry
+
+
+def _client(app: FastAPI) -> httpx.Client:
+    return TestClient(app)
+
+
+def _archive() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("bin/ha_panel_sim", "#!/bin/sh\n")
+        archive.writestr("assets/ui.json", "{}")
+    return buffer.getvalue()
+
+
+def _manager(tmp_path: Path, payload: bytes, requests: list[str] | None = None) -> PanelDesktopManager:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if requests is not None:
+            requests.append(str(request.url))
+        return httpx.Response(200, content=payload, headers={"content-length": str(len(payload))})
+
+    settings = replace(load_settings(), panel_install_dir=str(tmp_path), panel_install_concurrency=1)
+    return PanelDesktopManager(settings, transport=httpx.MockTransport(handler))
+
+
+def test_install_job_streams_verifies_and_reports_progress(tmp_path: Path) -> None:
+    payload = _archive()
+    requests: list[str] = []
+    manager = _manager(tmp_path, payload, requests)
+    completed: list[str] = []
+
+    async def run() -> None:
+        jobs = [
+            manager.submit_install(
+                node,
+                "o/r",
+                "v1",
+                "panel.zip",
+                asset_url="https://example.test/panel.zip",
+                on_complete=lambda r: completed.append(r.node_id),
+            )
+            for node in ("a", "b")
+        ]
+        results = await asyncio.gather(*(manager.wait_for_install(job) for job in jobs))
+        assert [r.node_id for r in results] == ["a", "b"]
+
+    asyncio.run(run())
+
+    first, second = manager.install_jobs()
+    assert first.state == second.state == "completed"
+    assert first.bytes_downloaded == first.bytes_total == len(payload)
+    assert first.files_extracted == first.files_linked == first.files_total == 2
+    assert first.sha256 == second.sha256 == hashlib.sha256(payload).hexdigest()
+    assert sorted(completed) == ["a", "b"]
+
+    # One download and one extraction serve both nodes; their files share inodes with the cache.
+    assert len(requests) == 1
+    assert second.cache_hit and second.bytes_downloaded == 0
+    a_exe = tmp_path / "a" / "v1" / "bin" / "ha_panel_sim"
+    b_exe = tmp_path / "b" / "v1" / "bin" / "ha_panel_sim"
+    assert a_exe.stat().st_ino == b_exe.stat().st_ino
+    assert a_exe.stat().st_nlink == 3
+    assert not a_exe.stat().st_mode & 0o222
+    # Node directories stay private and writable.
+    (tmp_path / "a" / "v1" / "bin" / "local.cfg").write_text("a")
+    assert not (tmp_path / "b" / "v1" / "bin" / "local.cfg").exists()
+
+
+def test_install_job_rejects_digest_mismatch(tmp_path: Path) -> None:
+    manager = _manager(tmp_path, _archive())
+
+    async def run() -> None:
+        job = manager.submit_install("a", "o/r", "v1", "panel.zip", asset_url="https://x/panel.zip", sha256="0" * 64)
+        with pytest.raises(InstallDigestError):
+            await manager.wait_for_install(job)
+
+    asyncio.run(run())
+    (job,) = manager.install_jobs()
+    assert job.state == "failed"
+    assert not (tmp_path / "a" / "v1").exists()
+    assert not any((tmp_path / ".release-cache" / "downloads").glob("*"))
+
+
+def test_install_writes_manifest_used_by_start(tmp_path: Path) -> None:
+    manager = _manager(tmp_path, _archive())
+
+    async def run() -> None:
+        job = manager.submit_install("a", "o/r", "v1", "panel.zip", asset_url="https://x/panel.zip")
+        await manager.wait_for_install(job)
+
+    asyncio.run(run())
+    manifest = json.loads((tmp_path / "a" / INSTALL_MANIFEST_NAME).read_text())
+    assert manifest["version"] == manifest["install_dir"] == "v1"
+    assert manifest["executables"] == {"ha_panel_sim": "bin/ha_panel_sim"}
+
+
+def test_duplicate_install_must_match_the_pending_asset(tmp_path: Path) -> None:
+    manager = _manager(tmp_path, _archive())
+
+    async def run() -> None:
+        job = manager.submit_install("a", "o/r", "v1", "panel.zip", asset_url="https://x/panel.zip")
+        assert manager.submit_install("a", "o/r", "v1", "panel.zip") is job
+        assert manager.submit_install("a", "o/r", "v1", "panel.zip", asset_url="https://x/panel.zip") is job
+        with pytest.raises(InstallConflictError):
+            manager.submit_install("a", "o/r", "v1", "panel.zip", asset_url="https://y/panel.zip")
+        with pytest.raises(InstallConflictError):
+            manager.submit_install("a", "o/r", "v1", "panel.zip", sha256="0" * 64)
+        await manager.wait_for_install(job)
+
+    asyncio.run(run())
+    assert len(manager.install_jobs()) == 1
+
+
+def test_install_rejects_node_ids_outside_the_node_namespace(tmp_path: Path) -> None:
+    manager = _manager(tmp_path, _archive())
+
+    async def run() -> None:
+        for node_id in (".release-cache", "..", "a/b", ""):
+            with pytest.raises(ValueError):
+                manager.submit_install(node_id, "o/r", "v1", "panel.zip", asset_url="https://x/panel.zip")
+
+    asyncio.run(run())
+    assert manager.install_jobs() == []
+
+
+def test_install_route_reports_corrupt_archive_as_bad_gateway(tmp_path: Path) -> None:
+    manager = _manager(tmp_path, b"not a zip archive")
+    app = FastAPI()
+    app.include_router(panel_routes.router)
+    app.dependency_overrides[panel_routes._get_manager] = lambda: manager  # pyright: ignore[reportPrivateUsage]
+    app.dependency_overrides[panel_routes._get_registry] = lambda: NodeRegistry()  # pyright: ignore[reportPrivateUsage]
+    client = _client(app)
+    request = {"node_id": "a", "repo": "o/r", "tag": "v1", "asset_name": "panel.zip", "asset_url": "https://x/p.zip"}
+
+    response = client.post("/api/panel/desktop/install", json=request)
+    assert response.status_code == 502
+    assert not (tmp_path / "a" / "v1").exists()
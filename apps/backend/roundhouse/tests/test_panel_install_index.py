@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+from roundhouse.services.panel_install_index import (
+    INSTALL_MANIFEST_NAME,
+    InstallIndex,
+    InstallManifest,
+    scan_executables,
+    write_install_manifest,
+)
+
+
+def _tree(root: Path) -> Path:
+    (root / "bin").mkdir(parents=True)
+    exe = root / "bin" / "ha_panel_sim"
+    exe.write_text("#!/bin/sh\n")
+    exe.chmod(0o755)
+    (root / "assets").mkdir()
+    (root / "assets" / "ui.json").write_text("{}")
+    return root
+
+
+def test_manifest_records_executables_and_resolves_without_walking(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    node_dir = tmp_path / "node"
+    tree = _tree(node_dir / "v2")
+    executables = scan_executables(tree, ["ha_panel_sim"])
+    assert executables == {"ha_panel_sim": "bin/ha_panel_sim"}
+    write_install_manifest(
+        node_dir,
+        InstallManifest("v2", "v2", "o/r", "panel.zip", None, "2026-01-01T00:00:00+00:00", executables),
+    )
+    assert json.loads((node_dir / INSTALL_MANIFEST_NAME).read_text())["version"] == "v2"
+    # An older tag directory touched later must not win over the manifest.
+    (node_dir / "v1").mkdir()
+
+    def no_walk(self: Path, pattern: str) -> None:
+        raise AssertionError("start must not walk the install tree")
+
+    monkeypatch.setattr(Path, "rglob", no_walk)
+    index = InstallIndex()
+    assert index.resolve(node_dir, "ha_panel_sim") == (tree, tree / "bin" / "ha_panel_sim")
+
+
+def test_legacy_install_falls_back_and_reindexes_on_change(tmp_path: Path) -> None:
+    node_dir = tmp_path / "node"
+    old = _tree(node_dir / "v1")
+    os.utime(old, (1, 1))
+    index = InstallIndex()
+    assert index.resolve(node_dir, "ha_panel_sim")[0] == old
+
+    new = _tree(node_dir / "v2")
+    os.utime(node_dir, ns=(node_dir.stat().st_atime_ns, node_dir.stat().st_mtime_ns + 1))
+    assert index.resolve(node_dir, "ha_panel_sim") == (new, new / "bin" / "ha_panel_sim")
+
+    with pytest.raises(FileNotFoundError):
+        index.resolve(tmp_path / "missing", "ha_panel_sim")
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+from roundhouse.services.panel_logs import MAX_LINE_CHARS, LogRing, PanelLogStore, RotatingLogFile, log_file_name
+from roundhouse.services.panel_supervisor import ProcessSupervisor, RestartPolicy
+
+
+def test_ring_is_bounded_by_size_and_followers_resume_by_seq() -> None:
+    ring = LogRing(max_chars=100)
+    for i in range(50):
+        ring.append("stdout", f"line {i:02d}")
+    tail = ring.tail()
+    assert sum(len(line.text) for line in tail) <= 100
+    assert tail[-1].text == "line 49" and tail[-1].seq == 50
+    assert [line.seq for line in ring.tail(since=48)] == [49, 50]
+    assert len(ring.append("stderr", "x" * (MAX_LINE_CHARS * 2)).text) == MAX_LINE_CHARS + 1
+
+    async def run() -> list[str]:
+        received: list[str] = []
+
+        async def follow() -> None:
+            async for line in ring.follow():
+                received.append(line.text)
+                if len(received) == 2:
+                    return
+
+        follower = asyncio.create_task(follow())
+        await asyncio.sleep(0)
+        ring.append("stdout", "new 1")
+        ring.append("stdout", "new 2")
+        await asyncio.wait_for(follower, 1)
+        return received
+
+    assert asyncio.run(run()) == ["new 1", "new 2"]
+
+
+def test_rotating_file_keeps_backups(tmp_path: Path) -> None:
+    ring = LogRing()
+    writer = RotatingLogFile(tmp_path / "a.log", max_bytes=64, backups=2)
+    for i in range(9):
+        writer.write_lines([ring.append("stdout", f"{i}" * 40)])
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.log", "a.log.1", "a.log.2"]
+
+
+def test_log_files_stay_inside_the_log_dir(tmp_path: Path) -> None:
+    logs = PanelLogStore(tmp_path / "logs")
+
+    async def run() -> None:
+        for node_id in ("a", "../escape", "/tmp/abs", "..", ".hidden", "x/../../y"):
+            await logs.note(node_id, "hello")
+
+    asyncio.run(run())
+    names = sorted(p.name for p in (tmp_path / "logs").iterdir())
+    assert len(names) == 6 and "a.log" in names
+    assert all(name.endswith(".log") and not name.startswith(".") for name in names)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["logs"]
+    assert log_file_name("../escape") != log_file_name("..")
+
+
+def test_supervisor_captures_stdout_and_stderr(tmp_path: Path) -> None:
+    logs = PanelLogStore(tmp_path)
+    supervisor = ProcessSupervisor(logs=logs)
+    code = "import sys\nfor i in range(3): print('out', i)\nprint('boom', file=sys.stderr)\n"
+
+    async def run() -> None:
+        entry = await supervisor.start("a", [sys.executable, "-c", code], policy=RestartPolicy(mode="never"))
+        assert entry.watcher is not None
+        await asyncio.wait_for(entry.watcher, 5)
+
+    asyncio.run(run())
+    ring = logs.get("a")
+    assert ring is not None
+    lines = [(line.stream, line.text) for line in ring.tail()]
+    assert [text for stream, text in lines if stream == "stdout"] == ["out 0", "out 1", "out 2"]
+    assert ("stderr", "boom") in lines
+    assert lines[-1] == ("system", "exited with code 0")
+    assert logs.last_log("a") == "exited with code 0"
+    assert "out 2" in (tmp_path / "a.log").read_text()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+from roundhouse.services.panel_metrics import (
+    ProcessMetricsSampler,
+    ProcessSample,
+    cpu_percent,
+    read_process_sample,
+)
+
+
+def _fake_proc(root: Path, pid: int, utime: int, rss_pages: int) -> None:
+    base = root / str(pid)
+    (base / "fd").mkdir(parents=True, exist_ok=True)
+    for fd in range(3):
+        (base / "fd" / str(fd)).touch()
+    rest = ["S"] + ["0"] * 10 + [str(utime), "50"] + ["0"] * 4 + ["4"] + ["0"] * 3 + [str(rss_pages)] + ["0"] * 20
+    (base / "stat").write_text(f"{pid} (panel (sim) x) " + " ".join(rest) + "\n")
+
+
+def test_read_process_sample_parses_proc_stat(tmp_path: Path) -> None:
+    _fake_proc(tmp_path, 42, utime=150, rss_pages=10)
+    sample = read_process_sample(42, tmp_path)
+    assert sample is not None
+    assert sample.cpu_seconds == pytest.approx(200 / os.sysconf("SC_CLK_TCK"))
+    assert sample.rss_bytes == 10 * os.sysconf("SC_PAGE_SIZE")
+    assert (sample.threads, sample.open_fds) == (4, 3)
+    assert read_process_sample(43, tmp_path) is None
+
+
+def test_sampler_keeps_bounded_history_per_node(tmp_path: Path) -> None:
+    targets = {"a": 42}
+    sampler = ProcessMetricsSampler(lambda: targets, capacity=3, proc_root=tmp_path)
+
+    async def run() -> None:
+        for tick in range(5):
+            _fake_proc(tmp_path, 42, utime=tick * 100, rss_pages=tick)
+            await sampler.sample_once()
+
+    asyncio.run(run())
+    samples = sampler.samples("a")
+    assert [s.rss_bytes // os.sysconf("SC_PAGE_SIZE") for s in samples] == [2, 3, 4]
+    latest, cpu = sampler.latest("a")
+    assert latest is not None and latest is samples[-1]
+    assert cpu is not None and cpu > 0
+    # A restart changes the pid, so no CPU rate is computed across it.
+    assert cpu_percent(samples[-1], ProcessSample(latest.timestamp + 1, 7, 0.0, 0, None, 1)) is None
+    assert sampler.latest("b") == (None, None)
+
+
+@pytest.mark.skipif(not Path("/proc/self/stat").exists(), reason="requires /proc")
+def test_reads_live_process() -> None:
+    sample = read_process_sample(os.getpid())
+    assert sample is not None and sample.rss_bytes > 0 and sample.threads >= 1
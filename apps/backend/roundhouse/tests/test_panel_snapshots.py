@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+from roundhouse.services.panel_snapshots import PanelSnapshotStore
+
+from core.panel.models import PanelLifecycleSnapshot
+
+T0 = 1_700_000_000.0
+
+
+def _snapshot(env_id: str, connected: bool, ready: bool) -> PanelLifecycleSnapshot:
+    return PanelLifecycleSnapshot(
+        env_id=env_id, state="running", transport_connected=connected, accepting_ingress=connected, ui_ready=ready
+    )
+
+
+def test_ratios_survive_downsampling_and_range_queries() -> None:
+    store = PanelSnapshotStore(raw_retention_seconds=600, bucket_seconds=60, compact_interval=1e9)
+    # One sample every 5 s for an hour; connected 3 of every 4, ready 1 of every 2.
+    samples: list[tuple[PanelLifecycleSnapshot, float | None]] = [
+        (_snapshot("a", i % 4 != 0, i % 2 == 0), T0 + i * 5) for i in range(720)
+    ]
+    assert store.record_many(samples) == 720
+    before = store.stats("a")
+    store.compact(now=T0 + 3600)
+    after = store.stats("a")
+    assert before is not None and after is not None
+    assert after.samples == before.samples == 720
+    assert after.transport_ratio == before.transport_ratio == pytest.approx(0.75)
+    assert after.ui_ready_ratio == pytest.approx(0.5)
+    assert (after.first_seen, after.last_seen) == (T0 - T0 % 60, T0 + 719 * 5)
+
+    # Last ten minutes are still raw; a range entirely inside it is exact.
+    recent = store.stats("a", start=T0 + 3300, end=T0 + 3395)
+    assert recent is not None and recent.samples == 20
+    assert recent.transport_ratio == pytest.approx(0.75)
+
+    # Out-of-order samples are rejected rather than reordering history.
+    assert not store.record(_snapshot("a", True, True), T0)
+    assert store.dropped == 1
+
+
+def test_memory_budget_evicts_oldest_history() -> None:
+    store = PanelSnapshotStore(max_bytes=20_000, raw_retention_seconds=0, bucket_seconds=1, compact_interval=1e9)
+    for env in range(4):
+        store.record_many([(_snapshot(f"e{env}", True, True), T0 + i) for i in range(2000)])
+        # The budget holds as samples arrive, not only after a compaction pass.
+        assert store.memory_bytes <= 20_000
+    store.compact(now=T0 + 5000)
+    assert store.memory_bytes <= 20_000
+    stats = store.fleet_stats()
+    assert [s.env_id for s in stats] == ["e0", "e1", "e2", "e3"]
+    assert all(s.last_seen == T0 + 1999 and s.transport_ratio == 1.0 for s in stats)
+    latest = store.latest("e0")
+    assert latest is not None and latest.ui_ready
+
+
+def test_background_compaction_and_range_queries_on_offsets() -> None:
+    store = PanelSnapshotStore(raw_retention_seconds=60, bucket_seconds=10, compact_interval=0.01)
+    try:
+        store.record_many([(_snapshot("a", i % 2 == 0, True), time.time() - 600 + i) for i in range(600)])
+        deadline = time.monotonic() + 5
+        # 600 raw samples cost 3000 bytes; nine minutes folded into 10 s buckets leave 60 raw plus 54 buckets.
+        while store.memory_bytes > 2500 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert store.memory_bytes < 2500
+        stats = store.stats("a")
+        assert stats is not None and stats.samples == 600 and stats.transport_ratio == pytest.approx(0.5)
+    finally:
+        store.close()
+
+    # Samples far enough apart to overflow the offset column still land in order.
+    sparse = PanelSnapshotStore(compact_interval=1e9)
+    try:
+        assert sparse.record(_snapshot("b", True, True), T0)
+        assert sparse.record(_snapshot("b", False, True), T0 + 60 * 86400)
+        stats = sparse.stats("b")
+        assert stats is not None and stats.samples == 2 and stats.transport_ratio == 0.5
+        recent = sparse.stats("b", start=T0 + 86400)
+        assert recent is not None and recent.samples == 1
+    finally:
+        sparse.close()
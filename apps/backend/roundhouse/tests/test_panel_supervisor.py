@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+from roundhouse.services.panel_supervisor import ProcessSupervisor, RestartPolicy
+
+FAST_RETRY = RestartPolicy(mode="on-failure", initial_backoff=0.01, max_backoff=0.05, max_restarts=2)
+
+
+def _python(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+async def _until(predicate: Callable[[], bool], timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_failed_process_restarts_with_backoff_then_gives_up() -> None:
+    supervisor = ProcessSupervisor()
+
+    async def run() -> None:
+        entry = await supervisor.start("a", _python("raise SystemExit(3)"), policy=FAST_RETRY)
+        await _until(lambda: entry.state == "failed")
+        assert entry.restarts == 2
+        assert entry.return_code == 3
+        assert entry.pid is None
+
+        clean = await supervisor.start("b", _python("pass"), policy=FAST_RETRY)
+        await _until(lambda: clean.state == "exited")
+        assert clean.restarts == 0
+
+    asyncio.run(run())
+
+
+def test_stop_escalates_to_kill_without_blocking_loop(tmp_path: Path) -> None:
+    ready = tmp_path / "ready"
+    stubborn = _python(
+        "import pathlib, signal, sys, time\n"
+        "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+        f"pathlib.Path({str(ready)!r}).touch()\n"
+        "time.sleep(60)\n"
+    )
+    supervisor = ProcessSupervisor(stop_timeout=0.2)
+
+    async def run() -> None:
+        entry = await supervisor.start("a", stubborn, policy=RestartPolicy(mode="always"))
+        await _until(ready.exists)
+        ticks = 0
+
+        async def tick() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        await supervisor.stop("a")
+        ticker.cancel()
+        assert entry.state == "stopped"
+        assert entry.return_code == -9
+        assert entry.restarts == 0
+        assert ticks > 5
+
+    asyncio.run(run())
+
+
+def test_batch_start_and_stop() -> None:
+    supervisor = ProcessSupervisor()
+    sleeper = _python("import time; time.sleep(60)")
+
+    async def run() -> None:
+        started = await supervisor.start_many([(f"n{i}", sleeper, None, None) for i in range(5)])
+        assert all(not isinstance(entry, BaseException) and entry.running for entry in started)
+        # Starting a running node again is a no-op.
+        again = await supervisor.start("n0", sleeper)
+        assert again is started[0]
+
+        stopped = await supervisor.stop_many([f"n{i}" for i in range(5)] + ["missing"])
+        assert stopped[-1] is None
+        assert all(entry.state == "stopped" for entry in supervisor.entries())
+
+    asyncio.run(run())
+
+
+def test_on_exit_runs_once_a_node_is_done() -> None:
+    exited: list[str] = []
+    supervisor = ProcessSupervisor(on_exit=exited.append)
+
+    async def run() -> None:
+        failing = await supervisor.start("a", _python("raise SystemExit(3)"), policy=FAST_RETRY)
+        await _until(lambda: failing.state == "failed")
+        # Restarts in between do not count as the node being done.
+        assert exited == ["a"]
+
+        await supervisor.start("b", _python("import time; time.sleep(60)"))
+        await supervisor.stop("b")
+        assert exited == ["a", "b"]
+
+    asyncio.run(run())
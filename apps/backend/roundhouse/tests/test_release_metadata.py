@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+from roundhouse.services.release_metadata import ReleaseMetadata, ReleaseMetadataCache
+
+
+def _transport(calls: list[httpx.Request]) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if request.url.path.endswith("/missing"):
+            return httpx.Response(404, json={"message": "Not Found"})
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"assets": [{"name": "panel.zip"}]}, headers={"etag": '"v1"'})
+
+    return httpx.MockTransport(handler)
+
+
+def test_release_metadata_revalidates_and_caches_misses() -> None:
+    calls: list[httpx.Request] = []
+    cache = ReleaseMetadataCache(fresh_seconds=0.0, negative_ttl_seconds=3600, transport=_transport(calls))
+
+    async def run() -> None:
+        first = await cache.get("o/r", "v1")
+        assert first.find_asset("panel.zip") is not None
+        # Stale entries are revalidated with the stored ETag and keep their payload on 304.
+        second = await cache.get("o/r", "v1")
+        assert calls[-1].headers["if-none-match"] == '"v1"'
+        assert second.payload == first.payload
+
+        assert not (await cache.get("o/r", "missing")).found
+        assert not (await cache.get("o/r", "missing")).found
+        assert sum(call.url.path.endswith("/missing") for call in calls) == 1
+
+        before = len(calls)
+        _metadata, asset = await cache.find_asset("o/r", "v1", "other.zip")
+        assert asset is None
+        _metadata, asset = await cache.find_asset("o/r", "v1", "other.zip")
+        assert asset is None
+        # Stale read plus one forced revalidation for the first miss; the second miss is remembered.
+        assert len(calls) - before == 3
+
+    asyncio.run(run())
+
+
+def test_release_metadata_prewarm_shares_requests() -> None:
+    calls: list[httpx.Request] = []
+    cache = ReleaseMetadataCache(transport=_transport(calls))
+
+    async def run() -> list[ReleaseMetadata | BaseException]:
+        return await cache.prewarm("o/r", ["v1", "v2", "v1", "missing"])
+
+    results = asyncio.run(run())
+    assert [isinstance(r, ReleaseMetadata) and r.found for r in results] == [True, True, True, False]
+    assert len(calls) == 3
+    assert cache.get_sync("o/r", "v2").found
+    assert len(calls) == 3
+
+
+def test_release_metadata_reports_malformed_json_as_http_error() -> None:
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=b"<html>"))
+    cache = ReleaseMetadataCache(transport=transport)
+    with pytest.raises(httpx.HTTPError):
+        cache.get_sync("o/r", "v1")
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+import pytest
+from roundhouse.services import simulator_bundle
+from roundhouse.services.manifest_sync import BuildManifest, ManifestArtifactFile
+from roundhouse.services.simulator_bundle import BundleError, resolve_bundle
+
+
+def test_resolve_bundle_prefers_js_glue_and_pins_digests(tmp_path: Path) -> None:
+    (tmp_path / "sim.wasm").write_bytes(b"\0asm")
+    (tmp_path / "sim.js").write_text("// glue")
+    (tmp_path / "sim.mjs").write_text("// module glue")
+
+    bundle = resolve_bundle("sim.wasm", tmp_path)
+
+    assert bundle.glue.filename == "sim.js"
+    assert not bundle.module
+    assert bundle.wasm is not None
+    assert bundle.wasm.size_bytes == 4
+    assert bundle.wasm.sha256 == hashlib.sha256(b"\0asm").hexdigest()
+    assert bundle.wasm.url == f"/api/artifacts/download/sim.wasm?digest={bundle.wasm.sha256}"
+
+
+def test_resolve_bundle_errors(tmp_path: Path) -> None:
+    (tmp_path / "sim.wasm").write_bytes(b"\0asm")
+    with pytest.raises(BundleError) as missing_glue:
+        resolve_bundle("sim.wasm", tmp_path)
+    assert missing_glue.value.code == "BUNDLE_GLUE_NOT_FOUND"
+    with pytest.raises(BundleError) as missing_wasm:
+        resolve_bundle("other.wasm", tmp_path)
+    assert missing_wasm.value.status_code == 404
+    with pytest.raises(BundleError) as invalid:
+        resolve_bundle("../sim.wasm", tmp_path)
+    assert invalid.value.status_code == 400
+
+
+@pytest.mark.parametrize("entrypoint", ["..", "dist/", "/", ".hidden.js"])
+def test_resolve_bundle_ignores_entrypoints_that_are_not_file_names(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, entrypoint: str
+) -> None:
+    (tmp_path / "sim.wasm").write_bytes(b"\0asm")
+    (tmp_path / "sim.js").write_text("// glue")
+    (tmp_path / "dist").mkdir()
+    entry = ManifestArtifactFile(filename="sim.wasm", entrypoint=entrypoint)
+    manifest = BuildManifest(artifact="sim", platform="web", version="1", release_tag="v1", artifacts=[entry])
+
+    def declared(_filename: str) -> tuple[BuildManifest, ManifestArtifactFile]:
+        return manifest, entry
+
+    monkeypatch.setattr(simulator_bundle, "find_local_manifest_artifact", declared)
+
+    assert resolve_bundle("sim.wasm", tmp_path).glue.filename == "sim.js"
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+from roundhouse.services import simulator_responses
+from roundhouse.services.simulator_responses import RenderedResponseCache, artifacts_revision
+
+
+def test_rendered_response_cache_rerenders_only_on_key_change() -> None:
+    cache = RenderedResponseCache()
+    calls: list[int] = []
+
+    def render() -> bytes:
+        calls.append(1)
+        return b'{"version":"1.0"}'
+
+    first = cache.get("active", (1, 1), render)
+    assert cache.get("active", (1, 1), render) is first
+    assert len(calls) == 1
+
+    second = cache.get("active", (2, 1), render)
+    assert len(calls) == 2
+    # Identical bodies keep the same validator across revisions.
+    assert second.etag == first.etag
+    assert first.etag.startswith('"') and first.etag.endswith('"')
+
+
+def test_rendered_response_cache_does_not_store_failures() -> None:
+    cache = RenderedResponseCache()
+
+    def fail() -> bytes:
+        raise RuntimeError("manifest unavailable")
+
+    with pytest.raises(RuntimeError):
+        cache.get("inventory", 1, fail)
+    assert cache.get("inventory", 1, lambda: b"[]").body == b"[]"
+
+
+def test_artifacts_revision_sees_files_added_and_removed_outside_the_api(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(simulator_responses, "ARTIFACTS_DIR", tmp_path)
+    # Pin the directory mtime so each change is visible even on coarse-grained filesystems.
+    os.utime(tmp_path, ns=(0, 0))
+    assert artifacts_revision() == 0
+
+    (tmp_path / "sim-linux-x64.tar.gz").write_bytes(b"x")
+    assert artifacts_revision() != 0
+
+    os.utime(tmp_path, ns=(0, 0))
+    (tmp_path / "sim-linux-x64.tar.gz").unlink()
+    assert artifacts_revision() != 0
+
+    monkeypatch.setattr(simulator_responses, "ARTIFACTS_DIR", tmp_path / "missing")
+    assert artifacts_revision() is None
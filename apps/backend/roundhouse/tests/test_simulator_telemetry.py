@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from roundhouse.services.simulator_telemetry import BootEvent, BootTelemetry, LatencyHistogram
+
+
+def test_latency_histogram_percentiles_within_relative_error() -> None:
+    histogram = LatencyHistogram(relative_error=0.01)
+    for value in range(1, 1001):
+        histogram.record(float(value))
+    for q, expected in ((0.5, 500.0), (0.95, 950.0), (0.99, 990.0)):
+        estimate = histogram.percentile(q)
+        assert estimate is not None
+        assert abs(estimate - expected) / expected <= 0.02
+    assert histogram.percentile(1.0) == 1000.0
+    assert LatencyHistogram().percentile(0.5) is None
+
+
+def test_boot_telemetry_aggregates_per_version_and_persists(tmp_path: Path) -> None:
+    path = tmp_path / "simulator-telemetry.json"
+    telemetry = BootTelemetry(path, flush_interval=3600)
+    for total in (100.0, 200.0, 300.0):
+        telemetry.record(BootEvent("sim.wasm", "booted", "1.0", {"total": total, "bogus": 1.0}, "network"))
+    telemetry.record(BootEvent("sim.wasm", "error", "1.0"))
+    telemetry.record(BootEvent("sim.wasm", "booted", "1.1", {"total": 50.0}, "module"))
+    telemetry.close()
+
+    reloaded = BootTelemetry(path)
+    (series,) = reloaded.series("sim.wasm", "1.0")
+    assert series.boots == 3
+    assert series.errors == 1
+    assert series.cache == {"network": 3}
+    assert set(series.phases) == {"total"}
+    p50 = series.phases["total"].percentile(0.5)
+    assert p50 is not None and abs(p50 - 200.0) <= 4.0
+    assert len(reloaded.series("sim.wasm")) == 2
+    reloaded.close()
+
+
+def test_boot_telemetry_flushes_on_a_timer_without_further_events(tmp_path: Path) -> None:
+    path = tmp_path / "simulator-telemetry.json"
+    telemetry = BootTelemetry(path, flush_interval=0.02)
+    telemetry.record(BootEvent("sim.wasm", "booted", "1.0", {"total": 10.0}))
+    deadline = time.monotonic() + 5
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert path.exists()
+    telemetry.close()
+    reloaded = BootTelemetry(path)
+    assert len(reloaded.series("sim.wasm")) == 1
+    reloaded.close()
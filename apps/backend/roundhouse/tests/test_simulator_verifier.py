@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from pathlib import Path
+
+from roundhouse.services.simulator_verifier import ArtifactVerification, SimulatorArtifactVerifier
+
+
+def _settle(verifier: SimulatorArtifactVerifier, filename: str, sha256: str) -> ArtifactVerification:
+    deadline = time.monotonic() + 30
+    result = verifier.lookup(filename, sha256)
+    while result.status == "pending" and time.monotonic() < deadline:
+        time.sleep(0.05)
+        result = verifier.lookup(filename, sha256)
+    return result
+
+
+def test_verifier_reports_missing_verified_and_corrupt(tmp_path: Path) -> None:
+    payload = b"\0asm" + b"x" * 4096
+    digest = hashlib.sha256(payload).hexdigest()
+    (tmp_path / "sim.wasm").write_bytes(payload)
+    verifier = SimulatorArtifactVerifier(tmp_path, max_workers=1)
+    try:
+        assert verifier.lookup("gone.wasm", digest).status == "missing"
+        assert verifier.lookup("sim.wasm", None).status == "unverified"
+
+        result = _settle(verifier, "sim.wasm", digest)
+        assert result.status == "verified"
+        assert result.size_bytes == len(payload)
+        assert result.build_timestamp
+        revision = verifier.revision
+
+        # Unchanged files are answered from the cache without another hash.
+        assert verifier.lookup("dist/sim.wasm", digest).status == "verified"
+        assert verifier.revision == revision
+
+        (tmp_path / "sim.wasm").write_bytes(payload + b"tampered")
+        assert _settle(verifier, "sim.wasm", digest).status == "corrupt"
+        assert verifier.revision > revision
+    finally:
+        verifier.shutdown()
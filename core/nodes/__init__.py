@@ -1,3 +1,4 @@
+from core.nodes.changes import NodeChange, NodeChangeLog, NodeFeed
 from core.nodes.models import (
     NodeCreateRequest,
     NodeLifecycleUpdateRequest,
@@ -5,17 +6,33 @@ from core.nodes.models import (
     NodeType,
     NodeUpdateRequest,
 )
-from core.nodes.registry import NodeRecord, NodeRegistry, get_node_registry
-from core.nodes.transitions import is_transition_allowed
+from core.nodes.registry import (
+    BulkFailure,
+    NodeRecord,
+    NodeRegistry,
+    NodeVersionConflictError,
+    get_node_registry,
+    set_node_registry,
+)
+from core.nodes.storage import NodeStorage
+from core.nodes.transitions import LifecycleTransitionError, is_transition_allowed
 
 __all__ = [
+    "BulkFailure",
+    "LifecycleTransitionError",
+    "NodeChange",
+    "NodeChangeLog",
     "NodeCreateRequest",
+    "NodeFeed",
     "NodeLifecycleUpdateRequest",
     "NodeRecord",
     "NodeRegistry",
     "NodeResponse",
+    "NodeStorage",
     "NodeType",
     "NodeUpdateRequest",
+    "NodeVersionConflictError",
     "get_node_registry",
     "is_transition_allowed",
+    "set_node_registry",
 ]
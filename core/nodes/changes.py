@@ -0,0 +1,99 @@
+"""Versioned change feed for the node registry."""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from core.nodes.registry import NodeRecord
+
+NodeChangeKind = Literal["register", "update", "lifecycle"]
+
+# Events kept in memory; watchers further behind than this get a snapshot instead.
+CHANGE_LOG_CAPACITY = 10000
+# Events older than this are dropped as new ones arrive, however few there are.
+CHANGE_LOG_MAX_AGE_SECONDS = 600.0
+
+
+@dataclass(frozen=True)
+class NodeChange:
+    rev: int
+    kind: NodeChangeKind
+    # The record as published at this revision; the registry never mutates published records.
+    record: NodeRecord
+
+
+@dataclass(frozen=True)
+class NodeFeed:
+    """What a watcher at some revision needs to catch up to ``rev``.
+
+    Either ``events`` after the requested revision, or, when those have been
+    compacted away, a ``snapshot`` of every node as of ``rev``.
+    """
+
+    rev: int
+    events: list[NodeChange]
+    snapshot: list[NodeRecord] | None = None
+
+
+class NodeChangeLog:
+    """Bounded log of registry changes, numbered by a registry-wide revision.
+
+    The log keeps at most ``capacity`` events and none older than
+    ``max_age`` seconds; both bounds are enforced on append.
+    """
+
+    def __init__(self, capacity: int = CHANGE_LOG_CAPACITY, max_age: float = CHANGE_LOG_MAX_AGE_SECONDS) -> None:
+        self._events: deque[NodeChange] = deque(maxlen=capacity)
+        # When each event in ``_events`` was appended (monotonic seconds).
+        self._times: deque[float] = deque(maxlen=capacity)
+        self._max_age = max_age
+        self._rev = 0
+        # Revisions at or below this are no longer in the log.
+        self._floor = 0
+        self._listeners: list[Callable[[], None]] = []
+
+    @property
+    def rev(self) -> int:
+        return self._rev
+
+    def append(self, kind: NodeChangeKind, record: NodeRecord) -> NodeChange:
+        """Record a change; listeners are not called until ``notify``."""
+        now = time.monotonic()
+        self._rev += 1
+        if len(self._events) == self._events.maxlen:
+            self._floor = self._events[0].rev
+        while self._times and now - self._times[0] > self._max_age:
+            self._times.popleft()
+            self._floor = self._events.popleft().rev
+        change = NodeChange(rev=self._rev, kind=kind, record=record)
+        self._events.append(change)
+        self._times.append(now)
+        return change
+
+    def notify(self) -> None:
+        """Call every listener; the registry does this after releasing its lock."""
+        for listener in list(self._listeners):
+            listener()
+
+    def since(self, rev: int) -> list[NodeChange] | None:
+        """Events after ``rev``, or None when some of them were compacted away (or ``rev`` is from the future)."""
+        if rev < self._floor or rev > self._rev:
+            return None
+        # Revisions are contiguous, so the first wanted event sits at a known offset.
+        start = len(self._events) - (self._rev - rev)
+        return [self._events[index] for index in range(start, len(self._events))]
+
+    def subscribe(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call ``listener`` after every append; returns a function that unsubscribes it."""
+        self._listeners.append(listener)
+
+        def unsubscribe() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return unsubscribe
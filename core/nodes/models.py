@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -27,6 +27,27 @@ class NodeResponse(BaseModel):
     artifact_ref: str | None = None
     metadata: dict[str, Any] = Field(default_factory=dict)
     last_updated: datetime | None = None
+    version: int = 1
+
+
+class NodeChangeResponse(BaseModel):
+    """One registry change, carrying the node as of that revision."""
+
+    rev: int
+    kind: Literal["register", "update", "lifecycle"]
+    node: dict[str, Any]
+
+
+def _no_changes() -> list[NodeChangeResponse]:
+    return []
+
+
+class NodeWatchResponse(BaseModel):
+    """Changes since the requested revision, or a snapshot when they are no longer retained."""
+
+    rev: int
+    events: list[NodeChangeResponse] = Field(default_factory=_no_changes)
+    snapshot: list[dict[str, Any]] | None = None
 
 
 class NodeCreateRequest(BaseModel):
@@ -57,3 +78,68 @@ class NodeLifecycleUpdateRequest(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     state: NodeLifecycleState
+    # Compare-and-set: only apply while the node is still in this state.
+    expected_state: NodeLifecycleState | None = None
+
+
+# Largest batch one bulk request may carry.
+MAX_BULK_OPERATIONS = 10000
+
+
+class NodeBulkUpdateItem(NodeUpdateRequest):
+    """One node's update within a bulk request."""
+
+    node_id: str
+
+
+class NodeBulkLifecycleItem(NodeLifecycleUpdateRequest):
+    """One node's lifecycle change within a bulk request."""
+
+    node_id: str
+
+
+class NodeBulkCreateRequest(BaseModel):
+    """Request to create many nodes."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    nodes: list[NodeCreateRequest] = Field(max_length=MAX_BULK_OPERATIONS)
+    atomic: bool = False
+
+
+class NodeBulkUpdateRequest(BaseModel):
+    """Request to update many nodes."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    updates: list[NodeBulkUpdateItem] = Field(max_length=MAX_BULK_OPERATIONS)
+    atomic: bool = False
+
+
+class NodeBulkLifecycleRequest(BaseModel):
+    """Request to change the lifecycle state of many nodes."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    transitions: list[NodeBulkLifecycleItem] = Field(max_length=MAX_BULK_OPERATIONS)
+    atomic: bool = False
+
+
+class NodeBulkFailure(BaseModel):
+    """A rejected item, by its position in the request."""
+
+    index: int
+    node_id: str
+    status: int
+    detail: str
+
+
+def _no_failures() -> list[NodeBulkFailure]:
+    return []
+
+
+class NodeBulkResponse(BaseModel):
+    """Outcome of a bulk request; only failed items are listed."""
+
+    applied: int
+    failed: list[NodeBulkFailure] = Field(default_factory=_no_failures)
@@ -2,12 +2,75 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import copy
+import json
+import threading
+from collections.abc import Callable, Generator, Hashable, Iterable
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field, replace
+from dataclasses import fields as dataclass_fields
 from datetime import datetime
-from typing import Any
+from typing import Any, Literal
 
 from core.lifecycle.models import NodeLifecycleState
+from core.nodes.changes import NodeChangeKind, NodeChangeLog, NodeFeed
 from core.nodes.models import NodeResponse, NodeType
+from core.nodes.storage import NodeStorage, NodeWrite
+from core.nodes.transitions import LifecycleTransitionError, check_transition, check_transitions
+
+# Metadata keys indexed when the caller does not choose its own.
+DEFAULT_INDEXED_METADATA = ("runtime_type",)
+
+# Writers to the same node serialize on one of these locks; writers to different nodes mostly do not contend.
+LOCK_STRIPES = 64
+# How often a write is re-planned after losing a race with another worker before giving up.
+WRITE_ATTEMPTS = 8
+
+IndexKey = tuple[str, Hashable]
+
+
+def metadata_index_value(value: Any) -> str | None:
+    """The form a metadata value is indexed under, or None for values that are not indexed.
+
+    Strings index as themselves and other scalars as JSON, so query-string
+    filters like ``enabled=true`` or ``port=8080`` match.
+    """
+    if isinstance(value, str):
+        return value
+    if value is None or isinstance(value, (bool, int, float)):
+        return json.dumps(value)
+    return None
+
+
+def _metadata_matches(metadata: dict[str, Any], key: str, value: Any) -> bool:
+    if key not in metadata:
+        return False
+    wanted, actual = metadata_index_value(value), metadata_index_value(metadata[key])
+    if wanted is not None and actual is not None:
+        return wanted == actual
+    return metadata[key] == value
+
+
+BulkFailureReason = Literal["not_found", "exists", "duplicate", "not_allowed", "state_mismatch"]
+
+
+@dataclass(frozen=True)
+class BulkFailure:
+    """One rejected item of a bulk operation, by its position in the request."""
+
+    index: int
+    node_id: str
+    reason: BulkFailureReason
+
+
+class NodeVersionConflictError(Exception):
+    """The node changed since the version the caller based its write on."""
+
+    def __init__(self, node_id: str, expected: int, actual: int) -> None:
+        super().__init__(f"Node {node_id} is at version {actual}, not {expected}")
+        self.node_id = node_id
+        self.expected = expected
+        self.actual = actual
 
 
 def _default_capabilities() -> list[str]:
@@ -29,6 +92,8 @@ class NodeRecord:
     artifact_ref: str | None = None
     metadata: dict[str, Any] = field(default_factory=_default_metadata)
     last_updated: datetime = field(default_factory=datetime.now)
+    # Bumped by every write through the registry; the basis of HTTP ETags.
+    version: int = 1
 
     def to_response(self) -> NodeResponse:
         return NodeResponse(
@@ -39,44 +104,411 @@ class NodeRecord:
             artifact_ref=self.artifact_ref,
             metadata=self.metadata,
             last_updated=self.last_updated,
+            version=self.version,
         )
 
 
+def _new_version(record: NodeRecord, **changes: Any) -> NodeRecord:
+    """``replace`` that also gives the new record its own ``capabilities`` and ``metadata``.
+
+    Published records are shared with readers, so no two versions (and no
+    caller's arguments) may share those containers.
+    """
+    new = replace(record, **changes)
+    new.capabilities = list(new.capabilities)
+    new.metadata = copy.deepcopy(new.metadata)
+    return new
+
+
+# A planned write: the new record, its change kind and the version it replaces (0 for a new node).
+_Write = tuple[NodeRecord, NodeChangeKind, int]
+
+# Fields update() may set; identity and bookkeeping fields are the registry's.
+_UPDATABLE_FIELDS = frozenset(f.name for f in dataclass_fields(NodeRecord)) - {"node_id", "last_updated", "version"}
+
+
 class NodeRegistry:
-    """In-memory registry for nodes."""
+    """In-memory registry for nodes.
+
+    With a ``storage`` the dict acts as a read-through cache: writes are
+    persisted, and reads first merge records written elsewhere (for example by
+    another worker process).
+
+    Secondary indexes on node type, lifecycle state, each capability and the
+    ``indexed_metadata`` keys map to node id sets, so ``find_nodes`` touches
+    only candidates from the smallest matching set.
+
+    Every change, including records merged from storage, is appended to a
+    bounded change log; ``feed`` serves watchers from it.
 
-    def __init__(self) -> None:
+    Records are copy-on-write: a write publishes a new ``NodeRecord`` with the
+    next ``version`` and never mutates the old one, so readers holding a
+    record never see half an update. Read-modify-write cycles hold a striped
+    per-node lock, so concurrent writers from thread pools serialize only
+    when they touch the same node. Across processes, storage stores a write
+    only if the node is still at the version it was derived from; a write
+    that loses that race is re-planned on top of the winner's record.
+    """
+
+    def __init__(
+        self, storage: NodeStorage | None = None, indexed_metadata: Iterable[str] = DEFAULT_INDEXED_METADATA
+    ) -> None:
         self._nodes: dict[str, NodeRecord] = {}
+        self._storage = storage
+        self._indexed_metadata = tuple(indexed_metadata)
+        self._index: dict[IndexKey, set[str]] = {}
+        # The index keys each node was filed under, so unindexing never depends on the record's current state.
+        self._index_keys: dict[str, list[IndexKey]] = {}
+        self._changes = NodeChangeLog()
+        self._stripes = tuple(threading.Lock() for _ in range(LOCK_STRIPES))
+        # Guards the dict, indexes and change log; held only to publish or scan, never across a whole write.
+        self._lock = threading.Lock()
+        if storage is not None:
+            for record in storage.load():
+                self._publish(record, "register")
+
+    def _stripe(self, node_id: str) -> threading.Lock:
+        return self._stripes[hash(node_id) % LOCK_STRIPES]
+
+    @contextmanager
+    def _all_stripes(self) -> Generator[None, None, None]:
+        """Hold every node lock (always in the same order), so a bulk operation sees and applies one state."""
+        with ExitStack() as stack:
+            for lock in self._stripes:
+                stack.enter_context(lock)
+            yield
+
+    def _keys_for(self, record: NodeRecord) -> list[IndexKey]:
+        keys: list[IndexKey] = [("type", record.node_type), ("state", record.lifecycle_state)]
+        keys.extend(("capability", capability) for capability in set(record.capabilities))
+        for key in self._indexed_metadata:
+            if key in record.metadata:
+                value = metadata_index_value(record.metadata[key])
+                if value is not None:
+                    keys.append((f"metadata:{key}", value))
+        return keys
+
+    def _reindex(self, record: NodeRecord) -> None:
+        for key in self._index_keys.pop(record.node_id, ()):
+            ids = self._index.get(key)
+            if ids is not None:
+                ids.discard(record.node_id)
+                if not ids:
+                    del self._index[key]
+        keys = self._keys_for(record)
+        for key in keys:
+            self._index.setdefault(key, set()).add(record.node_id)
+        self._index_keys[record.node_id] = keys
+
+    def _publish(self, record: NodeRecord, kind: NodeChangeKind) -> None:
+        with self._lock:
+            current = self._nodes.get(record.node_id)
+            if current is not None and current.version >= record.version:
+                # Versions only grow, so this is a record we already hold (e.g. our own write read back).
+                return
+            self._nodes[record.node_id] = record
+            self._reindex(record)
+            self._changes.append(kind, record)
+        # Outside the lock, so a listener that reads the registry cannot deadlock or stall writers.
+        self._changes.notify()
+
+    def _refresh(self, force: bool = False) -> None:
+        if self._storage is None:
+            return
+        for record in self._storage.changes(force):
+            self._publish(record, "update")
+
+    def sync(self) -> None:
+        """Pull every change other workers have committed, without waiting for the next periodic check."""
+        self._refresh(force=True)
+
+    def _commit(self, writes: list[tuple[NodeRecord, NodeChangeKind, int]]) -> bool:
+        """Store then publish ``(record, kind, base_version)`` writes.
+
+        Returns False, publishing what storage holds instead, when another
+        worker changed one of the nodes first; the caller re-plans against
+        that and tries again.
+        """
+        if self._storage is not None:
+            stale = self._storage.save([NodeWrite(record, base) for record, _, base in writes])
+            if stale:
+                for record in stale:
+                    self._publish(record, "update")
+                return False
+        for record, kind, _ in writes:
+            self._publish(record, kind)
+        return True
+
+    def _lost_race(self, node_id: str) -> NodeVersionConflictError:
+        # Only reachable when other workers keep winning every attempt on this node.
+        current = self._nodes[node_id]
+        return NodeVersionConflictError(node_id, current.version - 1, current.version)
+
+    def _current(self, node_id: str, expected_version: int | None) -> NodeRecord:
+        """The node as a write should start from; ``expected_version`` pins it to one version."""
+        current = self._nodes.get(node_id)
+        if current is not None and expected_version is not None and expected_version > current.version:
+            # Our copy may just be behind another worker's write.
+            self._refresh(force=True)
+            current = self._nodes.get(node_id)
+        if current is None:
+            raise KeyError(node_id)
+        if expected_version is not None and expected_version != current.version:
+            raise NodeVersionConflictError(node_id, expected_version, current.version)
+        return current
 
     def list_nodes(self) -> list[NodeRecord]:
-        return list(self._nodes.values())
+        self._refresh()
+        with self._lock:
+            return list(self._nodes.values())
 
     def get_node(self, node_id: str) -> NodeRecord | None:
+        self._refresh()
         return self._nodes.get(node_id)
 
+    def find_nodes(
+        self,
+        node_type: NodeType | None = None,
+        state: NodeLifecycleState | None = None,
+        capabilities: Iterable[str] = (),
+        metadata: dict[str, Any] | None = None,
+    ) -> list[NodeRecord]:
+        """Nodes matching every given filter; capabilities must all be present.
+
+        Scalar metadata values match in their indexed form, so ``"8080"``
+        finds a node whose value is ``8080``. Metadata keys outside
+        ``indexed_metadata`` still filter correctly, but by checking each
+        candidate rather than through an index.
+        """
+        self._refresh()
+        keys: list[IndexKey] = []
+        if node_type is not None:
+            keys.append(("type", node_type))
+        if state is not None:
+            keys.append(("state", state))
+        keys.extend(("capability", capability) for capability in capabilities)
+        unindexed: dict[str, Any] = {}
+        for key, value in (metadata or {}).items():
+            indexed = metadata_index_value(value)
+            if key in self._indexed_metadata and indexed is not None:
+                keys.append((f"metadata:{key}", indexed))
+            else:
+                unindexed[key] = value
+        with self._lock:
+            if not keys:
+                records = list(self._nodes.values())
+            else:
+                sets = sorted((self._index.get(key, set()) for key in keys), key=len)
+                smallest, rest = sets[0], sets[1:]
+                records = [self._nodes[node_id] for node_id in smallest if all(node_id in ids for ids in rest)]
+        if unindexed:
+            records = [
+                record
+                for record in records
+                if all(_metadata_matches(record.metadata, key, value) for key, value in unindexed.items())
+            ]
+        return records
+
+    @property
+    def rev(self) -> int:
+        return self._changes.rev
+
+    def feed(self, since: int | None) -> NodeFeed:
+        """Changes after revision ``since``; a full snapshot when ``since`` is None or too old."""
+        self._refresh()
+        with self._lock:
+            events = self._changes.since(since) if since is not None else None
+            if events is None:
+                return NodeFeed(rev=self._changes.rev, events=[], snapshot=list(self._nodes.values()))
+            return NodeFeed(rev=self._changes.rev, events=events)
+
+    def subscribe(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call ``listener`` after every change made through this registry; returns an unsubscribe function.
+
+        Changes written by other processes are only noticed on the next read
+        (``feed``, ``get_node``, …), so watchers should also poll. Listeners
+        run on the writer's thread after the registry lock is released, and
+        must not block.
+        """
+        with self._lock:
+            return self._changes.subscribe(listener)
+
+    def _registered(self, record: NodeRecord) -> tuple[NodeRecord, NodeChangeKind, int]:
+        existing = self._nodes.get(record.node_id)
+        base = existing.version if existing is not None else 0
+        # Re-registering continues the version sequence so stale ETags stay stale.
+        return _new_version(record, version=base + 1), "register", base
+
+    @staticmethod
+    def _updated(
+        current: NodeRecord, updates: dict[str, Any], merge_metadata: dict[str, Any] | None = None
+    ) -> tuple[NodeRecord, NodeChangeKind, int]:
+        changes = {key: value for key, value in updates.items() if value is not None and key in _UPDATABLE_FIELDS}
+        if merge_metadata:
+            changes["metadata"] = {**changes.get("metadata", current.metadata), **merge_metadata}
+        record = _new_version(current, **changes, last_updated=datetime.now(), version=current.version + 1)
+        return record, "update", current.version
+
+    @staticmethod
+    def _moved(current: NodeRecord, state: NodeLifecycleState) -> tuple[NodeRecord, NodeChangeKind, int]:
+        record = _new_version(current, lifecycle_state=state, last_updated=datetime.now(), version=current.version + 1)
+        return record, "lifecycle", current.version
+
     def register(self, record: NodeRecord) -> NodeRecord:
-        self._nodes[record.node_id] = record
-        return record
+        """Add or replace a node; returns the record as published."""
+        with self._stripe(record.node_id):
+            self._refresh()
+            for _ in range(WRITE_ATTEMPTS):
+                write = self._registered(record)
+                if self._commit([write]):
+                    return write[0]
+            raise self._lost_race(record.node_id)
 
-    def update(self, node_id: str, **updates: Any) -> NodeRecord:
-        record = self._nodes.get(node_id)
-        if record is None:
-            raise KeyError(node_id)
-        for key, value in updates.items():
-            if value is None:
-                continue
-            if hasattr(record, key):
-                setattr(record, key, value)
-        record.last_updated = datetime.now()
-        return record
-
-    def set_lifecycle(self, node_id: str, state: NodeLifecycleState) -> NodeRecord:
-        record = self._nodes.get(node_id)
-        if record is None:
-            raise KeyError(node_id)
-        record.lifecycle_state = state
-        record.last_updated = datetime.now()
-        return record
+    def update(
+        self,
+        node_id: str,
+        expected_version: int | None = None,
+        merge_metadata: dict[str, Any] | None = None,
+        **updates: Any,
+    ) -> NodeRecord:
+        """Set the given fields (None values are skipped) and return the new record.
+
+        ``merge_metadata`` adds keys to the current metadata instead of
+        replacing it, atomically with respect to every other writer, in this
+        process or another. With ``expected_version`` the write only applies
+        if the node is still at that version; otherwise
+        ``NodeVersionConflictError``.
+        """
+        with self._stripe(node_id):
+            self._refresh()
+            for _ in range(WRITE_ATTEMPTS):
+                write = self._updated(self._current(node_id, expected_version), updates, merge_metadata)
+                if self._commit([write]):
+                    return write[0]
+            raise self._lost_race(node_id)
+
+    def set_lifecycle(
+        self,
+        node_id: str,
+        state: NodeLifecycleState,
+        expected_state: NodeLifecycleState | None = None,
+        expected_version: int | None = None,
+    ) -> NodeRecord:
+        """Move a node to ``state`` if the lifecycle state machine allows it.
+
+        With ``expected_state`` the change only applies while the node is
+        still in that state, so two controllers cannot both act on a state one
+        of them has already left. Raises ``LifecycleTransitionError`` (or
+        ``NodeVersionConflictError`` for ``expected_version``); re-entering
+        the current state is a no-op.
+        """
+        with self._stripe(node_id):
+            self._refresh()
+            for _ in range(WRITE_ATTEMPTS):
+                current = self._current(node_id, expected_version)
+                rejection = check_transition(current.lifecycle_state, state, expected_state)
+                if rejection is not None:
+                    raise LifecycleTransitionError(node_id, current.lifecycle_state, state, rejection)
+                if current.lifecycle_state is state:
+                    return current
+                write = self._moved(current, state)
+                if self._commit([write]):
+                    return write[0]
+            raise self._lost_race(node_id)
+
+    # Bulk operations hold every node lock, validate every item against that one
+    # view of the registry, then store every accepted write in one storage
+    # transaction. With ``atomic`` a single failure rejects the whole batch;
+    # otherwise the valid items are applied and the failures returned. When
+    # another worker got to one of the nodes first, the batch is validated
+    # again against what it wrote.
+
+    def _bulk(self, plan: Callable[[], tuple[list[BulkFailure], list[_Write]]], atomic: bool) -> list[BulkFailure]:
+        with self._all_stripes():
+            self._refresh()
+            writes: list[_Write] = []
+            for _ in range(WRITE_ATTEMPTS):
+                failures, writes = plan()
+                if failures and atomic:
+                    return failures
+                if self._commit(writes):
+                    return failures
+            raise self._lost_race(writes[0][0].node_id)
+
+    def register_many(self, records: list[NodeRecord], atomic: bool = False) -> list[BulkFailure]:
+        def plan() -> tuple[list[BulkFailure], list[_Write]]:
+            failures: list[BulkFailure] = []
+            writes: list[_Write] = []
+            seen: set[str] = set()
+            for index, record in enumerate(records):
+                if record.node_id in seen:
+                    failures.append(BulkFailure(index, record.node_id, "duplicate"))
+                elif record.node_id in self._nodes:
+                    failures.append(BulkFailure(index, record.node_id, "exists"))
+                else:
+                    writes.append((_new_version(record, version=1), "register", 0))
+                seen.add(record.node_id)
+            return failures, writes
+
+        return self._bulk(plan, atomic)
+
+    def update_many(self, updates: list[tuple[str, dict[str, Any]]], atomic: bool = False) -> list[BulkFailure]:
+        """Apply ``(node_id, fields)`` updates in order; a node may appear more than once."""
+
+        def plan() -> tuple[list[BulkFailure], list[_Write]]:
+            failures: list[BulkFailure] = []
+            writes: list[_Write] = []
+            # Later updates of the same node build on earlier ones in this batch.
+            latest: dict[str, NodeRecord] = {}
+            for index, (node_id, fields) in enumerate(updates):
+                current = latest.get(node_id) or self._nodes.get(node_id)
+                if current is None:
+                    failures.append(BulkFailure(index, node_id, "not_found"))
+                    continue
+                write = self._updated(current, fields)
+                latest[node_id] = write[0]
+                writes.append(write)
+            return failures, writes
+
+        return self._bulk(plan, atomic)
+
+    def set_lifecycle_many(
+        self,
+        transitions: list[tuple[str, NodeLifecycleState, NodeLifecycleState | None]],
+        atomic: bool = False,
+    ) -> list[BulkFailure]:
+        """Apply ``(node_id, state, expected_state)`` changes, each checked like ``set_lifecycle``.
+
+        Every transition is judged against the states before the batch, so a
+        node may appear only once.
+        """
+
+        def plan() -> tuple[list[BulkFailure], list[_Write]]:
+            failures: list[BulkFailure] = []
+            checks: list[tuple[int, NodeRecord, NodeLifecycleState, NodeLifecycleState | None]] = []
+            seen: set[str] = set()
+            for index, (node_id, state, expected) in enumerate(transitions):
+                record = self._nodes.get(node_id)
+                if node_id in seen:
+                    failures.append(BulkFailure(index, node_id, "duplicate"))
+                elif record is None:
+                    failures.append(BulkFailure(index, node_id, "not_found"))
+                else:
+                    checks.append((index, record, state, expected))
+                seen.add(node_id)
+            rejections = check_transitions(
+                (record.lifecycle_state, state, expected) for _, record, state, expected in checks
+            )
+            writes: list[_Write] = []
+            for (index, record, state, _), rejection in zip(checks, rejections):
+                if rejection is not None:
+                    failures.append(BulkFailure(index, record.node_id, rejection))
+                elif record.lifecycle_state is not state:
+                    writes.append(self._moved(record, state))
+            failures.sort(key=lambda failure: failure.index)
+            return failures, writes
+
+        return self._bulk(plan, atomic)
 
 
 _node_registry: NodeRegistry | None = None
@@ -87,3 +519,9 @@ def get_node_registry() -> NodeRegistry:
     if _node_registry is None:
         _node_registry = NodeRegistry()
     return _node_registry
+
+
+def set_node_registry(registry: NodeRegistry) -> None:
+    """Install the process-wide registry, e.g. one backed by persistent storage."""
+    global _node_registry
+    _node_registry = registry
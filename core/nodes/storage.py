@@ -0,0 +1,49 @@
+"""Storage contract for the node registry.
+
+Core only defines the contract; apps provide implementations (and own any
+filesystem or database access).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Protocol
+
+if TYPE_CHECKING:
+    from core.nodes.registry import NodeRecord
+
+
+@dataclass(frozen=True)
+class NodeWrite:
+    """A new version of one node and the stored version it was derived from."""
+
+    record: NodeRecord
+    # 0 means the node must not be stored yet.
+    base_version: int
+
+
+class NodeStorage(Protocol):
+    """Durable backing store behind an in-memory ``NodeRegistry``."""
+
+    def load(self) -> list[NodeRecord]:
+        """Return every stored record; called once when the registry is built."""
+        ...
+
+    def changes(self, force: bool = False) -> list[NodeRecord]:
+        """Return records written by other registries since the last ``load``/``changes`` call.
+
+        Called before every read, so it must be cheap when nothing changed;
+        it may skip checking when called again soon after, unless ``force``.
+        """
+        ...
+
+    def save(self, writes: Sequence[NodeWrite]) -> list[NodeRecord]:
+        """Durably store every write, in one transaction, before returning.
+
+        A write only applies while the stored node is still at its
+        ``base_version``. If any node has moved on, nothing is stored and
+        the current stored records of those nodes are returned instead; an
+        empty list means every write was stored.
+        """
+        ...
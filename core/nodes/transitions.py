@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+from typing import Literal
+
 from core.lifecycle.models import NodeLifecycleState
 
 _ALLOWED_TRANSITIONS: dict[NodeLifecycleState, set[NodeLifecycleState]] = {
@@ -12,6 +15,35 @@ _ALLOWED_TRANSITIONS: dict[NodeLifecycleState, set[NodeLifecycleState]] = {
     NodeLifecycleState.ERROR: {NodeLifecycleState.STOPPED},
 }
 
+# One bit per state; each state's mask has the bits of the states it may move to.
+STATE_BITS: dict[NodeLifecycleState, int] = {state: 1 << index for index, state in enumerate(NodeLifecycleState)}
+TRANSITION_MASKS: dict[NodeLifecycleState, int] = {
+    state: sum(STATE_BITS[target] for target in _ALLOWED_TRANSITIONS.get(state, ())) for state in NodeLifecycleState
+}
+
+TransitionRejection = Literal["not_allowed", "state_mismatch"]
+
+
+class LifecycleTransitionError(Exception):
+    """A lifecycle change the state machine (or the caller's expected state) rules out."""
+
+    def __init__(
+        self,
+        node_id: str,
+        current: NodeLifecycleState,
+        target: NodeLifecycleState,
+        reason: TransitionRejection,
+    ) -> None:
+        if reason == "state_mismatch":
+            message = f"Node {node_id} is {current.value}, not the expected state"
+        else:
+            message = f"Node {node_id} cannot move from {current.value} to {target.value}"
+        super().__init__(message)
+        self.node_id = node_id
+        self.current = current
+        self.target = target
+        self.reason = reason
+
 
 def is_transition_allowed(
     current: NodeLifecycleState,
@@ -19,4 +51,47 @@ def is_transition_allowed(
 ) -> bool:
     """Return True if a lifecycle transition is allowed."""
 
-    return target in _ALLOWED_TRANSITIONS.get(current, set())
+    return bool(TRANSITION_MASKS[current] & STATE_BITS[target])
+
+
+def check_transition(
+    current: NodeLifecycleState,
+    target: NodeLifecycleState,
+    expected: NodeLifecycleState | None = None,
+) -> TransitionRejection | None:
+    """Why moving from ``current`` to ``target`` is rejected, or None when it may proceed.
+
+    Staying in the current state is accepted as a no-op; ``expected`` makes
+    the change a compare-and-set against ``current``.
+    """
+    if expected is not None and expected is not current:
+        return "state_mismatch"
+    if target is current or TRANSITION_MASKS[current] & STATE_BITS[target]:
+        return None
+    return "not_allowed"
+
+
+def check_transitions(
+    requests: Iterable[tuple[NodeLifecycleState, NodeLifecycleState, NodeLifecycleState | None]],
+) -> list[TransitionRejection | None]:
+    """``check_transition`` for many ``(current, target, expected)`` triples.
+
+    Requests are grouped by current state, so the transition table is read
+    once per state rather than once per request; each request then costs one
+    mask test.
+    """
+    items = list(requests)
+    results: list[TransitionRejection | None] = [None] * len(items)
+    by_state: dict[NodeLifecycleState, list[int]] = {}
+    for index, (current, _, _) in enumerate(items):
+        by_state.setdefault(current, []).append(index)
+    for current, indexes in by_state.items():
+        # Staying put is always accepted.
+        allowed = TRANSITION_MASKS[current] | STATE_BITS[current]
+        for index in indexes:
+            _, target, expected = items[index]
+            if expected is not None and expected is not current:
+                results[index] = "state_mismatch"
+            elif not allowed & STATE_BITS[target]:
+                results[index] = "not_allowed"
+    return results